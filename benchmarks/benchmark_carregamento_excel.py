@@ -0,0 +1,154 @@
+"""
+Benchmark do carregamento de planilhas .xlsx no ExcelHandler.
+
+Compara o pd.read_excel (modelo completo de células do openpyxl) com a
+leitura em streaming (read_only) usada por carregar_arquivo, e mede também
+o carregar_arquivo completo (ordenação, esquema de tipos e índices), que é
+o que o usuário espera. Cada leitor roda num processo separado para medir o
+pico de memória (RSS) de forma isolada; os DataFrames do pd.read_excel e do
+streaming são comparados.
+
+Uso:
+    python benchmarks/benchmark_carregamento_excel.py --linhas 50000
+    python benchmarks/benchmark_carregamento_excel.py --arquivo planilha.xlsx
+"""
+import argparse
+import datetime
+import os
+import pickle
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+
+def gerar_planilha(caminho: str, linhas: int, semente: int = 42):
+    from openpyxl import Workbook
+    from utils.dados_estaticos import COLUNAS_EXCEL, TIPO_ACIDENTE, SEXO, REGIAO
+
+    aleatorio = random.Random(semente)
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet()
+    ws.append(COLUNAS_EXCEL)
+
+    inicio = datetime.datetime(2020, 1, 1)
+    for _ in range(linhas):
+        linha = [''] * len(COLUNAS_EXCEL)
+        valores = {
+            'Tipo de Acidente': aleatorio.choice(TIPO_ACIDENTE),
+            'Vítima': f"Vitima {aleatorio.randint(1, 10 ** 6)}",
+            'Sexo': aleatorio.choice(SEXO),
+            'Idade': aleatorio.randint(1, 95),
+            'Município do Fato': f"Municipio {aleatorio.randint(1, 224)}",
+            'Região': aleatorio.choice(REGIAO),
+            'Lat': round(aleatorio.uniform(-10.9, -2.7), 6),
+            'Long': round(aleatorio.uniform(-45.9, -40.4), 6),
+            'Data do Fato': inicio + datetime.timedelta(days=aleatorio.randint(0, 2500)),
+            'Hora do fato': f"{aleatorio.randint(0, 23):02d}:{aleatorio.randint(0, 59):02d}",
+        }
+        for i, coluna in enumerate(COLUNAS_EXCEL):
+            linha[i] = valores.get(coluna, linha[i])
+        ws.append(linha)
+
+    wb.save(caminho)
+
+
+def medir(leitor: str, caminho: str, saida: str):
+    # Executado no processo filho: lê, mede e grava o resultado em pickle
+    import pandas as pd
+    from openpyxl import load_workbook
+    from utils.excel_handler import ExcelHandler
+
+    # Pico só com as bibliotecas importadas, para separar o custo dos dados
+    base = pico_memoria_mb()
+
+    inicio = time.perf_counter()
+    if leitor == 'read_excel':
+        df = pd.read_excel(caminho)
+    elif leitor == 'carregar_arquivo':
+        handler = ExcelHandler(usar_diario=False)
+        sucesso, mensagem = handler.carregar_arquivo(caminho)
+        if not sucesso:
+            raise RuntimeError(mensagem)
+        df = handler.df
+    else:
+        handler = ExcelHandler()
+        wb = load_workbook(caminho, read_only=True, data_only=True)
+        ws = wb.worksheets[0]
+        df = handler._ler_registros(ws, handler._ler_cabecalho(ws))
+        wb.close()
+    duracao = time.perf_counter() - inicio
+
+    with open(saida, 'wb') as f:
+        pickle.dump({'df': df, 'tempo': duracao, 'pico_mb': pico_memoria_mb(), 'base_mb': base}, f)
+
+
+def pico_memoria_mb() -> float:
+    try:
+        import resource
+        # ru_maxrss: KB no Linux, bytes no macOS
+        pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return pico / (1024 * 1024) if sys.platform == 'darwin' else pico / 1024
+    except ImportError:
+        try:
+            import psutil
+            return psutil.Process().memory_info().peak_wset / (1024 * 1024)
+        except (ImportError, AttributeError):
+            return float('nan')
+
+
+def executar(leitor: str, caminho: str) -> dict:
+    with tempfile.TemporaryDirectory() as pasta:
+        saida = os.path.join(pasta, 'resultado.pkl')
+        subprocess.run([sys.executable, os.path.abspath(__file__), '--medir', leitor,
+                        '--arquivo', caminho, '--saida', saida], check=True)
+        with open(saida, 'rb') as f:
+            return pickle.load(f)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark do carregamento de .xlsx")
+    parser.add_argument("--linhas", type=int, default=50000)
+    parser.add_argument("--arquivo", help="Planilha existente (senão gera uma sintética)")
+    parser.add_argument("--medir", help=argparse.SUPPRESS)
+    parser.add_argument("--saida", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.medir:
+        medir(args.medir, args.arquivo, args.saida)
+        return 0
+
+    with tempfile.TemporaryDirectory() as pasta:
+        caminho = args.arquivo
+        if not caminho:
+            caminho = os.path.join(pasta, 'sintetica.xlsx')
+            print(f"Gerando planilha sintética com {args.linhas} linhas...")
+            gerar_planilha(caminho, args.linhas)
+
+        antigo = executar('read_excel', caminho)
+        novo = executar('streaming', caminho)
+        completo = executar('carregar_arquivo', caminho)
+
+    identicos = antigo['df'].equals(novo['df'])
+
+    print(f"Linhas: {len(antigo['df'])}")
+    for nome, resultado in (("pd.read_excel", antigo), ("Streaming", novo),
+                            ("carregar_arquivo", completo)):
+        dados_mb = resultado['pico_mb'] - resultado['base_mb']
+        print(f"{nome + ':':<18}{resultado['tempo']:.2f} s, pico {resultado['pico_mb']:.0f} MB "
+              f"({dados_mb:.0f} MB acima da base)")
+
+    ganho_memoria = (antigo['pico_mb'] - antigo['base_mb']) / max(novo['pico_mb'] - novo['base_mb'], 1)
+    print(f"Ganho:            {antigo['tempo'] / novo['tempo']:.1f}x no tempo, "
+          f"{ganho_memoria:.1f}x na memória dos dados")
+    print(f"Resultados idênticos (pd.read_excel x streaming): {'sim' if identicos else 'NAO'}")
+
+    return 0 if identicos else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
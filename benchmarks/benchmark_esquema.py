@@ -0,0 +1,108 @@
+"""
+Benchmark do esquema tipado (utils/esquema.py) do DataFrame em memória.
+
+Monta um DataFrame como o do Google Sheets (todas as colunas como texto),
+aplica o esquema e compara memória, ordenação por data e valores únicos.
+Também confere que a conversão de volta (gravação) devolve o texto original.
+
+Uso:
+    python benchmarks/benchmark_esquema.py --linhas 200000
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+import pandas as pd
+
+from utils.dados_estaticos import COLUNAS_EXCEL, TIPO_ACIDENTE, SEXO, REGIAO, VEICULOS_VITIMA
+from utils.esquema import aplicar_esquema, dataframe_exibicao
+from utils.sheets_handler import SheetsHandler
+
+
+def gerar_dataframe(linhas: int, semente: int = 42) -> pd.DataFrame:
+    aleatorio = random.Random(semente)
+    colunas = {coluna: [''] * linhas for coluna in COLUNAS_EXCEL}
+
+    for i in range(linhas):
+        colunas['Tipo de Acidente'][i] = aleatorio.choice(TIPO_ACIDENTE)
+        colunas['Vítima'][i] = f"Vitima {aleatorio.randint(1, 10 ** 6)}"
+        colunas['Sexo'][i] = aleatorio.choice(SEXO)
+        colunas['Idade'][i] = str(aleatorio.randint(1, 95))
+        colunas['Município do Fato'][i] = f"Municipio {aleatorio.randint(1, 224)}"
+        colunas['Região'][i] = aleatorio.choice(REGIAO)
+        colunas['Veículo Vítima\nOu Outros'][i] = aleatorio.choice(VEICULOS_VITIMA)
+        colunas['Lat'][i] = texto_numero(round(aleatorio.uniform(-10.9, -2.7), 4))
+        colunas['Long'][i] = texto_numero(round(aleatorio.uniform(-45.9, -40.4), 4))
+        colunas['Data do Fato'][i] = (f"{aleatorio.randint(1, 28):02d}/"
+                                      f"{aleatorio.randint(1, 12):02d}/{aleatorio.randint(2020, 2025)}")
+        colunas['Hora do fato'][i] = f"{aleatorio.randint(0, 23):02d}:{aleatorio.randint(0, 59):02d}"
+
+    return pd.DataFrame(colunas).astype(object)
+
+
+def texto_numero(valor: float) -> str:
+    # Como o Google Sheets devolve o número (sem '.0' nos inteiros)
+    return str(int(valor)) if valor.is_integer() else str(valor)
+
+
+def medir(funcao, repeticoes: int = 3) -> float:
+    melhor = float('inf')
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        funcao()
+        melhor = min(melhor, time.perf_counter() - inicio)
+    return melhor
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark do esquema tipado")
+    parser.add_argument("--linhas", type=int, default=200000)
+    args = parser.parse_args()
+
+    print(f"Gerando {args.linhas} linhas...")
+    texto = gerar_dataframe(args.linhas)
+
+    inicio = time.perf_counter()
+    tipado = aplicar_esquema(texto)
+    tempo_conversao = time.perf_counter() - inicio
+
+    memoria_texto = texto.memory_usage(deep=True).sum() / 2 ** 20
+    memoria_tipado = tipado.memory_usage(deep=True).sum() / 2 ** 20
+
+    handler = SheetsHandler(usar_cache=False)
+
+    def ordenar_texto():
+        datas = pd.to_datetime(texto['Data do Fato'], format='%d/%m/%Y', errors='coerce')
+        return texto.loc[datas.sort_values(kind='stable').index]
+
+    def ordenar_tipado():
+        return tipado.sort_values('Data do Fato', kind='stable')
+
+    def unicos(df):
+        return sorted(v for v in df['Município do Fato'].dropna().unique().tolist() if v != '')
+
+    # A gravação formata as células como texto (mesma rotina do SheetsHandler)
+    exibicao = dataframe_exibicao(tipado).values.tolist()
+    identicos = all(
+        [handler._formatar_celula(c) for c in linha] == [handler._formatar_celula(c) for c in original]
+        for linha, original in zip(exibicao, texto.values.tolist())
+    )
+
+    print(f"Conversão:        {tempo_conversao:.2f} s")
+    print(f"Memória:          {memoria_texto:.1f} MB -> {memoria_tipado:.1f} MB "
+          f"({memoria_texto / memoria_tipado:.1f}x)")
+    print(f"Ordenar por data: {medir(ordenar_texto) * 1000:.0f} ms -> {medir(ordenar_tipado) * 1000:.0f} ms")
+    print(f"Valores únicos:   {medir(lambda: unicos(texto)) * 1000:.1f} ms -> "
+          f"{medir(lambda: unicos(tipado)) * 1000:.1f} ms")
+    print(f"Gravação idêntica ao texto original: {'sim' if identicos else 'NAO'}")
+
+    return 0 if identicos else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
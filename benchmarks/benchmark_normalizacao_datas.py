@@ -0,0 +1,105 @@
+"""
+Benchmark da normalização de datas do SheetsHandler.
+
+Compara o laço célula a célula antigo com a versão vetorizada
+(_normalizar_datas_dataframe) em um DataFrame sintético e confere se os
+resultados são idênticos.
+
+Uso:
+    python benchmarks/benchmark_normalizacao_datas.py --linhas 100000
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pandas as pd
+from utils.sheets_handler import SheetsHandler
+
+
+def gerar_datas(linhas: int, semente: int = 42) -> list:
+    aleatorio = random.Random(semente)
+    valores = []
+
+    for _ in range(linhas):
+        ano = aleatorio.randint(1950, 2026)
+        mes = aleatorio.randint(1, 12)
+        dia = aleatorio.randint(1, 28)
+        formato = aleatorio.random()
+
+        if formato < 0.70:
+            valores.append(f"{dia:02d}/{mes:02d}/{ano}")
+        elif formato < 0.78:
+            valores.append(f"{dia}/{mes}/{ano}")
+        elif formato < 0.84:
+            valores.append(f"{mes:02d}/{aleatorio.randint(13, 28)}/{ano}")
+        elif formato < 0.90:
+            valores.append(f"{ano}-{mes:02d}-{dia:02d}")
+        elif formato < 0.92:
+            valores.append(f"{ano}/{mes}/{dia}")
+        elif formato < 0.93:
+            valores.append(f"{ano}-{mes:02d}-{dia:02d} 00:00:00")
+        elif formato < 0.96:
+            valores.append("")
+        else:
+            valores.append(aleatorio.choice(["NI", "31/02/2024", "0/5/2024", "2024-13-01", "1/1/1500"]))
+
+    return valores
+
+
+def normalizar_legado(df: pd.DataFrame):
+    # Laço célula a célula (implementação anterior à vetorização)
+    for coluna in ['Data do Fato', 'Data de Nascimento', 'Data do Óbito']:
+        if coluna not in df.columns:
+            continue
+
+        for idx, valor in df[coluna].items():
+            if not valor or pd.isna(valor):
+                continue
+
+            valor_str = str(valor).strip()
+            if not valor_str:
+                continue
+
+            data_normalizada = SheetsHandler._normalizar_valor_data(valor_str)
+            if data_normalizada:
+                df.at[idx, coluna] = data_normalizada
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark da normalização de datas")
+    parser.add_argument("--linhas", type=int, default=100000)
+    args = parser.parse_args()
+
+    df = pd.DataFrame({
+        'Data do Fato': gerar_datas(args.linhas, semente=1),
+        'Data do Óbito': gerar_datas(args.linhas, semente=2),
+    }, dtype=object)
+
+    df_legado = df.copy()
+    inicio = time.perf_counter()
+    normalizar_legado(df_legado)
+    tempo_legado = time.perf_counter() - inicio
+
+    handler = SheetsHandler()
+    handler.df = df.copy()
+    inicio = time.perf_counter()
+    handler._normalizar_datas_dataframe()
+    tempo_vetorizado = time.perf_counter() - inicio
+
+    identicos = handler.df.equals(df_legado)
+
+    print(f"Linhas: {args.linhas}")
+    print(f"Laço célula a célula: {tempo_legado:.3f} s")
+    print(f"Vetorizado:           {tempo_vetorizado:.3f} s")
+    print(f"Ganho:                {tempo_legado / tempo_vetorizado:.1f}x")
+    print(f"Resultados idênticos: {'sim' if identicos else 'NAO'}")
+
+    return 0 if identicos else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
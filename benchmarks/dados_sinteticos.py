@@ -0,0 +1,149 @@
+"""
+Gerador de dados sintéticos de vítimas para os benchmarks.
+
+Os valores categóricos vêm dos vocabulários de utils/dados_estaticos.py e os
+demais (nomes, municípios, coordenadas, datas) seguem a forma dos dados
+reais: municípios com distribuição concentrada (capital e cidades grandes),
+coordenadas dentro do Piauí e datas dd/mm/yyyy. A mesma semente gera sempre
+os mesmos dados.
+"""
+import datetime
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pandas as pd
+
+from utils.dados_estaticos import (
+    COLUNAS_EXCEL, TIPO_ACIDENTE, NATUREZA_LAUDO, SEXO, POSSUI_CNH, CONDUTOR,
+    EXAME_ALCOOLEMIA, USANDO_CAPACETE, SUBTIPO_LOCAL, VEICULOS_VITIMA,
+    VEICULOS_ENVOLVIDO, REGIAO, DIAS_SEMANA, MESES
+)
+
+NUM_MUNICIPIOS = 224
+NATUREZAS = ["Acidente de Trânsito", "Homicídio Culposo", "NI"]
+LOCAIS_MORTE = ["Local do Acidente", "Hospital", "Trajeto ao Hospital", "NI"]
+TERRITORIOS = [f"Território {i}" for i in range(1, 13)]
+
+DATA_INICIAL = datetime.date(2020, 1, 1)
+DIAS_PERIODO = 6 * 365
+
+
+def gerar_registros(linhas: int, semente: int = 42) -> list:
+    """Registros como o formulário de cadastro produz (todos os valores em texto)."""
+    aleatorio = random.Random(semente)
+    # Lei de Zipf aproximada: poucos municípios concentram a maior parte das ocorrências
+    pesos_municipios = [1 / posicao for posicao in range(1, NUM_MUNICIPIOS + 1)]
+    municipios = aleatorio.choices(range(1, NUM_MUNICIPIOS + 1), weights=pesos_municipios, k=linhas)
+
+    registros = []
+    for i in range(linhas):
+        data_fato = DATA_INICIAL + datetime.timedelta(days=aleatorio.randrange(DIAS_PERIODO))
+        idade = aleatorio.randint(1, 95)
+        nascimento = data_fato - datetime.timedelta(days=idade * 365 + aleatorio.randrange(365))
+        obito = data_fato + datetime.timedelta(days=aleatorio.choice((0, 0, 0, 1, 3, 10)))
+
+        registros.append({
+            "Natureza da Ocorrência": aleatorio.choice(NATUREZAS),
+            "Tipo de Acidente": aleatorio.choice(TIPO_ACIDENTE),
+            "Natureza do Laudo": aleatorio.choice(NATUREZA_LAUDO),
+            "Data do Óbito": obito.strftime('%d/%m/%Y'),
+            "Vítima": f"Vitima {aleatorio.randrange(10 ** 7)}",
+            "Sexo": aleatorio.choices(SEXO, weights=(82, 18))[0],
+            "Filiação": f"Mae {aleatorio.randrange(10 ** 6)}",
+            "Data de\nNascimento": nascimento.strftime('%d/%m/%Y'),
+            "Idade": str(idade),
+            "CPF": f"{aleatorio.randrange(10 ** 11):011d}",
+            "Possui\nCNH": aleatorio.choice(POSSUI_CNH),
+            "Condutor": aleatorio.choice(CONDUTOR),
+            "Realizado Exame\nAlcoolemia": aleatorio.choice(EXAME_ALCOOLEMIA),
+            "Estava usando\nCapacete": aleatorio.choice(USANDO_CAPACETE),
+            "Município do Fato": f"Municipio {municipios[i]}",
+            "Logradouro": f"Rua {aleatorio.randrange(5000)}",
+            "Subtipo do Local": aleatorio.choice(SUBTIPO_LOCAL),
+            "Lat": texto_numero(round(aleatorio.uniform(-10.9, -2.7), 6)),
+            "Long": texto_numero(round(aleatorio.uniform(-45.9, -40.4), 6)),
+            "Data do Fato": data_fato.strftime('%d/%m/%Y'),
+            "Hora do fato": f"{aleatorio.randint(0, 23):02d}:{aleatorio.randint(0, 59):02d}",
+            "Dia da Semana": DIAS_SEMANA[data_fato.weekday()],
+            "Mês": MESES[data_fato.month - 1],
+            "Local da Morte": aleatorio.choice(LOCAIS_MORTE),
+            "Veículo Vítima\nOu Outros": aleatorio.choice(VEICULOS_VITIMA),
+            "Veículo Envolvido\nOu Outros": aleatorio.choice(VEICULOS_ENVOLVIDO),
+            "Região": aleatorio.choice(REGIAO),
+            "Território de\nDesenvolvimento": aleatorio.choice(TERRITORIOS),
+            "OBS:": "" if aleatorio.random() < 0.9 else "Sem observações",
+        })
+
+    return registros
+
+
+def gerar_dataframe(linhas: int, semente: int = 42, datas_irregulares: float = 0.0) -> pd.DataFrame:
+    """
+    DataFrame como o do Google Sheets (todas as colunas em texto).
+
+    datas_irregulares é a fração de datas escritas em outros formatos
+    (d/m/yyyy, yyyy-mm-dd, mm/dd/yyyy), como as digitadas à mão na planilha.
+    """
+    df = pd.DataFrame(gerar_registros(linhas, semente), columns=COLUNAS_EXCEL).astype(object)
+
+    if datas_irregulares > 0:
+        aleatorio = random.Random(semente + 1)
+        for coluna in ('Data do Fato', 'Data de\nNascimento', 'Data do Óbito'):
+            valores = df[coluna].tolist()
+            for i, valor in enumerate(valores):
+                if aleatorio.random() < datas_irregulares:
+                    valores[i] = formato_irregular(valor, aleatorio)
+            df[coluna] = pd.Series(valores, index=df.index, dtype=object)
+
+    return df
+
+
+def formato_irregular(data: str, aleatorio: random.Random) -> str:
+    dia, mes, ano = data.split('/')
+    formato = aleatorio.randrange(3)
+    if formato == 0:
+        return f"{int(dia)}/{int(mes)}/{ano}"
+    if formato == 1:
+        return f"{ano}-{mes}-{dia}"
+    # mm/dd/yyyy só é reconhecível quando o dia passa de 12
+    return f"{mes}/{dia}/{ano}" if int(dia) > 12 else data
+
+
+def gravar_planilha(caminho: str, linhas: int, semente: int = 42):
+    """
+    Grava uma planilha .xlsx com os tipos nativos do Excel (datas e números),
+    em ordem de Data do Fato como a aplicação a mantém: carregar não reordena
+    e o salvamento incremental fica disponível.
+    """
+    from openpyxl import Workbook
+
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet()
+    ws.append(COLUNAS_EXCEL)
+
+    colunas_data = {'Data do Fato', 'Data de\nNascimento', 'Data do Óbito'}
+    colunas_numero = {'Lat', 'Long', 'Idade'}
+
+    registros = gerar_registros(linhas, semente)
+    registros.sort(key=lambda r: datetime.datetime.strptime(r['Data do Fato'], '%d/%m/%Y'))
+
+    for registro in registros:
+        linha = []
+        for coluna in COLUNAS_EXCEL:
+            valor = registro[coluna]
+            if coluna in colunas_data:
+                valor = datetime.datetime.strptime(valor, '%d/%m/%Y')
+            elif coluna in colunas_numero:
+                valor = float(valor) if '.' in valor else int(valor)
+            linha.append(valor)
+        ws.append(linha)
+
+    wb.save(caminho)
+
+
+def texto_numero(valor: float) -> str:
+    # Como o Google Sheets devolve o número (sem '.0' nos inteiros)
+    return str(int(valor)) if valor.is_integer() else str(valor)
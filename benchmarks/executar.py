@@ -0,0 +1,549 @@
+"""
+Suíte de benchmarks dos handlers de armazenamento.
+
+Gera datasets sintéticos (benchmarks/dados_sinteticos.py) e mede, para cada
+tamanho:
+    excel.carregar_arquivo           leitura de uma planilha .xlsx
+    excel.inserir_registro           inserções na posição da data (por registro)
+    excel.salvar_incremental         gravação só das linhas novas
+    excel.salvar_completo            regravação da planilha inteira
+    sheets.normalizar_datas          _normalizar_datas_dataframe com datas irregulares
+    sheets.carregar_planilha         carga de todas as abas de ano (Sheets falso)
+    sheets.inserir_registro          inserções com gravação na aba remota (Sheets falso)
+    mysql.inserir_registro           conversão + INSERTs contra um pool local (sem rede)
+    parquet.carregar_pasta           leitura de todas as partições de ano
+    parquet.inserir_registro         inserções com regravação da partição do ano
+    parquet.exportar_excel           geração da planilha .xlsx a partir da base
+    sqlite.carregar_banco            abertura da base SQLite (sem montar o DataFrame)
+    sqlite.inserir_registro          inserções (uma transação por registro)
+    sqlite.obter_valores_unicos      valores dos combos do formulário pelos índices
+    sqlite.obter_dataframe           montagem do DataFrame completo
+    estatisticas.montar_cubo         cubo de contagens a partir do DataFrame carregado
+    estatisticas.registrar           atualização do cubo por registro inserido
+    estatisticas.resumo_mensal       detalhamentos de um mês (consulta ao cubo)
+    espacial.montar_indice           grade sobre Lat/Long a partir do DataFrame carregado
+    espacial.contar_raio             registros a até 500 m de registros sorteados (últimos 24 meses)
+    espacial.celulas_mais_densas     10 células com mais registros
+
+Os casos parquet só rodam se o pyarrow estiver instalado.
+
+O MySQL é substituído por um pool local que só conta os comandos, então o
+tempo medido é o do lado Python (conversões, lookups, montagem dos INSERTs).
+O Google Sheets é substituído por sheets_falso.py (nesta pasta), que
+registra as chamadas à API e os bytes que seriam trafegados.
+
+Os resultados saem em JSON para comparar versões: com --comparar, cada caso
+mais lento que a base além da tolerância, ou que passou a fazer mais chamadas
+à API, é listado e o código de saída é 1.
+
+Uso:
+    python benchmarks/executar.py --linhas 10000 100000 --saida resultados.json
+    python benchmarks/executar.py --linhas 10000 --comparar resultados.json
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+import pandas as pd
+
+from dados_sinteticos import gerar_registros, gerar_dataframe, gravar_planilha
+from sheets_falso import ClienteSheetsFalso
+from utils.dados_estaticos import TIPO_ACIDENTE, VEICULOS_VITIMA, VEICULOS_ENVOLVIDO
+from utils.excel_handler import ExcelHandler
+from utils.sheets_handler import SheetsHandler
+from utils.database_handler import DatabaseHandler
+from utils.parquet_handler import ParquetHandler, pyarrow_disponivel
+from utils.sqlite_handler import SQLiteHandler
+from utils.cubo_estatisticas import CuboEstatisticas
+from utils.indice_espacial import IndiceEspacial
+from utils.esquema import aplicar_esquema
+
+FORMATO_RESULTADOS = 1
+URL_FALSA = 'https://docs.google.com/spreadsheets/d/benchmark'
+TOLERANCIA_PADRAO = 0.20
+
+
+# SUBSTITUTO LOCAL DO MYSQL
+
+class CursorLocal:
+    def __init__(self, conexao):
+        self._conexao = conexao
+        self.lastrowid = None
+
+    def execute(self, sql, valores=None):
+        self._conexao.comandos += 1
+        self._conexao.ultimo_id += 1
+        self.lastrowid = self._conexao.ultimo_id
+
+    def executemany(self, sql, lista_valores):
+        self._conexao.comandos += 1
+        self.lastrowid = self._conexao.ultimo_id + 1
+        self._conexao.ultimo_id += len(lista_valores)
+
+    def fetchone(self):
+        # innodb_autoinc_lock_mode 1 e auto_increment_increment 1 (ids consecutivos)
+        return (1, 1)
+
+    def close(self):
+        pass
+
+
+class ConexaoLocal:
+    def __init__(self):
+        self.comandos = 0
+        self.commits = 0
+        self.ultimo_id = 0
+
+    def cursor(self):
+        return CursorLocal(self)
+
+    def commit(self):
+        self.commits += 1
+
+    def rollback(self):
+        pass
+
+    def close(self):
+        pass
+
+
+class PoolLocal:
+    def __init__(self):
+        self.conexao = ConexaoLocal()
+
+    def get_connection(self):
+        return self.conexao
+
+
+def criar_database_handler() -> DatabaseHandler:
+    handler = DatabaseHandler(config={'host': 'local', 'port': 3306, 'database': 'benchmark',
+                                      'user': 'benchmark', 'password': ''})
+    handler.pool = PoolLocal()
+
+    # Caches de lookup como os carregados do banco
+    handler._cache_tipo_acidente = {v.lower(): i for i, v in enumerate(TIPO_ACIDENTE, 1)}
+    handler._cache_tipo_veiculo = {v.lower(): i for i, v in enumerate(
+        dict.fromkeys(VEICULOS_VITIMA + VEICULOS_ENVOLVIDO), 1)}
+    handler._cache_municipio = {f"municipio {i}": i for i in range(1, 225)}
+    handler._cache_natureza = {"acidente de trânsito": 1, "homicídio culposo": 2, "ni": 3}
+    handler._caches_carregados = True
+    return handler
+
+
+# CASOS
+
+def medir(preparar, executar, repeticoes: int) -> dict:
+    # Cada repetição recebe um estado novo de preparar(), fora do tempo medido
+    tempos = []
+    for _ in range(repeticoes):
+        estado = preparar()
+        inicio = time.perf_counter()
+        executar(estado)
+        tempos.append(time.perf_counter() - inicio)
+
+    tempos.sort()
+    return {'melhor_s': tempos[0], 'mediana_s': tempos[len(tempos) // 2], 'repeticoes': repeticoes}
+
+
+def casos_excel(pasta: str, linhas: int, insercoes: int, repeticoes: int) -> dict:
+    caminho = os.path.join(pasta, f'sintetica_{linhas}.xlsx')
+    gravar_planilha(caminho, linhas)
+    novos = gerar_registros(insercoes, semente=7)
+
+    def carregado():
+        # Diário novo a cada repetição: as inserções de uma não são reaplicadas na seguinte
+        handler = ExcelHandler(pasta_diario=tempfile.mkdtemp(dir=pasta))
+        sucesso, msg = handler.carregar_arquivo(caminho)
+        if not sucesso:
+            raise RuntimeError(msg)
+        return handler
+
+    def inserir_todos(handler):
+        for registro in novos:
+            sucesso, msg, _ = handler.inserir_registro(registro)
+            if not sucesso:
+                raise RuntimeError(msg)
+
+    def com_insercoes():
+        handler = carregado()
+        inserir_todos(handler)
+        return handler
+
+    def com_insercoes_incremental():
+        handler = com_insercoes()
+        # Sem arquivo base o salvamento "incremental" regravaria tudo e mediria o caso errado
+        if not handler._caminho_base:
+            raise RuntimeError("Planilha de teste não permite salvamento incremental")
+        return handler
+
+    def salvar(incremental: bool):
+        def executar(handler):
+            sucesso, msg = handler.salvar_arquivo(os.path.join(pasta, 'saida.xlsx'),
+                                                  incremental=incremental)
+            if not sucesso:
+                raise RuntimeError(msg)
+        return executar
+
+    resultados = {
+        'excel.carregar_arquivo': medir(lambda: None, lambda _: carregado(), repeticoes),
+        'excel.inserir_registro': medir(carregado, inserir_todos, repeticoes),
+        'excel.salvar_incremental': medir(com_insercoes_incremental, salvar(True), repeticoes),
+        'excel.salvar_completo': medir(com_insercoes, salvar(False), repeticoes),
+    }
+    resultados['excel.inserir_registro']['operacoes'] = insercoes
+    return resultados
+
+
+def casos_sheets(linhas: int, insercoes: int, repeticoes: int) -> dict:
+    original = gerar_dataframe(linhas, datas_irregulares=0.15)
+
+    def com_dataframe():
+        handler = SheetsHandler(usar_cache=False)
+        handler.df = original.copy()
+        return handler
+
+    # Planilha remota como a mantida pela aplicação: uma aba por ano, ordenada por data
+    df = gerar_dataframe(linhas)
+    datas = pd.to_datetime(df['Data do Fato'], format='%d/%m/%Y')
+    df = df.loc[datas.sort_values(kind='stable').index]
+    abas = {str(ano): [list(df.columns)] + grupo.values.tolist()
+            for ano, grupo in df.groupby(datas.dt.year, sort=True)}
+    novos = gerar_registros(insercoes, semente=13)
+
+    def conectado():
+        cliente = ClienteSheetsFalso()
+        cliente.criar_planilha(URL_FALSA, abas)
+        handler = SheetsHandler(usar_cache=False)
+        handler.client = cliente
+        return handler
+
+    def carregar(handler):
+        sucesso, msg = handler.carregar_planilha(URL_FALSA)
+        if not sucesso:
+            raise RuntimeError(msg)
+
+    def carregado():
+        handler = conectado()
+        carregar(handler)
+        handler.client.metricas.zerar()
+        return handler
+
+    def inserir_todos(handler):
+        for registro in novos:
+            sucesso, msg, _ = handler.inserir_registro(registro)
+            if not sucesso:
+                raise RuntimeError(msg)
+
+    resultados = {
+        'sheets.normalizar_datas': medir(
+            com_dataframe, lambda handler: handler._normalizar_datas_dataframe(), repeticoes),
+        'sheets.carregar_planilha': medir(conectado, carregar, repeticoes),
+        'sheets.inserir_registro': medir(carregado, inserir_todos, repeticoes),
+    }
+    resultados['sheets.inserir_registro']['operacoes'] = insercoes
+
+    # Chamadas à API de uma execução de cada caso (determinísticas)
+    handler = conectado()
+    carregar(handler)
+    resultados['sheets.carregar_planilha']['api'] = handler.client.metricas.resumo()
+    handler.client.metricas.zerar()
+    inserir_todos(handler)
+    resultados['sheets.inserir_registro']['api'] = handler.client.metricas.resumo()
+
+    return resultados
+
+
+def casos_mysql(insercoes: int, repeticoes: int) -> dict:
+    registros = gerar_registros(insercoes, semente=11)
+
+    def inserir_todos(handler):
+        for registro in registros:
+            sucesso, msg = handler.inserir_registro(registro)
+            if not sucesso:
+                raise RuntimeError(msg)
+
+    resultado = medir(criar_database_handler, inserir_todos, repeticoes)
+    resultado['operacoes'] = insercoes
+    return {'mysql.inserir_registro': resultado}
+
+
+def casos_parquet(pasta: str, linhas: int, insercoes: int, repeticoes: int) -> dict:
+    planilha = os.path.join(pasta, f'sintetica_{linhas}.xlsx')
+    if not os.path.exists(planilha):
+        gravar_planilha(planilha, linhas)
+    novos = gerar_registros(insercoes, semente=7)
+
+    # A base é criada uma vez; cada repetição de inserção trabalha numa cópia
+    base = os.path.join(pasta, f'parquet_{linhas}')
+    sucesso, msg = ParquetHandler().importar_excel(planilha, base)
+    if not sucesso:
+        raise RuntimeError(msg)
+
+    def carregar(caminho):
+        handler = ParquetHandler()
+        sucesso, msg = handler.carregar_pasta(caminho)
+        if not sucesso:
+            raise RuntimeError(msg)
+        return handler
+
+    def copia_carregada():
+        copia = tempfile.mkdtemp(dir=pasta)
+        shutil.copytree(base, copia, dirs_exist_ok=True)
+        return carregar(copia)
+
+    def inserir_todos(handler):
+        for registro in novos:
+            sucesso, msg, _ = handler.inserir_registro(registro)
+            if not sucesso:
+                raise RuntimeError(msg)
+
+    def exportar(handler):
+        sucesso, msg = handler.salvar_arquivo(os.path.join(pasta, 'exportada.xlsx'))
+        if not sucesso:
+            raise RuntimeError(msg)
+
+    resultados = {
+        'parquet.carregar_pasta': medir(lambda: None, lambda _: carregar(base), repeticoes),
+        'parquet.inserir_registro': medir(copia_carregada, inserir_todos, repeticoes),
+        'parquet.exportar_excel': medir(lambda: carregar(base), exportar, repeticoes),
+    }
+    resultados['parquet.inserir_registro']['operacoes'] = insercoes
+    return resultados
+
+
+def casos_sqlite(pasta: str, linhas: int, insercoes: int, repeticoes: int) -> dict:
+    planilha = os.path.join(pasta, f'sintetica_{linhas}.xlsx')
+    if not os.path.exists(planilha):
+        gravar_planilha(planilha, linhas)
+    novos = gerar_registros(insercoes, semente=7)
+    colunas_combos = ['Município do Fato', 'Natureza da Ocorrência', 'Local da Morte',
+                      'Território de\nDesenvolvimento']
+
+    # A base é criada uma vez; cada repetição de inserção trabalha numa cópia
+    base = os.path.join(pasta, f'sqlite_{linhas}.sqlite3')
+    importador = SQLiteHandler()
+    sucesso, msg = importador.importar_excel(planilha, base)
+    importador.fechar()
+    if not sucesso:
+        raise RuntimeError(msg)
+
+    def carregar(caminho):
+        handler = SQLiteHandler()
+        sucesso, msg = handler.carregar_banco(caminho)
+        if not sucesso:
+            raise RuntimeError(msg)
+        return handler
+
+    def copia_carregada():
+        copia = os.path.join(tempfile.mkdtemp(dir=pasta), 'base.sqlite3')
+        shutil.copyfile(base, copia)
+        return carregar(copia)
+
+    def inserir_todos(handler):
+        for registro in novos:
+            sucesso, msg, _ = handler.inserir_registro(registro)
+            if not sucesso:
+                raise RuntimeError(msg)
+        handler.fechar()
+
+    def valores_combos(handler):
+        for coluna in colunas_combos:
+            handler.obter_valores_unicos(coluna)
+        handler.fechar()
+
+    def montar_dataframe(handler):
+        handler.obter_dataframe()
+        handler.fechar()
+
+    resultados = {
+        'sqlite.carregar_banco': medir(lambda: None, lambda _: carregar(base).fechar(), repeticoes),
+        'sqlite.inserir_registro': medir(copia_carregada, inserir_todos, repeticoes),
+        'sqlite.obter_valores_unicos': medir(lambda: carregar(base), valores_combos, repeticoes),
+        'sqlite.obter_dataframe': medir(lambda: carregar(base), montar_dataframe, repeticoes),
+    }
+    resultados['sqlite.inserir_registro']['operacoes'] = insercoes
+    return resultados
+
+
+def casos_estatisticas(linhas: int, insercoes: int, repeticoes: int) -> dict:
+    # DataFrame com os tipos do ExcelHandler já carregado (datas em datetime64)
+    df = gerar_dataframe(linhas)
+    df['Data do Fato'] = pd.to_datetime(df['Data do Fato'], format='%d/%m/%Y')
+    df = aplicar_esquema(df, datas_em_texto=False)
+    novos = gerar_registros(insercoes, semente=11)
+
+    def registrar_todos(cubo):
+        for registro in novos:
+            cubo.registrar(registro)
+
+    def com_pendentes():
+        cubo = CuboEstatisticas.montar([df])
+        registrar_todos(cubo)
+        return cubo
+
+    resultados = {
+        'estatisticas.montar_cubo': medir(lambda: None, lambda _: CuboEstatisticas.montar([df]), repeticoes),
+        'estatisticas.registrar': medir(lambda: CuboEstatisticas.montar([df]), registrar_todos, repeticoes),
+        'estatisticas.resumo_mensal': medir(com_pendentes, lambda cubo: cubo.resumo_mensal(2024, 'MARÇO'),
+                                            repeticoes),
+    }
+    resultados['estatisticas.registrar']['operacoes'] = insercoes
+    return resultados
+
+
+def casos_espacial(linhas: int, consultas: int, repeticoes: int) -> dict:
+    df = gerar_dataframe(linhas)
+    df['Data do Fato'] = pd.to_datetime(df['Data do Fato'], format='%d/%m/%Y')
+    df = aplicar_esquema(df, datas_em_texto=False)
+
+    # Centros das consultas: coordenadas de registros existentes (áreas com dados)
+    amostra = df[['Lat', 'Long']].dropna().sample(consultas, replace=True, random_state=5)
+    pontos = list(zip(amostra['Lat'].astype(float), amostra['Long'].astype(float)))
+    desde = df['Data do Fato'].max() - pd.DateOffset(months=24)
+
+    def contar_todos(indice):
+        for lat, lon in pontos:
+            indice.contar_raio(lat, lon, 500, desde=desde)
+
+    resultados = {
+        'espacial.montar_indice': medir(lambda: None, lambda _: IndiceEspacial.montar([df]), repeticoes),
+        'espacial.contar_raio': medir(lambda: IndiceEspacial.montar([df]), contar_todos, repeticoes),
+        'espacial.celulas_mais_densas': medir(lambda: IndiceEspacial.montar([df]),
+                                              lambda indice: indice.celulas_mais_densas(10), repeticoes),
+    }
+    resultados['espacial.contar_raio']['operacoes'] = consultas
+    return resultados
+
+
+# RESULTADOS
+
+def versao_codigo() -> str:
+    try:
+        return subprocess.run(['git', 'describe', '--always', '--dirty'], cwd=RAIZ,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'desconhecida'
+
+
+def comparar(atual: dict, base: dict, tolerancia: float) -> list:
+    # Compara a melhor medição (e as chamadas à API) de cada caso presente nos dois arquivos
+    def por_chave(resultados):
+        return {(r['caso'], r['linhas']): r for r in resultados['resultados']}
+
+    referencia = por_chave(base)
+    regressoes = []
+    for (caso, linhas), resultado in por_chave(atual).items():
+        anterior = referencia.get((caso, linhas))
+        if anterior is None:
+            continue
+
+        if anterior['melhor_s'] > 0:
+            razao = resultado['melhor_s'] / anterior['melhor_s']
+            if razao > 1 + tolerancia:
+                regressoes.append(f"{caso} ({linhas} linhas): {anterior['melhor_s'] * 1000:.1f} ms -> "
+                                  f"{resultado['melhor_s'] * 1000:.1f} ms ({razao:.2f}x)")
+
+        # Número de chamadas não varia entre execuções: qualquer aumento é regressão
+        chamadas_antes = anterior.get('api', {}).get('chamadas')
+        chamadas_agora = resultado.get('api', {}).get('chamadas')
+        if chamadas_antes is not None and chamadas_agora is not None and chamadas_agora > chamadas_antes:
+            regressoes.append(f"{caso} ({linhas} linhas): {chamadas_antes} -> {chamadas_agora} "
+                              f"chamadas à API")
+    return regressoes
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks dos handlers de armazenamento")
+    parser.add_argument("--linhas", type=int, nargs='+', default=[10000, 100000],
+                        help="Tamanhos do dataset (ex.: 10000 100000 500000)")
+    parser.add_argument("--insercoes", type=int, default=50,
+                        help="Registros inseridos nos casos de inserção")
+    parser.add_argument("--repeticoes", type=int, default=3)
+    parser.add_argument("--casos", nargs='+', choices=['excel', 'sheets', 'mysql', 'parquet', 'sqlite', 'estatisticas', 'espacial'],
+                        default=['excel', 'sheets', 'mysql', 'parquet', 'sqlite', 'estatisticas', 'espacial'])
+    parser.add_argument("--saida", help="Arquivo JSON com os resultados")
+    parser.add_argument("--comparar", help="JSON de uma execução anterior para detectar regressões")
+    parser.add_argument("--tolerancia", type=float, default=TOLERANCIA_PADRAO,
+                        help="Aumento relativo tolerado antes de acusar regressão (0.2 = 20%%)")
+    args = parser.parse_args()
+
+    resultados = []
+    with tempfile.TemporaryDirectory() as pasta:
+        for linhas in args.linhas:
+            casos = {}
+            if 'excel' in args.casos:
+                casos.update(casos_excel(pasta, linhas, args.insercoes, args.repeticoes))
+            if 'sheets' in args.casos:
+                casos.update(casos_sheets(linhas, args.insercoes, args.repeticoes))
+            if 'mysql' in args.casos:
+                # Não depende do tamanho do dataset: medido uma vez
+                if linhas == args.linhas[0]:
+                    casos.update(casos_mysql(args.insercoes, args.repeticoes))
+            if 'parquet' in args.casos:
+                if pyarrow_disponivel():
+                    casos.update(casos_parquet(pasta, linhas, args.insercoes, args.repeticoes))
+                elif linhas == args.linhas[0]:
+                    print("Casos parquet ignorados: pyarrow não instalado.")
+            if 'sqlite' in args.casos:
+                casos.update(casos_sqlite(pasta, linhas, args.insercoes, args.repeticoes))
+            if 'estatisticas' in args.casos:
+                casos.update(casos_estatisticas(linhas, args.insercoes, args.repeticoes))
+            if 'espacial' in args.casos:
+                casos.update(casos_espacial(linhas, args.insercoes, args.repeticoes))
+
+            for caso, medicao in casos.items():
+                resultados.append({'caso': caso, 'linhas': linhas, **medicao})
+                por_operacao = ''
+                if 'operacoes' in medicao:
+                    por_operacao = f"  ({medicao['melhor_s'] / medicao['operacoes'] * 1000:.2f} ms/op)"
+                api = ''
+                if 'api' in medicao:
+                    api = (f"  [{medicao['api']['chamadas']} chamadas, "
+                           f"{medicao['api']['bytes_recebidos'] / 1024:.0f} KB recebidos, "
+                           f"{medicao['api']['bytes_enviados'] / 1024:.0f} KB enviados]")
+                print(f"{caso:<28}{linhas:>8} linhas  {medicao['melhor_s'] * 1000:10.1f} ms"
+                      f"{por_operacao}{api}")
+
+    relatorio = {
+        'formato': FORMATO_RESULTADOS,
+        'versao': versao_codigo(),
+        'data': datetime.datetime.now().isoformat(timespec='seconds'),
+        'ambiente': {
+            'python': platform.python_version(),
+            'pandas': pd.__version__,
+            'plataforma': platform.platform(),
+        },
+        'resultados': resultados,
+    }
+
+    if args.saida:
+        with open(args.saida, 'w', encoding='utf-8') as f:
+            json.dump(relatorio, f, ensure_ascii=False, indent=2)
+        print(f"Resultados gravados em {args.saida}")
+
+    if args.comparar:
+        with open(args.comparar, encoding='utf-8') as f:
+            base = json.load(f)
+
+        regressoes = comparar(relatorio, base, args.tolerancia)
+        for regressao in regressoes:
+            print(f"REGRESSAO {regressao}")
+        if regressoes:
+            return 1
+        print(f"Sem regressões em relação a {base.get('versao', args.comparar)}.")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,376 @@
+import json
+import re
+import threading
+import time
+from collections import Counter
+from typing import Dict, List, Optional
+
+import gspread
+
+
+class MetricasSheets:
+    """
+    Contadores das chamadas "remotas" feitas a um ClienteSheetsFalso.
+
+    bytes_enviados/bytes_recebidos são o tamanho do JSON de cada requisição e
+    resposta, aproximando o que a API do Google trafegaria. latencia_s soma a
+    latência simulada (por chamada e por byte), dormida ou não.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.zerar()
+
+    def zerar(self):
+        with self._lock:
+            self.chamadas = Counter()
+            self.bytes_enviados = 0
+            self.bytes_recebidos = 0
+            self.latencia_s = 0.0
+
+    def registrar(self, metodo: str, enviado, recebido, latencia: float):
+        with self._lock:
+            self.chamadas[metodo] += 1
+            self.bytes_enviados += _tamanho_json(enviado)
+            self.bytes_recebidos += _tamanho_json(recebido)
+            self.latencia_s += latencia
+
+    @property
+    def total_chamadas(self) -> int:
+        return sum(self.chamadas.values())
+
+    def resumo(self) -> dict:
+        with self._lock:
+            return {
+                'chamadas': sum(self.chamadas.values()),
+                'por_metodo': dict(self.chamadas),
+                'bytes_enviados': self.bytes_enviados,
+                'bytes_recebidos': self.bytes_recebidos,
+                'latencia_s': round(self.latencia_s, 6),
+            }
+
+
+class ClienteSheetsFalso:
+    """
+    Substituto em processo do cliente gspread, para testes offline e benchmarks.
+
+    Implementa a mesma superfície que o SheetsHandler usa (open_by_url,
+    worksheets, worksheet, values_batch_get, batch_update, get_all_values,
+    update, clear, batch_clear, get_lastUpdateTime). Cada chamada que iria à
+    rede é contada em self.metricas.
+
+    Uso:
+        cliente = ClienteSheetsFalso(latencia=0.2)
+        cliente.criar_planilha(URL, {'2025': [cabecalho] + linhas})
+        handler.client = cliente          # no lugar de autenticar()
+        handler.carregar_planilha(URL)
+        cliente.metricas.resumo()
+
+    latencia (s por chamada) e bytes_por_segundo simulam a rede; com
+    dormir=True o tempo é de fato esperado, senão só é somado às métricas.
+    """
+
+    def __init__(self, latencia: float = 0.0, bytes_por_segundo: Optional[float] = None,
+                 dormir: bool = False):
+        self.latencia = latencia
+        self.bytes_por_segundo = bytes_por_segundo
+        self.dormir = dormir
+        self.metricas = MetricasSheets()
+        self._planilhas: Dict[str, 'PlanilhaFalsa'] = {}
+
+    def criar_planilha(self, url: str, abas: Dict[str, List[list]] = None,
+                       titulo: str = 'Planilha') -> 'PlanilhaFalsa':
+        # Montagem do cenário: não conta como chamada
+        planilha = PlanilhaFalsa(self, url, titulo, len(self._planilhas) + 1)
+        for nome, linhas in (abas or {}).items():
+            planilha._criar_aba(nome, linhas)
+        self._planilhas[url] = planilha
+        return planilha
+
+    def open_by_url(self, url: str) -> 'PlanilhaFalsa':
+        planilha = self._planilhas.get(url)
+        self._chamada('open_by_url', {'url': url}, planilha and planilha._metadados())
+        if planilha is None:
+            raise gspread.exceptions.SpreadsheetNotFound(url)
+        return planilha
+
+    def _chamada(self, metodo: str, enviado=None, recebido=None):
+        latencia = self.latencia
+        if self.bytes_por_segundo:
+            latencia += (_tamanho_json(enviado) + _tamanho_json(recebido)) / self.bytes_por_segundo
+
+        self.metricas.registrar(metodo, enviado, recebido, latencia)
+        if self.dormir and latencia > 0:
+            time.sleep(latencia)
+
+
+class PlanilhaFalsa:
+
+    def __init__(self, cliente: ClienteSheetsFalso, url: str, titulo: str, numero: int):
+        self._cliente = cliente
+        self.url = url
+        self.title = titulo
+        self.id = f"planilha-falsa-{numero}"
+        self._abas: Dict[str, 'AbaFalsa'] = {}
+        self._revisao = 1
+
+    # Superfície do gspread.Spreadsheet
+
+    def worksheets(self) -> list:
+        abas = list(self._abas.values())
+        self._cliente._chamada('worksheets', None, self._metadados())
+        return abas
+
+    def worksheet(self, titulo: str) -> 'AbaFalsa':
+        self._cliente._chamada('worksheet', {'title': titulo}, self._metadados())
+        if titulo not in self._abas:
+            raise gspread.exceptions.WorksheetNotFound(titulo)
+        return self._abas[titulo]
+
+    def add_worksheet(self, title: str, rows: int = 1000, cols: int = 26) -> 'AbaFalsa':
+        aba = self._criar_aba(title, [], rows, cols)
+        self._alterada()
+        self._cliente._chamada('add_worksheet', {'title': title, 'rows': rows, 'cols': cols},
+                               aba._metadados())
+        return aba
+
+    def get_lastUpdateTime(self) -> str:
+        # No Drive é o modifiedTime; aqui basta um valor que muda a cada escrita
+        revisao = f"revisao-{self._revisao}"
+        self._cliente._chamada('get_lastUpdateTime', None, revisao)
+        return revisao
+
+    def values_batch_get(self, ranges: List[str], params: dict = None) -> dict:
+        intervalos = []
+        for intervalo in ranges:
+            aba = self._aba_do_intervalo(intervalo)
+            intervalos.append({'range': intervalo, 'majorDimension': 'ROWS',
+                               'values': aba._valores_api()})
+
+        resposta = {'spreadsheetId': self.id, 'valueRanges': intervalos}
+        self._cliente._chamada('values_batch_get', {'ranges': ranges}, resposta)
+        return resposta
+
+    def batch_update(self, body: dict) -> dict:
+        respostas = []
+        for requisicao in body.get('requests', []):
+            if 'insertDimension' in requisicao:
+                self._inserir_dimensao(requisicao['insertDimension'])
+            elif 'deleteDimension' in requisicao:
+                self._remover_dimensao(requisicao['deleteDimension'])
+            elif 'updateCells' in requisicao:
+                self._atualizar_celulas(requisicao['updateCells'])
+            else:
+                raise NotImplementedError(f"Requisição não suportada: {list(requisicao)}")
+            respostas.append({})
+
+        self._alterada()
+        resposta = {'spreadsheetId': self.id, 'replies': respostas}
+        self._cliente._chamada('batch_update', body, resposta)
+        return resposta
+
+    # Requisições do batch_update
+
+    def _inserir_dimensao(self, pedido: dict):
+        intervalo = pedido['range']
+        aba = self._aba_por_id(intervalo['sheetId'])
+        if intervalo.get('dimension', 'ROWS') != 'ROWS':
+            raise NotImplementedError("Apenas inserção de linhas é suportada")
+
+        inicio, fim = intervalo['startIndex'], intervalo['endIndex']
+        aba._expandir(inicio)
+        aba._linhas[inicio:inicio] = [[] for _ in range(fim - inicio)]
+        aba.row_count += fim - inicio
+
+    def _remover_dimensao(self, pedido: dict):
+        intervalo = pedido['range']
+        aba = self._aba_por_id(intervalo['sheetId'])
+        inicio, fim = intervalo['startIndex'], intervalo['endIndex']
+        del aba._linhas[inicio:fim]
+        aba.row_count = max(aba.row_count - (fim - inicio), 0)
+
+    def _atualizar_celulas(self, pedido: dict):
+        inicio = pedido['start']
+        aba = self._aba_por_id(inicio['sheetId'])
+        linha_inicial = inicio.get('rowIndex', 0)
+        coluna_inicial = inicio.get('columnIndex', 0)
+
+        for deslocamento, linha in enumerate(pedido.get('rows', [])):
+            valores = [_valor_celula(celula) for celula in linha.get('values', [])]
+            aba._gravar(linha_inicial + deslocamento, coluna_inicial, valores)
+
+    # Auxiliares
+
+    def _criar_aba(self, titulo: str, linhas: List[list], rows: int = 1000, cols: int = 26) -> 'AbaFalsa':
+        aba = AbaFalsa(self, titulo, len(self._abas) + 1, linhas, rows, cols)
+        self._abas[titulo] = aba
+        return aba
+
+    def _aba_do_intervalo(self, intervalo: str) -> 'AbaFalsa':
+        # Só o nome da aba ("'2025'" ou "2025!A1:Z") importa: a aba inteira é devolvida
+        titulo = intervalo.split('!')[0].strip("'")
+        if titulo not in self._abas:
+            raise gspread.exceptions.WorksheetNotFound(titulo)
+        return self._abas[titulo]
+
+    def _aba_por_id(self, sheet_id: int) -> 'AbaFalsa':
+        for aba in self._abas.values():
+            if aba.id == sheet_id:
+                return aba
+        raise gspread.exceptions.WorksheetNotFound(str(sheet_id))
+
+    def _alterada(self):
+        self._revisao += 1
+
+    def _metadados(self) -> dict:
+        return {'spreadsheetId': self.id, 'properties': {'title': self.title},
+                'sheets': [aba._metadados() for aba in self._abas.values()]}
+
+
+class AbaFalsa:
+
+    def __init__(self, planilha: PlanilhaFalsa, titulo: str, sheet_id: int,
+                 linhas: List[list], rows: int, cols: int):
+        self._planilha = planilha
+        self.title = titulo
+        self.id = sheet_id
+        self._linhas = [[_texto(valor) for valor in linha] for linha in linhas]
+        self.row_count = max(rows, len(self._linhas))
+        self.col_count = max([cols] + [len(linha) for linha in self._linhas])
+
+    # Superfície do gspread.Worksheet
+
+    def get_all_values(self) -> List[list]:
+        valores = _preencher(self._valores_api())
+        self._planilha._cliente._chamada('get_all_values', {'range': self.title}, valores)
+        return valores
+
+    def update(self, values=None, range_name: str = None, **kwargs) -> dict:
+        # gspread < 6 recebia (range_name, values); a 6 aceita os dois
+        if isinstance(values, str):
+            values, range_name = range_name, values
+
+        linha, coluna = _celula_a1(range_name or 'A1')
+        self._gravar_bloco(linha, coluna, values)
+        self._planilha._alterada()
+
+        resposta = {'updatedRange': f"{self.title}!{range_name or 'A1'}",
+                    'updatedRows': len(values), 'updatedCells': sum(len(v) for v in values)}
+        self._planilha._cliente._chamada('update', {'range': range_name, 'values': values}, resposta)
+        return resposta
+
+    def clear(self) -> dict:
+        self._linhas = []
+        self._planilha._alterada()
+        self._planilha._cliente._chamada('clear', {'range': self.title}, {})
+        return {}
+
+    def batch_clear(self, ranges: List[str]) -> dict:
+        for intervalo in ranges:
+            self._limpar_intervalo(intervalo)
+
+        self._planilha._alterada()
+        self._planilha._cliente._chamada('batch_clear', {'ranges': ranges}, {})
+        return {}
+
+    def append_rows(self, values: List[list], **kwargs) -> dict:
+        self._gravar_bloco(len(self._valores_api()), 0, values)
+        self._planilha._alterada()
+        self._planilha._cliente._chamada('append_rows', {'values': values}, {})
+        return {}
+
+    def append_row(self, values: list, **kwargs) -> dict:
+        return self.append_rows([values], **kwargs)
+
+    # Auxiliares
+
+    def _valores_api(self) -> List[list]:
+        # A API omite células vazias no fim das linhas e linhas vazias no fim da aba
+        valores = [_sem_vazios_finais(linha) for linha in self._linhas]
+        while valores and not valores[-1]:
+            valores.pop()
+        return valores
+
+    def _expandir(self, linhas: int):
+        while len(self._linhas) < linhas:
+            self._linhas.append([])
+
+    def _gravar(self, linha: int, coluna: int, valores: list):
+        self._expandir(linha + 1)
+        atual = self._linhas[linha]
+        if len(atual) < coluna + len(valores):
+            atual.extend([''] * (coluna + len(valores) - len(atual)))
+        atual[coluna:coluna + len(valores)] = [_texto(valor) for valor in valores]
+        self.row_count = max(self.row_count, len(self._linhas))
+        self.col_count = max(self.col_count, len(atual))
+
+    def _gravar_bloco(self, linha: int, coluna: int, valores: List[list]):
+        for deslocamento, linha_valores in enumerate(valores):
+            self._gravar(linha + deslocamento, coluna, list(linha_valores))
+
+    def _limpar_intervalo(self, intervalo: str):
+        # Suporta linhas inteiras ("10:1000") e da linha até o fim da aba ("A10:AC"),
+        # o que o handler usa
+        correspondencia = (re.fullmatch(r"(?:.*!)?(\d+):(\d+)", intervalo)
+                           or re.fullmatch(r"(?:.*!)?A(\d+):[A-Za-z]+()", intervalo))
+        if not correspondencia:
+            raise NotImplementedError(f"Intervalo não suportado: {intervalo}")
+
+        inicio = int(correspondencia.group(1)) - 1
+        fim = int(correspondencia.group(2)) if correspondencia.group(2) else len(self._linhas)
+        for indice in range(inicio, min(fim, len(self._linhas))):
+            self._linhas[indice] = []
+
+    def _metadados(self) -> dict:
+        return {'properties': {'sheetId': self.id, 'title': self.title,
+                               'gridProperties': {'rowCount': self.row_count,
+                                                  'columnCount': self.col_count}}}
+
+
+def _tamanho_json(valor) -> int:
+    if valor is None:
+        return 0
+    return len(json.dumps(valor, ensure_ascii=False, default=str).encode('utf-8'))
+
+
+def _texto(valor) -> str:
+    # A API devolve os valores formatados como texto
+    if valor is None:
+        return ''
+    if isinstance(valor, float) and valor.is_integer():
+        return str(int(valor))
+    return str(valor)
+
+
+def _valor_celula(celula: dict) -> str:
+    valor = celula.get('userEnteredValue', {})
+    for chave in ('stringValue', 'numberValue', 'boolValue', 'formulaValue'):
+        if chave in valor:
+            return _texto(valor[chave])
+    return ''
+
+
+def _sem_vazios_finais(linha: list) -> list:
+    fim = len(linha)
+    while fim and linha[fim - 1] == '':
+        fim -= 1
+    return linha[:fim]
+
+
+def _preencher(valores: List[list]) -> List[list]:
+    # Como o get_all_values do gspread: linhas completadas até a maior largura
+    largura = max((len(linha) for linha in valores), default=0)
+    return [linha + [''] * (largura - len(linha)) for linha in valores]
+
+
+def _celula_a1(referencia: str) -> tuple:
+    # "A1" -> (0, 0); "C10" -> (9, 2)
+    referencia = referencia.split('!')[-1].split(':')[0]
+    correspondencia = re.fullmatch(r"([A-Za-z]+)(\d+)", referencia)
+    if not correspondencia:
+        raise NotImplementedError(f"Referência não suportada: {referencia}")
+
+    coluna = 0
+    for letra in correspondencia.group(1).upper():
+        coluna = coluna * 26 + (ord(letra) - ord('A') + 1)
+    return int(correspondencia.group(2)) - 1, coluna - 1
@@ -0,0 +1,107 @@
+"""
+Importa para o MySQL todos os registros de uma planilha Excel, Google Sheets
+ou base local (Parquet ou SQLite).
+
+Uso:
+    python importar_mysql.py --excel "C:\\caminho\\planilha.xlsx"
+    python importar_mysql.py --sheets URL --credenciais credenciais.json --lote 2000
+    python importar_mysql.py --parquet "C:\\caminho\\base"
+    python importar_mysql.py --sqlite "C:\\caminho\\base.sqlite3"
+    python importar_mysql.py --excel "C:\\caminho\\planilha.xlsx" --inicio 42000
+
+As credenciais do MySQL vêm do arquivo .env (mesmo usado pela aplicação).
+Cada lote é gravado numa transação: se a importação parar no meio, os lotes
+já gravados ficam no banco e a mensagem de erro informa o --inicio que
+continua a partir do registro seguinte (com a mesma origem, sem alterações).
+"""
+import argparse
+import os
+import sys
+
+from utils.database_handler import DatabaseHandler, TAMANHO_LOTE_PADRAO
+from utils.excel_handler import ExcelHandler
+from utils.sheets_handler import SheetsHandler
+from utils.parquet_handler import ParquetHandler
+from utils.sqlite_handler import SQLiteHandler
+
+
+def carregar_dataframe(args):
+    if args.excel:
+        # Só leitura: registros ainda no diário da aplicação já foram enviados ao MySQL por ela
+        handler = ExcelHandler(usar_diario=False)
+        sucesso, msg = handler.carregar_arquivo(args.excel)
+    elif args.parquet:
+        handler = ParquetHandler()
+        sucesso, msg = handler.carregar_pasta(args.parquet)
+    elif args.sqlite:
+        if not os.path.exists(args.sqlite):
+            print(f"Arquivo nao encontrado: {args.sqlite}")
+            return None
+        handler = SQLiteHandler()
+        sucesso, msg = handler.carregar_banco(args.sqlite)
+    else:
+        handler = SheetsHandler(args.credenciais, args.sheets)
+        sucesso, msg = handler.autenticar()
+        if sucesso:
+            sucesso, msg = handler.carregar_planilha()
+
+    print(msg)
+    return handler.obter_dataframe() if sucesso else None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Importacao em massa para o MySQL")
+    origem = parser.add_mutually_exclusive_group(required=True)
+    origem.add_argument('--excel', help="Arquivo .xlsx de origem")
+    origem.add_argument('--sheets', help="URL da planilha do Google Sheets de origem")
+    origem.add_argument('--parquet', help="Pasta da base local Parquet de origem")
+    origem.add_argument('--sqlite', help="Arquivo da base local SQLite de origem")
+    parser.add_argument('--credenciais', help="Arquivo JSON da conta de servico (Google Sheets)")
+    parser.add_argument('--lote', type=int, default=TAMANHO_LOTE_PADRAO,
+                        help=f"Registros por lote/transacao (padrao: {TAMANHO_LOTE_PADRAO})")
+    parser.add_argument('--inicio', type=int, default=0,
+                        help="Registros ja gravados numa importacao interrompida (pula os primeiros N)")
+    args = parser.parse_args()
+
+    if args.sheets and not args.credenciais:
+        parser.error("--credenciais e obrigatorio com --sheets")
+    if args.lote < 1:
+        parser.error("--lote deve ser maior que zero")
+    if args.inicio < 0:
+        parser.error("--inicio nao pode ser negativo")
+
+    df = carregar_dataframe(args)
+    if df is None:
+        return 1
+
+    try:
+        db_handler = DatabaseHandler()
+    except ValueError as e:
+        print(f"ERRO: {e}")
+        return 1
+
+    # Registros já gravados (commit feito): de onde uma nova execução deve continuar
+    gravados = [args.inicio]
+
+    def progresso(importados, total):
+        gravados[0] = importados
+        print(f"  {importados}/{total} registros")
+
+    print(f"Importando {len(df) - args.inicio} registros em lotes de {args.lote}...")
+    sucesso, msg = db_handler.importar_dataframe(df, tamanho_lote=args.lote, progresso=progresso,
+                                                 inicio=args.inicio)
+    db_handler.desconectar()
+
+    if sucesso:
+        print(msg)
+        return 0
+
+    print(f"ERRO: {msg}")
+    if gravados[0] > args.inicio:
+        print(f"Os primeiros {gravados[0]} registros ja estao no MySQL. "
+              f"Para continuar sem duplica-los: --inicio {gravados[0]}")
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
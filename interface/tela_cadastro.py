@@ -10,14 +10,25 @@ from typing import Tuple
 from utils.dados_estaticos import (COLORS, TIPO_ACIDENTE, NATUREZA_LAUDO, SEXO,
                                    POSSUI_CNH, CONDUTOR, EXAME_ALCOOLEMIA,
                                    USANDO_CAPACETE, SUBTIPO_LOCAL, VEICULOS_VITIMA,
-                                   VEICULOS_ENVOLVIDO, REGIAO)
+                                   VEICULOS_ENVOLVIDO, REGIAO, COLUNAS_OCORRENCIA)
 from utils.calculos import calcular_idade, obter_dia_semana, obter_mes
 from utils.validacoes import validar_cpf, campos_obrigatorios_preenchidos
 
 
+# Combos preenchidos com os valores já existentes na planilha (campo -> coluna)
+COMBOS_DINAMICOS = {
+    'municipio': 'Município do Fato',
+    'natureza_ocorrencia': 'Natureza da Ocorrência',
+    'local_morte': 'Local da Morte',
+    'territorio': 'Território de\nDesenvolvimento',
+}
+
+
 class TelaCadastro(QWidget):
 
     cadastro_finalizado = pyqtSignal(dict)
+    # Ocorrência com várias vítimas: um registro por vítima
+    ocorrencia_finalizada = pyqtSignal(list)
     voltar_solicitado = pyqtSignal()
 
     def __init__(self, excel_handler):
@@ -25,6 +36,7 @@ class TelaCadastro(QWidget):
         self.excel_handler = excel_handler
         self.campos = {}
         self.dados_dinamicos = {}
+        self.vitimas_adicionadas = []  # Vítimas já preenchidas da ocorrência atual
         self.init_ui()
         self.carregar_dados_dinamicos()
         self.conectar_signals()
@@ -149,6 +161,18 @@ class TelaCadastro(QWidget):
 
         botoes_layout.addStretch()
 
+        self.label_vitimas = QLabel()
+        self.label_vitimas.setStyleSheet(f"color: {COLORS['secondary']}; font-weight: bold;")
+        self.label_vitimas.hide()
+        botoes_layout.addWidget(self.label_vitimas)
+
+        btn_adicionar_vitima = QPushButton("Adicionar Outra Vitima")
+        btn_adicionar_vitima.setStyleSheet(self.estilo_botao(COLORS['secondary']))
+        btn_adicionar_vitima.setToolTip("Guarda esta vitima e limpa apenas os dados da vitima, "
+                                        "mantendo os dados da ocorrencia")
+        btn_adicionar_vitima.clicked.connect(self.adicionar_vitima)
+        botoes_layout.addWidget(btn_adicionar_vitima)
+
         btn_finalizar = QPushButton("Finalizar e Salvar")
         btn_finalizar.setStyleSheet(self.estilo_botao(COLORS['success']))
         btn_finalizar.clicked.connect(self.finalizar_cadastro)
@@ -502,24 +526,21 @@ class TelaCadastro(QWidget):
     # METODOS AUXILIARES
 
     def carregar_dados_dinamicos(self):
-        self.dados_dinamicos = {
-            'municipios': self.excel_handler.obter_valores_unicos('Município do Fato'),
-            'natureza_ocorrencia': self.excel_handler.obter_valores_unicos('Natureza da Ocorrência'),
-            'locais_morte': self.excel_handler.obter_valores_unicos('Local da Morte'),
-            'territorios': self.excel_handler.obter_valores_unicos('Território de\nDesenvolvimento')
-        }
-
-        if self.dados_dinamicos['municipios']:
-            self.campos['municipio'].addItems(self.dados_dinamicos['municipios'])
-
-        if self.dados_dinamicos['natureza_ocorrencia']:
-            self.campos['natureza_ocorrencia'].addItems(self.dados_dinamicos['natureza_ocorrencia'])
-
-        if self.dados_dinamicos['locais_morte']:
-            self.campos['local_morte'].addItems(self.dados_dinamicos['locais_morte'])
-
-        if self.dados_dinamicos['territorios']:
-            self.campos['territorio'].addItems(self.dados_dinamicos['territorios'])
+        # Só recria os itens dos combos cujos valores mudaram (ex.: município novo)
+        for campo, coluna in COMBOS_DINAMICOS.items():
+            valores = self.excel_handler.obter_valores_unicos(coluna)
+            if valores == self.dados_dinamicos.get(campo):
+                continue
+
+            self.dados_dinamicos[campo] = valores
+            self.campos[campo].clear()
+            self.campos[campo].addItems(valores)
+
+    def preparar_novo_registro(self):
+        # Reaproveita o formulário já montado para o próximo registro
+        self.carregar_dados_dinamicos()
+        self.resetar_campos()
+        self.tabs.setCurrentIndex(0)
 
     def conectar_signals(self):
         self.campos['data_nascimento'].dateChanged.connect(self.atualizar_idade)
@@ -602,7 +623,32 @@ class TelaCadastro(QWidget):
             return
 
         dados = self.obter_dados_formulario()
-        self.cadastro_finalizado.emit(dados)
+        if not self.vitimas_adicionadas:
+            self.cadastro_finalizado.emit(dados)
+            return
+
+        # Os dados da ocorrência valem como estão agora no formulário para todas as vítimas
+        ocorrencia = {coluna: dados[coluna] for coluna in COLUNAS_OCORRENCIA}
+        vitimas = [{**vitima, **ocorrencia} for vitima in self.vitimas_adicionadas] + [dados]
+        self.ocorrencia_finalizada.emit(vitimas)
+
+    def adicionar_vitima(self):
+        valido, mensagem = self.validar_formulario()
+
+        if not valido:
+            QMessageBox.warning(self, "Validacao", mensagem)
+            return
+
+        self.vitimas_adicionadas.append(self.obter_dados_formulario())
+        self.resetar_campos_vitima()
+        self.atualizar_label_vitimas()
+        self.tabs.setCurrentIndex(2)  # Aba Vitima
+        self.campos['vitima'].setFocus()
+
+    def atualizar_label_vitimas(self):
+        quantidade = len(self.vitimas_adicionadas)
+        self.label_vitimas.setText(f"{quantidade} vitima(s) adicionada(s)")
+        self.label_vitimas.setVisible(quantidade > 0)
 
     def limpar_formulario(self):
         resposta = QMessageBox.question(
@@ -613,32 +659,49 @@ class TelaCadastro(QWidget):
         )
 
         if resposta == QMessageBox.StandardButton.Yes:
-            self.campos['tipo_acidente'].setCurrentIndex(0)
-            self.campos['n_laudo'].setText("")
-            self.campos['natureza_laudo'].setCurrentIndex(0)
-            self.campos['data_obito'].setDate(QDate.currentDate())
-            self.campos['vitima'].setText("")
-            self.campos['sexo'].setCurrentIndex(0)
-            self.campos['filiacao'].setText("")
-            self.campos['data_nascimento'].setDate(QDate(2000, 1, 1))
-            self.campos['cpf'].setText("")
-            self.campos['possui_cnh'].setCurrentIndex(0)
-            self.campos['condutor'].setCurrentIndex(0)
-            self.campos['exame_alcoolemia'].setCurrentIndex(0)
-            self.campos['usando_capacete'].setCurrentIndex(0)
-            self.campos['municipio'].setCurrentIndex(0)
-            self.campos['logradouro'].clear()
-            self.campos['subtipo_local'].setCurrentIndex(0)
-            self.campos['latitude'].setValue(0.0)
-            self.campos['longitude'].setValue(0.0)
-            self.campos['data_fato'].setDate(QDate.currentDate())
-            self.campos['hora_fato'].setTime(QTime(12, 0))
-            self.campos['local_morte'].setCurrentIndex(0)
-            self.campos['veiculo_vitima'].setCurrentIndex(0)
-            self.campos['veiculo_envolvido'].setCurrentIndex(0)
-            self.campos['regiao'].setCurrentIndex(0)
-            self.campos['territorio'].setCurrentIndex(0)
-            self.campos['obs'].clear()
+            self.resetar_campos()
+
+    def resetar_campos(self):
+        self.vitimas_adicionadas = []
+        self.atualizar_label_vitimas()
+
+        self.resetar_combo(self.campos['natureza_ocorrencia'])
+        self.campos['tipo_acidente'].setCurrentIndex(0)
+        self.resetar_combo(self.campos['municipio'])
+        self.campos['logradouro'].clear()
+        self.campos['subtipo_local'].setCurrentIndex(0)
+        self.campos['latitude'].setValue(0.0)
+        self.campos['longitude'].setValue(0.0)
+        self.campos['data_fato'].setDate(QDate.currentDate())
+        self.campos['hora_fato'].setTime(QTime(12, 0))
+        self.campos['regiao'].setCurrentIndex(0)
+        self.resetar_combo(self.campos['territorio'])
+        self.campos['obs'].clear()
+        self.resetar_campos_vitima()
+
+    def resetar_campos_vitima(self):
+        # Campos próprios de cada vítima (os da ocorrência são mantidos)
+        self.campos['n_laudo'].setText("")
+        self.campos['natureza_laudo'].setCurrentIndex(0)
+        self.campos['data_obito'].setDate(QDate.currentDate())
+        self.campos['vitima'].setText("")
+        self.campos['sexo'].setCurrentIndex(0)
+        self.campos['filiacao'].setText("")
+        self.campos['data_nascimento'].setDate(QDate(2000, 1, 1))
+        self.campos['cpf'].setText("")
+        self.campos['possui_cnh'].setCurrentIndex(0)
+        self.campos['condutor'].setCurrentIndex(0)
+        self.campos['exame_alcoolemia'].setCurrentIndex(0)
+        self.campos['usando_capacete'].setCurrentIndex(0)
+        self.resetar_combo(self.campos['local_morte'])
+        self.campos['veiculo_vitima'].setCurrentIndex(0)
+        self.campos['veiculo_envolvido'].setCurrentIndex(0)
+
+    def resetar_combo(self, combo):
+        # Combo editável sem itens guarda o texto digitado: limpa também o texto
+        combo.setCurrentIndex(0)
+        if combo.count() == 0:
+            combo.clearEditText()
 
     def voltar(self):
         self.voltar_solicitado.emit()
@@ -14,12 +14,14 @@ class TelaConfirmacao(QWidget):
     cadastrar_outro = pyqtSignal()  # Para voltar ao formulário
     fechar_aplicacao = pyqtSignal()  # Para fechar a aplicação
 
-    def __init__(self, excel_handler, dados_inseridos, posicao_inserida, msg_db=None):
+    def __init__(self, excel_handler, dados_inseridos, posicao_inserida=None, msg_db=None):
         super().__init__()
         self.excel_handler = excel_handler
-        self.dados_inseridos = dados_inseridos
-        self.posicao_inserida = posicao_inserida
-        self.msg_db = msg_db  # Status da sincronizacao com PostgreSQL
+        # Um registro (dict) ou as vítimas de uma mesma ocorrência (lista)
+        self.vitimas = dados_inseridos if isinstance(dados_inseridos, list) else [dados_inseridos]
+        self.dados_inseridos = self.vitimas[0]
+        self.posicao_inserida = posicao_inserida  # None enquanto a planilha está sendo gravada
+        self.msg_db = msg_db  # Status da sincronizacao com MySQL
         self.arquivo_salvo = None
         self.init_ui()
 
@@ -40,22 +42,24 @@ class TelaConfirmacao(QWidget):
         """)
         frame_layout = QVBoxLayout()
 
-        icone_sucesso = QLabel("✅")
-        icone_sucesso.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        self.icone_sucesso = QLabel("✅")
+        self.icone_sucesso.setAlignment(Qt.AlignmentFlag.AlignCenter)
         icone_font = QFont()
         icone_font.setPointSize(48)
-        icone_sucesso.setFont(icone_font)
-        frame_layout.addWidget(icone_sucesso)
+        self.icone_sucesso.setFont(icone_font)
+        frame_layout.addWidget(self.icone_sucesso)
 
-        msg_sucesso = QLabel("Registro inserido com sucesso!")
-        msg_sucesso.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        self.msg_sucesso = QLabel("Registro inserido com sucesso!")
+        self.msg_sucesso.setAlignment(Qt.AlignmentFlag.AlignCenter)
         msg_font = QFont()
         msg_font.setPointSize(18)
         msg_font.setBold(True)
-        msg_sucesso.setFont(msg_font)
-        msg_sucesso.setStyleSheet(f"color: {COLORS['success']};")
-        frame_layout.addWidget(msg_sucesso)
+        self.msg_sucesso.setFont(msg_font)
+        self.msg_sucesso.setStyleSheet(f"color: {COLORS['success']};")
+        self.msg_sucesso.setWordWrap(True)
+        frame_layout.addWidget(self.msg_sucesso)
 
+        self.frame_sucesso = frame_sucesso
         frame_sucesso.setLayout(frame_layout)
         layout.addWidget(frame_sucesso)
 
@@ -71,29 +75,22 @@ class TelaConfirmacao(QWidget):
         """)
         info_layout = QVBoxLayout()
 
-        if self.posicao_inserida > 0:
-            label_posicao = QLabel(f"📍 Nova linha inserida na posição {self.posicao_inserida}")
-            label_posicao.setStyleSheet("font-size: 13px; color: #2C3E50;")
-            info_layout.addWidget(label_posicao)
+        self.label_posicao = QLabel()
+        self.label_posicao.setStyleSheet("font-size: 13px; color: #2C3E50;")
+        info_layout.addWidget(self.label_posicao)
 
-        info_arquivo = self.excel_handler.obter_info_arquivo()
-        label_total = QLabel(f"📊 Planilha agora possui {info_arquivo['total_registros']} registros")
-        label_total.setStyleSheet("font-size: 13px; color: #2C3E50; font-weight: bold;")
-        info_layout.addWidget(label_total)
-
-        label_ordenado = QLabel("✓ Registro inserido ordenado por Data do Fato")
-        label_ordenado.setStyleSheet("font-size: 12px; color: #7F8C8D; font-style: italic;")
-        info_layout.addWidget(label_ordenado)
-
-        # Status do PostgreSQL (se disponivel)
-        if self.msg_db:
-            if "Sincronizado" in self.msg_db:
-                label_db = QLabel(f"🗄️ {self.msg_db}")
-                label_db.setStyleSheet("font-size: 12px; color: #27AE60; font-weight: bold;")
-            else:
-                label_db = QLabel(f"⚠️ {self.msg_db}")
-                label_db.setStyleSheet("font-size: 12px; color: #E67E22;")
-            info_layout.addWidget(label_db)
+        self.label_total = QLabel()
+        self.label_total.setStyleSheet("font-size: 13px; color: #2C3E50; font-weight: bold;")
+        info_layout.addWidget(self.label_total)
+
+        self.label_ordenado = QLabel("✓ Registro inserido ordenado por Data do Fato")
+        self.label_ordenado.setStyleSheet("font-size: 12px; color: #7F8C8D; font-style: italic;")
+        info_layout.addWidget(self.label_ordenado)
+
+        # Status do MySQL (se disponivel)
+        self.label_db = QLabel()
+        self.label_db.setWordWrap(True)
+        info_layout.addWidget(self.label_db)
 
         info_frame.setLayout(info_layout)
         layout.addWidget(info_frame)
@@ -112,6 +109,74 @@ class TelaConfirmacao(QWidget):
         self.setLayout(layout)
         self.setStyleSheet(f"background-color: {COLORS['background']};")
 
+        if self.posicao_inserida is None:
+            self.mostrar_gravacao_pendente()
+        else:
+            self.atualizar_planilha(True, "", self.posicao_inserida)
+        self.atualizar_mysql(self.msg_db)
+
+    def mostrar_gravacao_pendente(self):
+        self.icone_sucesso.setText("🕓")
+        self.msg_sucesso.setText(f"Gravando {self.descricao_registros()} na planilha...")
+        self.msg_sucesso.setStyleSheet(f"color: {COLORS['secondary']};")
+        self.label_posicao.hide()
+        self.label_total.hide()
+        self.label_ordenado.hide()
+        self.btn_baixar.setEnabled(False)
+
+    def atualizar_planilha(self, sucesso: bool, mensagem: str, posicao: int):
+        # Chamado quando a gravação em segundo plano termina
+        self.posicao_inserida = posicao
+
+        if not sucesso:
+            self.icone_sucesso.setText("❌")
+            self.msg_sucesso.setText(f"Erro ao inserir {self.descricao_registros()} na planilha:\n{mensagem}")
+            self.msg_sucesso.setStyleSheet(f"color: {COLORS['danger']};")
+            self.frame_sucesso.setStyleSheet(f"""
+                QFrame {{
+                    background-color: #FADBD8;
+                    border: 2px solid {COLORS['danger']};
+                    border-radius: 10px;
+                    padding: 20px;
+                }}
+            """)
+            return
+
+        self.icone_sucesso.setText("✅")
+        if len(self.vitimas) == 1:
+            self.msg_sucesso.setText("Registro inserido com sucesso!")
+            self.label_posicao.setText(f"📍 Nova linha inserida na posição {posicao}")
+        else:
+            self.msg_sucesso.setText(f"{len(self.vitimas)} registros inseridos com sucesso!")
+            self.label_posicao.setText(f"📍 {len(self.vitimas)} novas linhas a partir da posição {posicao}")
+        self.msg_sucesso.setStyleSheet(f"color: {COLORS['success']};")
+
+        self.label_posicao.setVisible(posicao > 0)
+
+        info_arquivo = self.excel_handler.obter_info_arquivo()
+        self.label_total.setText(f"📊 Planilha agora possui {info_arquivo['total_registros']} registros")
+        self.label_total.show()
+        self.label_ordenado.show()
+        self.btn_baixar.setEnabled(True)
+
+    def atualizar_mysql(self, msg_db: str):
+        self.msg_db = msg_db
+
+        if not msg_db:
+            self.label_db.hide()
+            return
+
+        if "Sincronizado" in msg_db:
+            self.label_db.setText(f"🗄️ {msg_db}")
+            self.label_db.setStyleSheet("font-size: 12px; color: #27AE60; font-weight: bold;")
+        elif "fila" in msg_db or "Aguardando" in msg_db:
+            self.label_db.setText(f"🕓 {msg_db}")
+            self.label_db.setStyleSheet(f"font-size: 12px; color: {COLORS['secondary']};")
+        else:
+            self.label_db.setText(f"⚠️ {msg_db}")
+            self.label_db.setStyleSheet("font-size: 12px; color: #E67E22;")
+        self.label_db.show()
+
     def criar_preview_tabela(self, layout):
         tabela = QTableWidget()
         tabela.setColumnCount(2)
@@ -121,14 +186,19 @@ class TelaConfirmacao(QWidget):
 
         # Campos principais para mostrar no preview
         campos_preview = [
-            ('Vitima', self.dados_inseridos.get('Vítima', '')),
+            ('Vitima', ', '.join(vitima.get('Vítima', '') for vitima in self.vitimas)),
             ('Data do Fato', self.formatar_data(self.dados_inseridos.get('Data do Fato'))),
             ('Hora do Fato', self.dados_inseridos.get('Hora do fato', '')),
             ('Municipio', self.dados_inseridos.get('Município do Fato', '')),
             ('Tipo de Acidente', self.dados_inseridos.get('Tipo de Acidente', '')),
-            ('Sexo', self.dados_inseridos.get('Sexo', '')),
-            ('Idade', str(self.dados_inseridos.get('Idade', '')) if self.dados_inseridos.get('Idade') else 'N/A'),
         ]
+        if len(self.vitimas) == 1:
+            campos_preview += [
+                ('Sexo', self.dados_inseridos.get('Sexo', '')),
+                ('Idade', str(self.dados_inseridos.get('Idade', '')) if self.dados_inseridos.get('Idade') else 'N/A'),
+            ]
+        else:
+            campos_preview.append(('Vitimas', str(len(self.vitimas))))
 
         tabela.setRowCount(len(campos_preview))
 
@@ -187,6 +257,7 @@ class TelaConfirmacao(QWidget):
         """)
         btn_baixar.clicked.connect(self.baixar_planilha)
         botoes_layout.addWidget(btn_baixar)
+        self.btn_baixar = btn_baixar
 
         # Botão Fechar
         btn_fechar = QPushButton("✕ Fechar")
@@ -211,6 +282,11 @@ class TelaConfirmacao(QWidget):
 
         layout.addLayout(botoes_layout)
 
+    def descricao_registros(self) -> str:
+        if len(self.vitimas) == 1:
+            return "registro"
+        return f"{len(self.vitimas)} registros"
+
     def formatar_data(self, data):
         if data:
             try:
@@ -1,11 +1,12 @@
 from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel,
                              QPushButton, QFileDialog, QMessageBox, QFrame,
-                             QLineEdit, QDialog, QDialogButtonBox, QFormLayout)
+                             QLineEdit, QDialog, QDialogButtonBox, QFormLayout,
+                             QProgressDialog)
 from PyQt6.QtCore import Qt, pyqtSignal
 from PyQt6.QtGui import QFont
-from utils.excel_handler import ExcelHandler
-from utils.sheets_handler import SheetsHandler
+from interface.trabalhadores import TrabalhadorCarregamento
 from utils.dados_estaticos import COLORS
+from utils.parquet_handler import pyarrow_disponivel
 
 
 class TelaSelecaoModo(QWidget):
@@ -13,9 +14,12 @@ class TelaSelecaoModo(QWidget):
     # Signals
     modo_excel_selecionado = pyqtSignal(object)  # Emite ExcelHandler
     modo_sheets_selecionado = pyqtSignal(object)  # Emite SheetsHandler
+    modo_parquet_selecionado = pyqtSignal(object)  # Emite ParquetHandler
+    modo_sqlite_selecionado = pyqtSignal(object)  # Emite SQLiteHandler
 
     def __init__(self):
         super().__init__()
+        self._trabalhador_carregamento = None
         self.init_ui()
 
     def init_ui(self):
@@ -89,6 +93,57 @@ class TelaSelecaoModo(QWidget):
         btn_sheets.clicked.connect(self.conectar_sheets)
         layout.addWidget(btn_sheets)
 
+        # Espaçador
+        layout.addSpacing(20)
+
+        # Botão Parquet
+        btn_parquet = QPushButton("🗄️ BASE PARQUET")
+        btn_parquet.setMinimumHeight(80)
+        btn_parquet.setStyleSheet(f"""
+            QPushButton {{
+                background-color: {COLORS['primary']};
+                color: white;
+                border: none;
+                border-radius: 10px;
+                font-size: 18px;
+                font-weight: bold;
+                padding: 20px;
+            }}
+            QPushButton:hover {{
+                background-color: #34495E;
+            }}
+        """)
+        btn_parquet.clicked.connect(self.selecionar_parquet)
+
+        # O pyarrow é opcional (não vai no executável): sem ele o modo Parquet não aparece
+        btn_parquet.setVisible(pyarrow_disponivel())
+
+        # Botão SQLite
+        btn_sqlite = QPushButton("💾 BANCO SQLITE")
+        btn_sqlite.setMinimumHeight(80)
+        btn_sqlite.setStyleSheet(f"""
+            QPushButton {{
+                background-color: {COLORS['primary']};
+                color: white;
+                border: none;
+                border-radius: 10px;
+                font-size: 18px;
+                font-weight: bold;
+                padding: 20px;
+            }}
+            QPushButton:hover {{
+                background-color: #34495E;
+            }}
+        """)
+        btn_sqlite.clicked.connect(self.selecionar_sqlite)
+
+        # Bases locais lado a lado
+        layout_bases = QHBoxLayout()
+        layout_bases.setSpacing(20)
+        layout_bases.addWidget(btn_parquet)
+        layout_bases.addWidget(btn_sqlite)
+        layout.addLayout(layout_bases)
+
         # Espaçador
         layout.addStretch(1)
 
@@ -113,18 +168,132 @@ class TelaSelecaoModo(QWidget):
             self.carregar_excel(arquivo)
 
     def carregar_excel(self, caminho: str):
-        handler = ExcelHandler()
-        sucesso, mensagem = handler.carregar_arquivo(caminho)
+        resultado = {}
 
-        if sucesso:
-            self.modo_excel_selecionado.emit(handler)
-        else:
-            msg_box = QMessageBox(self)
-            msg_box.setIcon(QMessageBox.Icon.Critical)
-            msg_box.setWindowTitle("Erro ao Carregar")
-            msg_box.setText(mensagem)
-            msg_box.setStyleSheet("QLabel { color: black; } QPushButton { color: black; }")
-            msg_box.exec()
+        def tarefa(progresso, cancelado):
+            # Importado na thread do carregamento (pandas/openpyxl só quando necessários)
+            from utils.excel_handler import ExcelHandler
+            resultado['handler'] = ExcelHandler()
+            return resultado['handler'].carregar_arquivo(caminho, progresso, cancelado)
+
+        def ao_concluir(sucesso, mensagem):
+            if sucesso:
+                self.modo_excel_selecionado.emit(resultado['handler'])
+            else:
+                self.mostrar_mensagem(QMessageBox.Icon.Critical, "Erro ao Carregar", mensagem)
+
+        self.iniciar_carregamento("Carregando planilha Excel...", tarefa, ao_concluir)
+
+    def selecionar_parquet(self):
+        msg_box = QMessageBox(self)
+        msg_box.setIcon(QMessageBox.Icon.Question)
+        msg_box.setWindowTitle("Base Local Parquet")
+        msg_box.setText("Abrir uma base existente ou criar uma nova a partir de uma planilha Excel?")
+        msg_box.setStyleSheet("QLabel { color: black; } QPushButton { color: black; }")
+        btn_abrir = msg_box.addButton("Abrir Base", QMessageBox.ButtonRole.AcceptRole)
+        btn_criar = msg_box.addButton("Criar a partir do Excel", QMessageBox.ButtonRole.ActionRole)
+        msg_box.addButton(QMessageBox.StandardButton.Cancel)
+        msg_box.exec()
+
+        if msg_box.clickedButton() == btn_abrir:
+            pasta = QFileDialog.getExistingDirectory(self, "Selecionar Pasta da Base Parquet")
+            if pasta:
+                self.carregar_parquet(pasta)
+
+        elif msg_box.clickedButton() == btn_criar:
+            arquivo, _ = QFileDialog.getOpenFileName(
+                self,
+                "Selecionar Planilha Excel de Origem",
+                "",
+                "Arquivos Excel (*.xlsx);;Todos os arquivos (*.*)"
+            )
+            if not arquivo:
+                return
+
+            pasta = QFileDialog.getExistingDirectory(self, "Selecionar Pasta da Nova Base")
+            if pasta:
+                self.carregar_parquet(pasta, arquivo)
+
+    def carregar_parquet(self, pasta: str, caminho_excel: str = None):
+        resultado = {}
+
+        def tarefa(progresso, cancelado):
+            # Importado na thread do carregamento (pandas/pyarrow só quando necessários)
+            from utils.parquet_handler import ParquetHandler
+            handler = resultado['handler'] = ParquetHandler()
+            if caminho_excel:
+                return handler.importar_excel(caminho_excel, pasta, progresso, cancelado)
+            return handler.carregar_pasta(pasta, progresso, cancelado)
+
+        def ao_concluir(sucesso, mensagem):
+            if sucesso:
+                self.modo_parquet_selecionado.emit(resultado['handler'])
+            else:
+                self.mostrar_mensagem(QMessageBox.Icon.Critical, "Erro ao Carregar", mensagem)
+
+        texto = "Criando base Parquet..." if caminho_excel else "Carregando base Parquet..."
+        self.iniciar_carregamento(texto, tarefa, ao_concluir)
+
+    def selecionar_sqlite(self):
+        msg_box = QMessageBox(self)
+        msg_box.setIcon(QMessageBox.Icon.Question)
+        msg_box.setWindowTitle("Banco Local SQLite")
+        msg_box.setText("Abrir um banco existente ou criar um novo a partir de uma planilha Excel?")
+        msg_box.setStyleSheet("QLabel { color: black; } QPushButton { color: black; }")
+        btn_abrir = msg_box.addButton("Abrir Banco", QMessageBox.ButtonRole.AcceptRole)
+        btn_criar = msg_box.addButton("Criar a partir do Excel", QMessageBox.ButtonRole.ActionRole)
+        msg_box.addButton(QMessageBox.StandardButton.Cancel)
+        msg_box.exec()
+
+        if msg_box.clickedButton() == btn_abrir:
+            # Um arquivo inexistente também é aceito: o banco é criado vazio
+            arquivo, _ = QFileDialog.getSaveFileName(
+                self,
+                "Selecionar Banco SQLite",
+                "",
+                "Banco SQLite (*.sqlite3 *.db);;Todos os arquivos (*.*)",
+                options=QFileDialog.Option.DontConfirmOverwrite
+            )
+            if arquivo:
+                self.carregar_sqlite(arquivo)
+
+        elif msg_box.clickedButton() == btn_criar:
+            arquivo_excel, _ = QFileDialog.getOpenFileName(
+                self,
+                "Selecionar Planilha Excel de Origem",
+                "",
+                "Arquivos Excel (*.xlsx);;Todos os arquivos (*.*)"
+            )
+            if not arquivo_excel:
+                return
+
+            arquivo, _ = QFileDialog.getSaveFileName(
+                self,
+                "Salvar Novo Banco SQLite",
+                "",
+                "Banco SQLite (*.sqlite3)"
+            )
+            if arquivo:
+                self.carregar_sqlite(arquivo, arquivo_excel)
+
+    def carregar_sqlite(self, caminho_banco: str, caminho_excel: str = None):
+        resultado = {}
+
+        def tarefa(progresso, cancelado):
+            from utils.sqlite_handler import SQLiteHandler
+            handler = resultado['handler'] = SQLiteHandler()
+            if caminho_excel:
+                return handler.importar_excel(caminho_excel, caminho_banco, progresso, cancelado)
+            return handler.carregar_banco(caminho_banco, progresso, cancelado)
+
+        def ao_concluir(sucesso, mensagem):
+            if sucesso:
+                self.modo_sqlite_selecionado.emit(resultado['handler'])
+            else:
+                self.mostrar_mensagem(QMessageBox.Icon.Critical, "Erro ao Carregar", mensagem)
+
+        texto = "Criando banco SQLite..." if caminho_excel else "Abrindo banco SQLite..."
+        self.iniciar_carregamento(texto, tarefa, ao_concluir)
 
     def conectar_sheets(self):
         dialog = DialogSheetsConfig(self)
@@ -133,62 +302,87 @@ class TelaSelecaoModo(QWidget):
             self.carregar_sheets(credentials_path, spreadsheet_url)
 
     def carregar_sheets(self, credentials_path: str, spreadsheet_url: str):
-        # Mostra mensagem de carregamento
-        from PyQt6.QtWidgets import QProgressDialog
-        from PyQt6.QtCore import Qt
+        etapa = {'titulo_erro': "Erro ao Carregar Planilha"}
+
+        def tarefa(progresso, cancelado):
+            # Importado na thread do carregamento (gspread/google-auth só quando necessários)
+            from utils.sheets_handler import SheetsHandler
+            handler = etapa['handler'] = SheetsHandler(credentials_path, spreadsheet_url)
+
+            # Autentica
+            progresso(0, 0, "Autenticando com Google...")
+            sucesso_auth, msg_auth = handler.autenticar()
+            if not sucesso_auth:
+                etapa['titulo_erro'] = "Erro de Autenticação"
+                return False, msg_auth
+
+            if cancelado():
+                return False, "Carregamento cancelado."
+
+            # Carrega planilha (progresso por aba de ano)
+            progresso(0, 0, "Carregando planilha...")
+            return handler.carregar_planilha(progresso=progresso, cancelado=cancelado)
 
-        progress = QProgressDialog("Conectando ao Google Sheets...", None, 0, 0, self)
+        def ao_concluir(sucesso, mensagem):
+            if sucesso:
+                self.mostrar_mensagem(QMessageBox.Icon.Information, "Conexão Estabelecida",
+                                      f"Conectado com sucesso!\n\n{mensagem}")
+                self.modo_sheets_selecionado.emit(etapa['handler'])
+            else:
+                self.mostrar_mensagem(QMessageBox.Icon.Critical, etapa['titulo_erro'], mensagem)
+
+        self.iniciar_carregamento("Conectando ao Google Sheets...", tarefa, ao_concluir)
+
+    def iniciar_carregamento(self, texto: str, tarefa, ao_concluir):
+        # O carregamento roda numa thread; a janela continua respondendo e pode cancelar
+        progress = QProgressDialog(texto, "Cancelar", 0, 0, self)
         progress.setWindowTitle("Aguarde")
         progress.setWindowModality(Qt.WindowModality.WindowModal)
-        progress.setCancelButton(None)
         progress.setMinimumDuration(0)
+        progress.setAutoClose(False)
+        progress.setAutoReset(False)
         progress.setValue(0)
-        progress.show()
 
-        try:
-            handler = SheetsHandler(credentials_path, spreadsheet_url)
+        trabalhador = TrabalhadorCarregamento(tarefa, self)
 
-            # Autentica
-            progress.setLabelText("Autenticando com Google...")
-            sucesso_auth, msg_auth = handler.autenticar()
-            if not sucesso_auth:
-                progress.close()
-                msg_box = QMessageBox(self)
-                msg_box.setIcon(QMessageBox.Icon.Critical)
-                msg_box.setWindowTitle("Erro de Autenticação")
-                msg_box.setText(msg_auth)
-                msg_box.setStyleSheet("QLabel { color: black; } QPushButton { color: black; }")
-                msg_box.exec()
-                return
+        def atualizar_progresso(etapa, total, mensagem):
+            progress.setMaximum(total)
+            progress.setValue(etapa)
+            progress.setLabelText(mensagem)
 
-            # Carrega planilha
-            progress.setLabelText("Carregando planilha...")
-            sucesso_load, msg_load = handler.carregar_planilha()
-            progress.close()
+        def cancelar():
+            trabalhador.cancelar()
+            progress.setLabelText("Cancelando...")
+            progress.setCancelButton(None)
+            progress.show()
 
-            if sucesso_load:
-                msg_box = QMessageBox(self)
-                msg_box.setIcon(QMessageBox.Icon.Information)
-                msg_box.setWindowTitle("Conexão Estabelecida")
-                msg_box.setText(f"Conectado com sucesso!\n\n{msg_load}")
-                msg_box.setStyleSheet("QLabel { color: black; } QPushButton { color: black; }")
-                msg_box.exec()
-                self.modo_sheets_selecionado.emit(handler)
-            else:
-                msg_box = QMessageBox(self)
-                msg_box.setIcon(QMessageBox.Icon.Critical)
-                msg_box.setWindowTitle("Erro ao Carregar Planilha")
-                msg_box.setText(msg_load)
-                msg_box.setStyleSheet("QLabel { color: black; } QPushButton { color: black; }")
-                msg_box.exec()
-        except Exception as e:
+        def finalizar(sucesso, mensagem):
+            # close() emitiria canceled
+            progress.canceled.disconnect(cancelar)
             progress.close()
-            msg_box = QMessageBox(self)
-            msg_box.setIcon(QMessageBox.Icon.Critical)
-            msg_box.setWindowTitle("Erro")
-            msg_box.setText(f"Erro inesperado: {str(e)}")
-            msg_box.setStyleSheet("QLabel { color: black; } QPushButton { color: black; }")
-            msg_box.exec()
+            progress.deleteLater()
+            self._trabalhador_carregamento = None
+
+            # Cancelado pelo usuário: volta para a tela sem mensagem de erro
+            if not trabalhador.cancelamento_solicitado:
+                ao_concluir(sucesso, mensagem)
+
+        trabalhador.progresso_alterado.connect(atualizar_progresso)
+        trabalhador.concluido.connect(finalizar)
+        trabalhador.finished.connect(trabalhador.deleteLater)
+        progress.canceled.connect(cancelar)
+
+        self._trabalhador_carregamento = trabalhador
+        progress.show()
+        trabalhador.start()
+
+    def mostrar_mensagem(self, icone, titulo: str, texto: str):
+        msg_box = QMessageBox(self)
+        msg_box.setIcon(icone)
+        msg_box.setWindowTitle(titulo)
+        msg_box.setText(texto)
+        msg_box.setStyleSheet("QLabel { color: black; } QPushButton { color: black; }")
+        msg_box.exec()
 
 
 class DialogSheetsConfig(QDialog):
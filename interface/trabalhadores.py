@@ -0,0 +1,199 @@
+import queue
+import threading
+from PyQt6.QtCore import QThread, pyqtSignal
+
+# Registros enviados ao MySQL por transação
+TAMANHO_LOTE_SINCRONIZACAO = 50
+
+# Sem aviso de novo registro, confere a fila pelo menos a cada minuto
+ESPERA_FILA_VAZIA = 60.0
+
+# Sem registros novos por este tempo, grava o diário na planilha Excel
+ESPERA_COMPACTACAO = 30.0
+
+
+class TrabalhadorCarregamento(QThread):
+    """
+    Executa o carregamento de uma planilha fora da thread da interface.
+
+    tarefa(progresso, cancelado) deve retornar (sucesso, mensagem); o
+    progresso é repassado pelo sinal progresso_alterado e cancelar() só
+    marca o pedido, que a tarefa confere entre as etapas.
+    """
+
+    # etapa, total, mensagem
+    progresso_alterado = pyqtSignal(int, int, str)
+    # sucesso, mensagem
+    concluido = pyqtSignal(bool, str)
+
+    def __init__(self, tarefa, parent=None):
+        super().__init__(parent)
+        self.tarefa = tarefa
+        self.cancelamento_solicitado = False
+
+    def cancelar(self):
+        self.cancelamento_solicitado = True
+
+    def run(self):
+        try:
+            sucesso, mensagem = self.tarefa(self.progresso_alterado.emit,
+                                            lambda: self.cancelamento_solicitado)
+        except Exception as e:
+            sucesso, mensagem = False, f"Erro inesperado: {str(e)}"
+
+        self.concluido.emit(sucesso, mensagem)
+
+
+class TrabalhadorInsercao(QThread):
+    """
+    Grava os registros na planilha (Excel ou Google Sheets) fora da thread da interface.
+
+    Os registros são gravados um de cada vez, na ordem em que foram enviados,
+    para que o handler nunca seja alterado por duas threads ao mesmo tempo.
+    Uma lista de registros (vítimas da mesma ocorrência) é gravada numa única
+    operação.
+
+    No modo Excel as inserções ficam no diário local; quando a fila fica
+    ESPERA_COMPACTACAO segundos parada, e ao parar, o trabalhador compacta o
+    diário na planilha (ExcelHandler.compactar_diario).
+    """
+
+    # id da tarefa, sucesso, mensagem, posição
+    registro_concluido = pyqtSignal(int, bool, str, int)
+
+    def __init__(self, handler, parent=None):
+        super().__init__(parent)
+        self.handler = handler
+        self._fila = queue.Queue()
+        self._proximo_id = 0
+
+    def enfileirar(self, dados) -> int:
+        self._proximo_id += 1
+        self._fila.put((self._proximo_id, dados))
+        return self._proximo_id
+
+    def pendentes(self) -> int:
+        # Registros na fila ou sendo gravados
+        return self._fila.unfinished_tasks
+
+    def parar(self):
+        # Termina depois de gravar o que já está na fila (e compactar o diário)
+        self._fila.put(None)
+
+    def run(self):
+        while True:
+            try:
+                tarefa = self._fila.get(timeout=ESPERA_COMPACTACAO)
+            except queue.Empty:
+                self._compactar()
+                continue
+
+            if tarefa is None:
+                self._compactar()
+                self._fila.task_done()
+                break
+
+            id_tarefa, dados = tarefa
+            try:
+                if isinstance(dados, list):
+                    sucesso, mensagem, posicao = self.handler.inserir_registros(dados)
+                else:
+                    sucesso, mensagem, posicao = self.handler.inserir_registro(dados)
+            except Exception as e:
+                sucesso, mensagem, posicao = False, f"Erro inesperado: {str(e)}", -1
+
+            self._fila.task_done()
+            self.registro_concluido.emit(id_tarefa, sucesso, mensagem, posicao)
+
+    def _compactar(self):
+        # Só o ExcelHandler tem diário; falhas ficam para a próxima pausa
+        # (os registros continuam no diário e não se perdem)
+        compactar = getattr(self.handler, 'compactar_diario', None)
+        if compactar is not None:
+            try:
+                compactar()
+            except Exception:
+                pass
+
+
+class TrabalhadorSincronizacao(QThread):
+    """
+    Esvazia a fila de sincronização para o MySQL fora da thread da interface.
+
+    Envia os registros em lotes; se um lote falhar, tenta um a um para que
+    um registro com problema não trave os demais. Falhas voltam para a fila
+    com espera crescente (ver FilaSincronizacao.registrar_falha).
+    """
+
+    # pendentes, mensagem
+    status_alterado = pyqtSignal(int, str)
+    # ids da fila confirmados no MySQL
+    registros_sincronizados = pyqtSignal(list)
+
+    def __init__(self, db_handler, fila, parent=None):
+        super().__init__(parent)
+        self.db_handler = db_handler
+        self.fila = fila
+        self._evento = threading.Event()
+        self._parar = False
+
+    def acordar(self):
+        # Chamado pela interface ao enfileirar um registro novo
+        self._evento.set()
+
+    def parar(self):
+        self._parar = True
+        self._evento.set()
+
+    def run(self):
+        self.status_alterado.emit(self.fila.tamanho(), "")
+
+        while not self._parar:
+            lote = self.fila.proximos(TAMANHO_LOTE_SINCRONIZACAO)
+
+            if not lote:
+                espera = self.fila.segundos_ate_proxima()
+                if espera is None:
+                    espera = ESPERA_FILA_VAZIA
+                self._evento.wait(min(espera, ESPERA_FILA_VAZIA))
+                self._evento.clear()
+                continue
+
+            mensagem = self._enviar(lote)
+            self.status_alterado.emit(self.fila.tamanho(), mensagem)
+
+    def _enviar(self, lote: list) -> str:
+        ids = [id_registro for id_registro, _ in lote]
+        sucesso, mensagem = self.db_handler.inserir_lote([dados for _, dados in lote])
+
+        if sucesso:
+            self.fila.confirmar(ids)
+            self.registros_sincronizados.emit(ids)
+            return "MySQL: Sincronizado"
+
+        if len(lote) == 1 or self._erro_de_conexao(mensagem):
+            # Banco inacessível: o lote inteiro espera a próxima tentativa
+            self.fila.registrar_falha(ids, mensagem)
+            return f"MySQL: Erro - {mensagem}"
+
+        # Lote recusado: separa os registros bons do(s) problemático(s)
+        falhas = 0
+        for id_registro, dados in lote:
+            if self._parar:
+                break
+
+            sucesso, mensagem_registro = self.db_handler.inserir_lote([dados])
+            if sucesso:
+                self.fila.confirmar([id_registro])
+                self.registros_sincronizados.emit([id_registro])
+            else:
+                falhas += 1
+                mensagem = mensagem_registro
+                self.fila.registrar_falha([id_registro], mensagem_registro)
+
+        if falhas:
+            return f"MySQL: Erro - {mensagem}"
+        return "MySQL: Sincronizado"
+
+    def _erro_de_conexao(self, mensagem: str) -> bool:
+        return mensagem.startswith(("Erro de conexao", "Erro ao conectar"))
@@ -1,11 +1,21 @@
 import sys
-from PyQt6.QtWidgets import QApplication, QMainWindow, QStackedWidget, QMessageBox
-from PyQt6.QtCore import Qt
+from utils.perfil_inicializacao import PerfilInicializacao
+
+# Com --profile-startup, mede as importações desde o início
+perfil = PerfilInicializacao.iniciar_se_pedido(sys.argv)
+
+from PyQt6.QtWidgets import QApplication, QMainWindow, QStackedWidget, QMessageBox, QLabel
+from PyQt6.QtCore import Qt, QTimer, QCoreApplication, QEvent
 from PyQt6.QtGui import QIcon
 from interface.tela_selecao_modo import TelaSelecaoModo
-from interface.tela_cadastro import TelaCadastro
 from interface.tela_confirmacao import TelaConfirmacao
-from utils.database_handler import DatabaseHandler
+from interface.trabalhadores import TrabalhadorInsercao, TrabalhadorSincronizacao
+
+# Handlers e bibliotecas pesadas (pandas, openpyxl, gspread, mysql) são
+# importados só quando usados, para a janela inicial abrir mais rápido
+
+# Espera para iniciar a sincronização com o MySQL (a janela é desenhada antes)
+ATRASO_SINCRONIZACAO_MS = 300
 
 
 class MainWindow(QMainWindow):
@@ -13,7 +23,23 @@ class MainWindow(QMainWindow):
     def __init__(self):
         super().__init__()
         self.excel_handler = None
+        self.tela_cadastro = None  # Formulário reaproveitado entre um registro e outro
+
+        # Gravação na planilha em segundo plano (um trabalhador por handler)
+        self.trabalhador_insercao = None
+        self.registros_pendentes = {}  # id da tarefa -> dados
+        self.tela_confirmacao = None
+        self.id_insercao_atual = None
+        self.id_mysql_atual = None
+        self.encerrando = False
+
+        # Handler MySQL e fila de sincronização: criados logo depois de a janela aparecer
+        self.db_handler = None
+        self.fila_mysql = None
+        self.trabalhador_mysql = None
+
         self.init_ui()
+        QTimer.singleShot(ATRASO_SINCRONIZACAO_MS, self.iniciar_sincronizacao)
 
     def init_ui(self):
         self.setWindowTitle("Sistema de Cadastro - Mortes no Trânsito")
@@ -27,10 +53,49 @@ class MainWindow(QMainWindow):
         self.tela_selecao = TelaSelecaoModo()
         self.tela_selecao.modo_excel_selecionado.connect(self.mostrar_tela_cadastro)
         self.tela_selecao.modo_sheets_selecionado.connect(self.mostrar_tela_cadastro)
+        self.tela_selecao.modo_parquet_selecionado.connect(self.mostrar_tela_cadastro)
+        self.tela_selecao.modo_sqlite_selecionado.connect(self.mostrar_tela_cadastro)
         self.stack.addWidget(self.tela_selecao)
 
+        # Barra de status: situação da fila de sincronização com o MySQL
+        self.label_sincronizacao = QLabel("MySQL: iniciando...")
+        self.statusBar().addPermanentWidget(self.label_sincronizacao)
+
         self.centralizar_janela()
 
+    def iniciar_sincronizacao(self):
+        from utils.database_handler import DatabaseHandler
+        from utils.fila_sincronizacao import FilaSincronizacao
+
+        # Handler MySQL único para toda a sessão (pool de conexões + caches de lookup)
+        try:
+            self.db_handler = DatabaseHandler()
+        except ValueError as e:
+            print(f"Aviso: MySQL desativado: {e}")
+            self.db_handler = None
+
+        if self.db_handler is None:
+            self.label_sincronizacao.setText("MySQL: desativado")
+            return
+
+        # Registros entram na fila local e são enviados ao MySQL em segundo plano
+        self.fila_mysql = FilaSincronizacao()
+        self.trabalhador_mysql = TrabalhadorSincronizacao(self.db_handler, self.fila_mysql, self)
+        self.trabalhador_mysql.status_alterado.connect(self.atualizar_status_sincronizacao)
+        self.trabalhador_mysql.registros_sincronizados.connect(self.mysql_sincronizado)
+        self.trabalhador_mysql.start()
+
+    def atualizar_status_sincronizacao(self, pendentes, mensagem):
+        if pendentes == 0:
+            texto = "MySQL: tudo sincronizado"
+        else:
+            texto = f"MySQL: {pendentes} registro(s) na fila"
+            if mensagem and "Erro" in mensagem:
+                texto += " (nova tentativa em breve)"
+                self.label_sincronizacao.setToolTip(mensagem)
+
+        self.label_sincronizacao.setText(texto)
+
     def centralizar_janela(self):
         frame_geometry = self.frameGeometry()
         screen_center = self.screen().availableGeometry().center()
@@ -40,60 +105,144 @@ class MainWindow(QMainWindow):
     def mostrar_tela_cadastro(self, excel_handler):
         self.excel_handler = excel_handler
 
+        if self.trabalhador_insercao is None or self.trabalhador_insercao.handler is not excel_handler:
+            self.iniciar_trabalhador_insercao(excel_handler)
+
+        # Mesmo handler: o formulário já montado só é limpo
+        if self.tela_cadastro is not None and self.tela_cadastro.excel_handler is excel_handler:
+            self.tela_cadastro.preparar_novo_registro()
+            self.stack.setCurrentWidget(self.tela_cadastro)
+            return
+
         # Cria tela de cadastro
+        from interface.tela_cadastro import TelaCadastro
         tela_cadastro = TelaCadastro(excel_handler)
         tela_cadastro.cadastro_finalizado.connect(self.processar_cadastro)
+        tela_cadastro.ocorrencia_finalizada.connect(self.processar_cadastro)
         tela_cadastro.voltar_solicitado.connect(self.voltar_para_selecao)
 
         # Adiciona ao stack e mostra
+        self.tela_cadastro = tela_cadastro
         self.stack.addWidget(tela_cadastro)
         self.stack.setCurrentWidget(tela_cadastro)
 
-    def processar_cadastro(self, dados):
-        # Insere o registro no Google Sheets/Excel
-        sucesso, mensagem, posicao = self.excel_handler.inserir_registro(dados)
+    def iniciar_trabalhador_insercao(self, handler):
+        self.parar_trabalhador_insercao()
 
-        if sucesso:
-            # Tenta sincronizar com MySQL
-            msg_db = self.sincronizar_mysql(dados)
+        self.trabalhador_insercao = TrabalhadorInsercao(handler, self)
+        self.trabalhador_insercao.registro_concluido.connect(self.registro_gravado)
+        self.trabalhador_insercao.start()
 
-            # Mostra tela de confirmação
-            tela_confirmacao = TelaConfirmacao(self.excel_handler, dados, posicao, msg_db)
-            tela_confirmacao.cadastrar_outro.connect(self.cadastrar_outro)
-            tela_confirmacao.fechar_aplicacao.connect(self.fechar_aplicacao)
+    def parar_trabalhador_insercao(self, espera_ms: int = -1) -> bool:
+        # Termina depois de gravar os registros já enviados
+        if self.trabalhador_insercao is None:
+            return True
 
-            self.stack.addWidget(tela_confirmacao)
-            self.stack.setCurrentWidget(tela_confirmacao)
+        self.trabalhador_insercao.parar()
+        if espera_ms < 0:
+            terminou = self.trabalhador_insercao.wait()
         else:
-            # Mostra erro
-            QMessageBox.critical(
-                self,
-                "Erro ao Inserir Registro",
-                mensagem
-            )
+            terminou = self.trabalhador_insercao.wait(espera_ms)
+
+        if terminou:
+            self.trabalhador_insercao = None
+        return terminou
+
+    def processar_cadastro(self, dados):
+        # dados: um registro (dict) ou as vítimas de uma ocorrência (lista), gravadas juntas.
+        # O formulário é liberado na hora: planilha e MySQL gravam em segundo plano
+        self.id_insercao_atual = self.enviar_para_planilha(dados)
+        self.id_mysql_atual = None
+
+        # O registro só vai para a fila do MySQL depois de gravado na planilha (registro_gravado)
+        if self.fila_mysql is None:
+            msg_db = "MySQL: Erro - Variaveis de ambiente nao configuradas"
+        else:
+            msg_db = "MySQL: Aguardando a gravacao na planilha"
+
+        # Mostra tela de confirmação (atualizada quando cada gravação terminar)
+        tela_confirmacao = TelaConfirmacao(self.excel_handler, dados, None, msg_db)
+        tela_confirmacao.cadastrar_outro.connect(self.cadastrar_outro)
+        tela_confirmacao.fechar_aplicacao.connect(self.fechar_aplicacao)
+
+        self.tela_confirmacao = tela_confirmacao
+        self.stack.addWidget(tela_confirmacao)
+        self.stack.setCurrentWidget(tela_confirmacao)
+
+    def enviar_para_planilha(self, dados) -> int:
+        id_tarefa = self.trabalhador_insercao.enfileirar(dados)
+        self.registros_pendentes[id_tarefa] = dados
+        return id_tarefa
+
+    def registro_gravado(self, id_tarefa, sucesso, mensagem, posicao):
+        dados = self.registros_pendentes.pop(id_tarefa, None)
+
+        if id_tarefa == self.id_insercao_atual and self.tela_confirmacao:
+            self.tela_confirmacao.atualizar_planilha(sucesso, mensagem, posicao)
+
+        if dados is None:
+            return
+
+        if sucesso:
+            # Só o que foi gravado na planilha vai para o MySQL
+            id_fila, msg_db = self.sincronizar_mysql(dados)
+            if id_tarefa == self.id_insercao_atual:
+                self.id_mysql_atual = id_fila
+                if self.tela_confirmacao:
+                    self.tela_confirmacao.atualizar_mysql(msg_db)
+            return
+
+        if self.encerrando:
+            # Aplicação fechando: não há como oferecer nova tentativa
+            return
+
+        # Registro não gravado na planilha: oferece nova tentativa para não perder os dados
+        registros = dados if isinstance(dados, list) else [dados]
+        vitimas = ', '.join(r.get('Vítima') or 'sem nome' for r in registros)
+        resposta = QMessageBox.critical(
+            self,
+            "Erro ao Inserir Registro",
+            f"O registro de {vitimas} não foi gravado na planilha:\n\n{mensagem}\n\n"
+            f"Deseja tentar novamente?",
+            QMessageBox.StandardButton.Retry | QMessageBox.StandardButton.Discard
+        )
+
+        if resposta == QMessageBox.StandardButton.Retry:
+            novo_id = self.enviar_para_planilha(dados)
+            if id_tarefa == self.id_insercao_atual:
+                self.id_insercao_atual = novo_id
+                if self.tela_confirmacao:
+                    self.tela_confirmacao.mostrar_gravacao_pendente()
 
     def sincronizar_mysql(self, dados):
-        try:
-            db_handler = DatabaseHandler()
-            sucesso, mensagem = db_handler.inserir_registro(dados)
-            db_handler.desconectar()
+        if self.fila_mysql is None:
+            return None, "MySQL: Erro - Variaveis de ambiente nao configuradas"
 
-            if sucesso:
-                return "MySQL: Sincronizado"
-            else:
-                return f"MySQL: Erro - {mensagem}"
+        try:
+            # Grava na fila local (rápido) e deixa o envio para o trabalhador
+            id_fila = self.fila_mysql.enfileirar(dados)
+            self.trabalhador_mysql.acordar()
+            self.atualizar_status_sincronizacao(self.fila_mysql.tamanho(), "")
+            return id_fila, "MySQL: Na fila de sincronizacao"
 
         except Exception as e:
-            return f"MySQL: Erro - {str(e)}"
+            return None, f"MySQL: Erro - {str(e)}"
+
+    def mysql_sincronizado(self, ids):
+        if self.id_mysql_atual in ids and self.tela_confirmacao:
+            self.tela_confirmacao.atualizar_mysql("MySQL: Sincronizado")
 
     def cadastrar_outro(self):
-        # Remove telas antigas do stack (mantém só a primeira)
-        while self.stack.count() > 1:
-            widget = self.stack.widget(1)
-            self.stack.removeWidget(widget)
-            widget.deleteLater()
+        self.tela_confirmacao = None
+
+        # Remove as telas de confirmação (mantém a seleção e o formulário)
+        for indice in range(self.stack.count() - 1, 0, -1):
+            widget = self.stack.widget(indice)
+            if widget is not self.tela_cadastro:
+                self.stack.removeWidget(widget)
+                widget.deleteLater()
 
-        # Cria nova tela de cadastro
+        # Reaproveita a tela de cadastro
         self.mostrar_tela_cadastro(self.excel_handler)
 
     def voltar_para_selecao(self):
@@ -105,6 +254,9 @@ class MainWindow(QMainWindow):
         )
 
         if resposta == QMessageBox.StandardButton.Yes:
+            self.tela_confirmacao = None
+            self.tela_cadastro = None
+
             # Remove todas as telas exceto a primeira
             while self.stack.count() > 1:
                 widget = self.stack.widget(1)
@@ -135,12 +287,39 @@ class MainWindow(QMainWindow):
             )
 
             if resposta == QMessageBox.StandardButton.Yes:
+                self.encerrar_conexoes()
                 event.accept()
             else:
                 event.ignore()
         else:
+            self.encerrar_conexoes()
             event.accept()
 
+    def encerrar_conexoes(self):
+        # Termina de gravar na planilha os registros já enviados
+        self.encerrando = True
+        terminou = self.parar_trabalhador_insercao(30000)
+
+        # Resultados emitidos durante a espera (sinais ainda não entregues): os gravados entram na fila do MySQL
+        QCoreApplication.sendPostedEvents(None, QEvent.Type.MetaCall)
+
+        if terminou:
+            # Handlers com conexão própria (base SQLite) são fechados depois da última gravação
+            fechar_handler = getattr(self.excel_handler, 'fechar', None)
+            if fechar_handler:
+                fechar_handler()
+
+        # Registros ainda na fila são enviados na próxima execução
+        if self.trabalhador_mysql:
+            self.trabalhador_mysql.parar()
+            if not self.trabalhador_mysql.wait(5000):
+                # Envio em andamento: o processo encerra e o commit não confirmado fica na fila
+                return
+        if self.fila_mysql:
+            self.fila_mysql.fechar()
+        if self.db_handler:
+            self.db_handler.desconectar()
+
 
 def main():
     # Cria a aplicação
@@ -154,6 +333,13 @@ def main():
     janela = MainWindow()
     janela.show()
 
+    if perfil:
+        # Primeira volta do loop de eventos: a janela já foi exibida
+        def mostrar_perfil():
+            print(perfil.relatorio("Janela inicial exibida"))
+            perfil.desinstalar()
+        QTimer.singleShot(0, mostrar_perfil)
+
     # Executa o loop de eventos
     sys.exit(app.exec())
 
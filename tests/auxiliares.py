@@ -0,0 +1,9 @@
+import os
+import sys
+
+# Os testes reaproveitam o gerador de dados sintéticos dos benchmarks
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+sys.path.insert(0, os.path.join(RAIZ, 'benchmarks'))
+
+from dados_sinteticos import gerar_registros, gerar_dataframe, gravar_planilha  # noqa: E402,F401
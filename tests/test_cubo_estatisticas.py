@@ -0,0 +1,85 @@
+import unittest
+from unittest import mock
+
+import pandas as pd
+
+from tests.auxiliares import gerar_dataframe
+from utils.cubo_estatisticas import CuboEstatisticas, FAIXAS_ETARIAS
+
+LINHAS = 1500
+MONTADAS = 1000
+
+
+def referencia(df: pd.DataFrame) -> pd.DataFrame:
+    # Dimensões calculadas direto das colunas, com pandas, sem o código do cubo
+    idades = pd.to_numeric(df['Idade'], errors='coerce')
+    return pd.DataFrame({
+        'ano': pd.to_datetime(df['Data do Fato'], format='%d/%m/%Y', errors='coerce').dt.year,
+        'mes': df['Mês'].str.strip(),
+        'municipio': df['Município do Fato'].str.strip(),
+        'tipo_acidente': df['Tipo de Acidente'].str.strip(),
+        'sexo': df['Sexo'].str.strip(),
+        'faixa_etaria': pd.cut(idades, bins=[-1, 17, 24, 29, 39, 49, 59, float('inf')],
+                               labels=FAIXAS_ETARIAS).astype(object),
+    })
+
+
+def contagens(serie: pd.Series) -> dict:
+    return {valor: int(total) for valor, total in serie.value_counts().items()}
+
+
+class TestCuboEstatisticas(unittest.TestCase):
+
+    def setUp(self):
+        df = gerar_dataframe(LINHAS)
+        self.esperado = referencia(df)
+        self.anos = sorted(int(ano) for ano in self.esperado['ano'].dropna().unique())
+
+        # Parte montada de uma vez, o restante registrado como inserções
+        self.cubo = CuboEstatisticas.montar([df.iloc[:MONTADAS]])
+        for registro in df.iloc[MONTADAS:].to_dict('records'):
+            self.cubo.registrar(registro)
+
+    def test_total(self):
+        self.assertEqual(self.cubo.total(), LINHAS)
+        for ano in self.anos:
+            with self.subTest(ano=ano):
+                self.assertEqual(self.cubo.total(ano=ano), int((self.esperado['ano'] == ano).sum()))
+        self.assertEqual(self.cubo.total(ano=self.anos, sexo='Feminino'),
+                         int((self.esperado['sexo'] == 'Feminino').sum()))
+
+    def test_detalhar_igual_ao_groupby(self):
+        for dimensao in ['municipio', 'tipo_acidente', 'faixa_etaria']:
+            with self.subTest(dimensao=dimensao):
+                self.assertEqual(self.cubo.detalhar(dimensao), contagens(self.esperado[dimensao]))
+
+        ano = self.anos[0]
+        filtrado = self.esperado[(self.esperado['ano'] == ano) & (self.esperado['mes'] == 'MARÇO')]
+        self.assertEqual(self.cubo.detalhar('municipio', ano=ano, mes='MARÇO'),
+                         contagens(filtrado['municipio']))
+
+    def test_cruzar_igual_ao_crosstab(self):
+        ano = self.anos[-1]
+        filtrado = self.esperado[self.esperado['ano'] == ano]
+        tabela = self.cubo.cruzar('municipio', 'sexo', ano=ano)
+        esperada = pd.crosstab(filtrado['municipio'], filtrado['sexo'])
+        esperada = esperada.reindex(index=tabela.index, columns=tabela.columns)
+        pd.testing.assert_frame_equal(tabela, esperada, check_names=False, check_dtype=False)
+
+    def test_pendentes_incorporados_as_celulas(self):
+        df = gerar_dataframe(LINHAS)
+        with mock.patch('utils.cubo_estatisticas.LIMITE_PENDENTES', 25):
+            cubo = CuboEstatisticas.montar([df.iloc[:MONTADAS]])
+            for registro in df.iloc[MONTADAS:].to_dict('records'):
+                cubo.registrar(registro)
+
+        self.assertLess(len(cubo._pendentes), 25)
+        ano = self.anos[0]
+        for dimensao in ['municipio', 'faixa_etaria']:
+            with self.subTest(dimensao=dimensao):
+                self.assertEqual(cubo.detalhar(dimensao, ano=ano), self.cubo.detalhar(dimensao, ano=ano))
+        pd.testing.assert_frame_equal(cubo.cruzar('mes', 'sexo'), self.cubo.cruzar('mes', 'sexo'))
+
+
+if __name__ == '__main__':
+    unittest.main()
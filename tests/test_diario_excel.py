@@ -0,0 +1,113 @@
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+from tests.auxiliares import gerar_registros, gravar_planilha
+from utils.diario_excel import DiarioExcel
+from utils.excel_handler import ExcelHandler
+
+LINHAS_PLANILHA = 30
+
+
+class Queda(BaseException):
+    # Simula a aplicação morrendo no meio da operação (não é tratada pelo handler)
+    pass
+
+
+class TestDiarioExcel(unittest.TestCase):
+
+    def setUp(self):
+        self.pasta = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.pasta, ignore_errors=True)
+        self.planilha = os.path.join(self.pasta, 'planilha.xlsx')
+        self.pasta_diario = os.path.join(self.pasta, 'diarios')
+        gravar_planilha(self.planilha, LINHAS_PLANILHA)
+
+        self.novos = gerar_registros(3, semente=99)
+        for i, registro in enumerate(self.novos):
+            registro['Vítima'] = f"Vitima do diario {i}"
+
+    def abrir(self) -> ExcelHandler:
+        handler = ExcelHandler(pasta_diario=self.pasta_diario)
+        sucesso, mensagem = handler.carregar_arquivo(self.planilha)
+        self.assertTrue(sucesso, mensagem)
+        self.addCleanup(self.fechar, handler)
+        return handler
+
+    def fechar(self, handler: ExcelHandler):
+        if handler._diario is not None:
+            handler._diario.fechar()
+
+    def inserir_novos(self, handler: ExcelHandler):
+        for registro in self.novos:
+            sucesso, mensagem, _ = handler.inserir_registro(registro)
+            self.assertTrue(sucesso, mensagem)
+
+    def assert_novos_uma_vez(self, handler: ExcelHandler):
+        self.assertEqual(len(handler.df), LINHAS_PLANILHA + len(self.novos))
+        vitimas = handler.df['Vítima'].astype(str).tolist()
+        for registro in self.novos:
+            self.assertEqual(vitimas.count(registro['Vítima']), 1, registro['Vítima'])
+
+    def test_queda_antes_da_compactacao_reaplica_o_diario(self):
+        handler = self.abrir()
+        self.inserir_novos(handler)
+        self.fechar(handler)
+
+        reaberto = self.abrir()
+
+        self.assert_novos_uma_vez(reaberto)
+        self.assertEqual(reaberto._diario.pendentes(), len(self.novos))
+
+    def test_queda_entre_marcar_compactacao_e_troca_do_arquivo(self):
+        handler = self.abrir()
+        self.inserir_novos(handler)
+
+        # A linha de compactação já está no diário, mas a planilha ainda é a original
+        with mock.patch('utils.excel_handler.os.replace', side_effect=Queda):
+            with self.assertRaises(Queda):
+                handler.compactar_diario()
+        self.fechar(handler)
+
+        reaberto = self.abrir()
+
+        self.assert_novos_uma_vez(reaberto)
+        self.assertFalse(os.path.exists(handler._caminho_compactacao(self.planilha)))
+
+        # A compactação seguinte grava os registros e esvazia o diário
+        sucesso, mensagem = reaberto.compactar_diario()
+        self.assertTrue(sucesso, mensagem)
+        self.fechar(reaberto)
+        self.assert_novos_uma_vez(self.abrir())
+
+    def test_queda_depois_da_troca_nao_duplica(self):
+        handler = self.abrir()
+        self.inserir_novos(handler)
+
+        # A planilha compactada já substituiu a original, mas o diário não recomeçou
+        with mock.patch.object(DiarioExcel, 'iniciar', side_effect=Queda):
+            with self.assertRaises(Queda):
+                handler.compactar_diario()
+        self.fechar(handler)
+
+        reaberto = self.abrir()
+
+        self.assert_novos_uma_vez(reaberto)
+        self.assertEqual(reaberto._diario.pendentes(), 0)
+
+    def test_linha_incompleta_no_fim_e_ignorada(self):
+        handler = self.abrir()
+        self.inserir_novos(handler)
+        self.fechar(handler)
+
+        # Queda durante a escrita da última linha: a inserção nunca foi confirmada
+        with open(handler._diario.caminho, 'a', encoding='utf-8') as f:
+            f.write('{"tipo": "registros", "seq": 4, "regis')
+
+        self.assert_novos_uma_vez(self.abrir())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,83 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from tests.auxiliares import gerar_dataframe
+from utils.esquema import aplicar_esquema, alinhar_tipos, dataframe_exibicao
+
+
+class TestAlinharTipos(unittest.TestCase):
+
+    def setUp(self):
+        # Colunas em texto, como vêm do Google Sheets
+        self.texto = gerar_dataframe(300)
+        self.df = aplicar_esquema(self.texto)
+
+    def concatenar(self, novos_texto: pd.DataFrame) -> pd.DataFrame:
+        df, novos = alinhar_tipos(self.df, novos_texto)
+        return pd.concat([df, novos], ignore_index=True)
+
+    def test_concatenacao_igual_a_tipar_tudo_de_uma_vez(self):
+        novos_texto = gerar_dataframe(40, semente=7)
+
+        junto = self.concatenar(novos_texto)
+        esperado = aplicar_esquema(pd.concat([self.texto, novos_texto], ignore_index=True))
+
+        pd.testing.assert_frame_equal(dataframe_exibicao(junto), dataframe_exibicao(esperado))
+
+    def test_concatenacao_mantem_os_tipos_compactos(self):
+        junto = self.concatenar(gerar_dataframe(40, semente=7))
+
+        for coluna in self.df.columns:
+            with self.subTest(coluna=coluna):
+                antes, depois = self.df[coluna].dtype, junto[coluna].dtype
+                if isinstance(antes, pd.CategoricalDtype):
+                    self.assertIsInstance(depois, pd.CategoricalDtype)
+                else:
+                    self.assertEqual(antes, depois)
+
+    def test_nao_altera_o_dataframe_original(self):
+        categorias = list(self.df['Município do Fato'].cat.categories)
+        tipos = self.df.dtypes.copy()
+        novos_texto = gerar_dataframe(1, semente=7)
+        novos_texto['Município do Fato'] = 'Municipio Novo'
+        novos_texto['Data do Fato'] = '31/02/2024'
+
+        df, novos = alinhar_tipos(self.df, novos_texto)
+
+        self.assertIn('Municipio Novo', df['Município do Fato'].cat.categories)
+        self.assertEqual(list(self.df['Município do Fato'].cat.categories), categorias)
+        pd.testing.assert_series_equal(self.df.dtypes, tipos)
+
+    def test_valor_fora_do_tipo_volta_a_coluna_para_object(self):
+        novos_texto = gerar_dataframe(2, semente=7)
+        novos_texto.loc[0, 'Data do Fato'] = '31/02/2024'
+        novos_texto.loc[1, 'Idade'] = 'NI'
+
+        junto = self.concatenar(novos_texto)
+
+        self.assertEqual(junto['Data do Fato'].dtype, object)
+        self.assertEqual(junto['Idade'].dtype, object)
+        self.assertEqual(junto['Data do Fato'].iloc[-2], '31/02/2024')
+        self.assertEqual(junto['Idade'].iloc[-1], 'NI')
+        # Os valores antigos continuam os mesmos
+        pd.testing.assert_series_equal(junto['Data do Fato'].iloc[:len(self.df)],
+                                       self.df['Data do Fato'].astype(object))
+
+    def test_coordenada_que_nao_cabe_em_float32_passa_a_float64(self):
+        novos_texto = gerar_dataframe(1, semente=7)
+        novos_texto['Long'] = '-42.801234'
+        self.assertNotEqual(round(float(np.float32(-42.801234)), 6), -42.801234)
+
+        junto = self.concatenar(novos_texto)
+
+        self.assertEqual(junto['Long'].dtype, np.float64)
+        self.assertEqual(junto['Long'].iloc[-1], -42.801234)
+        pd.testing.assert_series_equal(
+            dataframe_exibicao(junto)['Long'].iloc[:len(self.df)],
+            dataframe_exibicao(self.df)['Long'])
+
+
+if __name__ == '__main__':
+    unittest.main()
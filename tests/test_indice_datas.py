@@ -0,0 +1,57 @@
+import unittest
+
+import pandas as pd
+
+from tests.auxiliares import gerar_dataframe
+from utils.indice_datas import IndiceDatas, converter_data, converter_serie_datas
+
+
+def ordenar(itens: list) -> list:
+    # Referência: sort_values estável (por data, datas inválidas no fim) de pares (data, chegada)
+    chaves = converter_serie_datas(pd.Series([data for data, _ in itens], dtype=object))
+    return [itens[i] for i in chaves.sort_values(kind='stable', na_position='last').index]
+
+
+class TestIndiceDatas(unittest.TestCase):
+
+    def setUp(self):
+        datas = gerar_dataframe(300)['Data do Fato'].tolist()
+        datas[::37] = [''] * len(datas[::37])
+        self.existentes = ordenar([(data, i) for i, data in enumerate(datas)])
+        # Novos registros: datas repetidas, anteriores, posteriores e inválidas
+        novas = gerar_dataframe(120, semente=9)['Data do Fato'].tolist()
+        novas += [self.existentes[0][0], self.existentes[150][0], '', 'data', '01/01/1990', '31/12/2099']
+        self.novas = [(data, len(datas) + i) for i, data in enumerate(novas)]
+
+    def test_insercoes_mantem_a_ordem_do_sort_values(self):
+        indice = IndiceDatas(pd.Series([data for data, _ in self.existentes]))
+        itens = list(self.existentes)
+        for data, chegada in self.novas:
+            # Como nos handlers: a data chega ao índice já convertida
+            posicao = indice.posicao_insercao(converter_data(data))
+            indice.inserir(posicao, converter_data(data))
+            itens.insert(posicao, (data, chegada))
+
+        self.assertEqual(len(indice), len(itens))
+        self.assertEqual(itens, ordenar(self.existentes + self.novas))
+
+    def test_mesma_data_entra_depois_das_existentes(self):
+        indice = IndiceDatas(pd.Series(['01/02/2024', '05/02/2024', '05/02/2024', '']))
+        self.assertEqual(indice.posicao_insercao(pd.Timestamp('2024-02-05')), 3)
+        self.assertEqual(indice.posicao_insercao(pd.Timestamp('2024-02-04')), 1)
+        self.assertEqual(indice.posicao_insercao(pd.NaT), 4)
+
+    def test_remover(self):
+        indice = IndiceDatas(pd.Series(['01/02/2024', '05/02/2024', '09/02/2024']))
+        indice.remover(1)
+        self.assertEqual(len(indice), 2)
+        self.assertEqual(indice.posicao_insercao(pd.Timestamp('2024-02-06')), 1)
+
+    def test_converter_data(self):
+        self.assertEqual(converter_data('05/02/2024'), pd.Timestamp('2024-02-05'))
+        self.assertTrue(pd.isna(converter_data('')))
+        self.assertTrue(pd.isna(converter_data(None)))
+
+
+if __name__ == '__main__':
+    unittest.main()
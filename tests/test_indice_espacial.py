@@ -0,0 +1,105 @@
+import math
+import unittest
+from unittest import mock
+
+import pandas as pd
+
+from tests.auxiliares import gerar_dataframe
+from utils.indice_espacial import IndiceEspacial, RAIO_TERRA_M
+
+LINHAS = 2000
+MONTADAS = 1500
+RAIOS_M = [5_000, 30_000, 120_000]
+
+
+def haversine_m(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    fi1, fi2 = math.radians(lat1), math.radians(lat2)
+    a = (math.sin((fi2 - fi1) / 2) ** 2
+         + math.cos(fi1) * math.cos(fi2) * math.sin(math.radians(lon2 - lon1) / 2) ** 2)
+    return 2 * RAIO_TERRA_M * math.asin(math.sqrt(min(a, 1.0)))
+
+
+class TestIndiceEspacial(unittest.TestCase):
+
+    def setUp(self):
+        df = gerar_dataframe(LINHAS)
+        # Coordenadas que não entram no índice
+        df.loc[0, ['Lat', 'Long']] = ['', '']
+        df.loc[1, ['Lat', 'Long']] = ['0', '0']
+        df.loc[2, ['Lat', 'Long']] = ['95.1', '-42.8']
+        df.loc[3, ['Lat', 'Long']] = ['texto', '-42.8']
+
+        # Referência: todos os pontos válidos, percorridos um a um
+        self.pontos = [(float(lat), float(lon), pd.Timestamp(pd.to_datetime(data, format='%d/%m/%Y')))
+                       for lat, lon, data in zip(df['Lat'][4:], df['Long'][4:], df['Data do Fato'][4:])]
+        self.centros = [(lat, lon) for lat, lon, _ in self.pontos[::250]] + [(-5.0892, -42.8016)]
+
+        self.df = df
+        self.indice = self.montar()
+
+    def montar(self, tamanho_celula: float = 0.01) -> IndiceEspacial:
+        # Parte montada de uma vez, o restante registrado como inserções (pendentes)
+        indice = IndiceEspacial.montar([self.df.iloc[:MONTADAS]], tamanho_celula)
+        for registro in self.df.iloc[MONTADAS:].to_dict('records'):
+            indice.registrar(registro)
+        return indice
+
+    def forca_bruta(self, lat: float, lon: float, raio_m: float, desde=None, ate=None) -> list:
+        selecionados = []
+        for lat_ponto, lon_ponto, data in self.pontos:
+            if desde is not None and data < pd.Timestamp(desde):
+                continue
+            if ate is not None and data > pd.Timestamp(ate):
+                continue
+            distancia = haversine_m(lat, lon, lat_ponto, lon_ponto)
+            if distancia <= raio_m:
+                selecionados.append((lat_ponto, lon_ponto, distancia))
+        return selecionados
+
+    def conferir(self, indice: IndiceEspacial, desde=None, ate=None):
+        for lat, lon in self.centros:
+            for raio_m in RAIOS_M:
+                with self.subTest(lat=lat, lon=lon, raio_m=raio_m, desde=desde, ate=ate):
+                    esperados = self.forca_bruta(lat, lon, raio_m, desde, ate)
+                    resultado = indice.buscar_raio(lat, lon, raio_m, desde=desde, ate=ate)
+
+                    self.assertEqual(indice.contar_raio(lat, lon, raio_m, desde=desde, ate=ate),
+                                     len(esperados))
+                    self.assertEqual(sorted(zip(resultado['Lat'], resultado['Long'])),
+                                     sorted((a, b) for a, b, _ in esperados))
+                    self.assertTrue(resultado['distancia_m'].is_monotonic_increasing)
+                    for obtida, esperada in zip(resultado['distancia_m'],
+                                                sorted(d for _, _, d in esperados)):
+                        self.assertAlmostEqual(obtida, esperada, delta=1e-3)
+
+    def test_pontos_invalidos_ficam_de_fora(self):
+        self.assertEqual(len(self.indice), len(self.pontos))
+
+    def test_raio_igual_a_forca_bruta(self):
+        self.conferir(self.indice)
+
+    def test_raio_com_periodo(self):
+        self.conferir(self.indice, desde='01/01/2022', ate=pd.Timestamp('2023-06-30'))
+        self.conferir(self.indice, desde='01/01/2024')
+
+    def test_outros_tamanhos_de_celula(self):
+        # Consultas que cruzam milhares de células e células com centenas de pontos nas bordas
+        for tamanho_celula in [0.002, 0.5]:
+            self.conferir(self.montar(tamanho_celula=tamanho_celula))
+
+    def test_pendentes_incorporados_a_grade(self):
+        with mock.patch('utils.indice_espacial.LIMITE_PENDENTES', 40):
+            indice = self.montar()
+        self.assertLess(len(indice._pendentes), 40)
+        self.conferir(indice)
+
+    def test_retangulo(self):
+        lat_min, lat_max, lon_min, lon_max = -7.0, -4.5, -44.0, -41.5
+        resultado = self.indice.buscar_retangulo(lat_min, lat_max, lon_min, lon_max)
+        esperados = [(lat, lon) for lat, lon, _ in self.pontos
+                     if lat_min <= lat <= lat_max and lon_min <= lon <= lon_max]
+        self.assertEqual(sorted(zip(resultado['Lat'], resultado['Long'])), sorted(esperados))
+
+
+if __name__ == '__main__':
+    unittest.main()
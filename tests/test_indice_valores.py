@@ -0,0 +1,62 @@
+import unittest
+
+import pandas as pd
+
+from tests.auxiliares import gerar_dataframe, gerar_registros
+from utils.esquema import aplicar_esquema
+from utils.indice_valores import IndiceValoresUnicos
+
+COLUNAS = ['Município do Fato', 'Tipo de Acidente', 'OBS:']
+
+
+def distintos(dataframes: list, coluna: str) -> list:
+    # Referência: percorre os DataFrames inteiros
+    valores = pd.concat([df[coluna].astype(object) for df in dataframes]).dropna()
+    return sorted(v for v in valores.unique() if v != '')
+
+
+class TestIndiceValoresUnicos(unittest.TestCase):
+
+    def setUp(self):
+        # Duas abas, uma em texto e outra com os tipos compactos
+        self.abas = [gerar_dataframe(200), aplicar_esquema(gerar_dataframe(200, semente=3))]
+        self.indice = IndiceValoresUnicos(ignorar={''})
+
+    def test_montagem_igual_aos_valores_distintos(self):
+        for coluna in COLUNAS:
+            with self.subTest(coluna=coluna):
+                self.assertEqual(self.indice.obter(coluna, self.abas), distintos(self.abas, coluna))
+
+    def test_registros_inseridos_depois_da_montagem(self):
+        for coluna in COLUNAS:
+            self.indice.obter(coluna, self.abas)
+
+        novos = gerar_registros(50, semente=11)
+        novos[0]['Município do Fato'] = 'Municipio Novo'
+        novos[1]['OBS:'] = ''
+        for registro in novos:
+            self.indice.registrar(registro)
+
+        com_novos = self.abas + [pd.DataFrame(novos)]
+        for coluna in COLUNAS:
+            with self.subTest(coluna=coluna):
+                self.assertEqual(self.indice.obter(coluna, self.abas), distintos(com_novos, coluna))
+        self.assertIn('Municipio Novo', self.indice.obter('Município do Fato', self.abas))
+
+    def test_coluna_montada_depois_das_insercoes_usa_os_dataframes(self):
+        # registrar só atualiza colunas já montadas: as outras vêm dos DataFrames na primeira consulta
+        registro = gerar_registros(1, semente=11)[0]
+        registro['Logradouro'] = 'Rua Inexistente'
+        self.indice.registrar(registro)
+
+        self.assertEqual(self.indice.obter('Logradouro', self.abas), distintos(self.abas, 'Logradouro'))
+
+    def test_resultado_e_uma_copia(self):
+        valores = self.indice.obter('Sexo', self.abas)
+        valores.append('X')
+
+        self.assertNotIn('X', self.indice.obter('Sexo', self.abas))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,93 @@
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+from tests.auxiliares import gerar_registros
+from utils.sqlite_handler import SQLiteHandler
+
+
+class TestTransacoesSQLite(unittest.TestCase):
+
+    def setUp(self):
+        self.pasta = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.pasta, ignore_errors=True)
+
+        self.handler = SQLiteHandler()
+        sucesso, mensagem = self.handler.carregar_banco(os.path.join(self.pasta, 'base.sqlite3'))
+        self.assertTrue(sucesso, mensagem)
+        self.addCleanup(self.handler.fechar)
+
+        for registro in gerar_registros(20):
+            sucesso, mensagem, _ = self.handler.inserir_registro(registro)
+            self.assertTrue(sucesso, mensagem)
+
+        # Uma ocorrência com duas vítimas, num município que ainda não está na base
+        self.vitimas = gerar_registros(2, semente=5)
+        for registro in self.vitimas:
+            registro['Município do Fato'] = 'Municipio Novo'
+
+    def contar(self, tabela: str) -> int:
+        return self.handler._consultar_valor(f"SELECT COUNT(*) FROM {tabela}")
+
+    def contagens(self) -> dict:
+        return {tabela: self.contar(tabela) for tabela in ('ocorrencias', 'vitimas', 'municipios')}
+
+    def falhar_na_segunda_vitima(self):
+        # _booleano é chamado uma vez por vítima, depois da ocorrência e do município gravados
+        from utils import sqlite_handler
+        original = sqlite_handler._booleano
+        chamadas = []
+
+        def booleano(valor):
+            chamadas.append(valor)
+            if len(chamadas) == 2:
+                raise RuntimeError("falha simulada")
+            return original(valor)
+
+        return mock.patch('utils.sqlite_handler._booleano', side_effect=booleano)
+
+    def test_falha_no_meio_desfaz_a_transacao_inteira(self):
+        antes = self.contagens()
+
+        with self.falhar_na_segunda_vitima():
+            sucesso, _, linha = self.handler.inserir_registros(self.vitimas)
+
+        self.assertFalse(sucesso)
+        self.assertEqual(linha, -1)
+        self.assertEqual(self.contagens(), antes)
+        self.assertEqual(self.handler.obter_estatisticas().total(), antes['vitimas'])
+
+    def test_ids_de_lookup_desfeitos_nao_ficam_no_cache(self):
+        with self.falhar_na_segunda_vitima():
+            self.handler.inserir_registros(self.vitimas)
+
+        # O município foi inserido e desfeito: a nova gravação precisa inseri-lo de novo
+        sucesso, mensagem, _ = self.handler.inserir_registros(self.vitimas)
+        self.assertTrue(sucesso, mensagem)
+
+        df = self.handler.obter_dataframe()
+        novas = df[df['Vítima'].isin([v['Vítima'] for v in self.vitimas])]
+        self.assertEqual(len(novas), 2)
+        self.assertEqual(set(novas['Município do Fato'].astype(str)), {'Municipio Novo'})
+        self.assertEqual(self.handler._consultar_valor(
+            "SELECT COUNT(*) FROM municipios WHERE nome = ?", ('Municipio Novo',)), 1)
+
+    def test_falha_depois_do_commit_nao_muda_o_resultado(self):
+        antes = self.contar('vitimas')
+
+        with mock.patch.object(self.handler._cubo, 'registrar', side_effect=RuntimeError("falha")), \
+                mock.patch.object(self.handler, '_posicao', side_effect=RuntimeError("falha")):
+            sucesso, _, linha = self.handler.inserir_registros(self.vitimas)
+
+        # O registro está gravado: o resultado é sucesso e os índices são remontados da base
+        self.assertTrue(sucesso)
+        self.assertEqual(linha, -1)
+        self.assertEqual(self.contar('vitimas'), antes + 2)
+        self.assertEqual(self.handler.obter_estatisticas().total(), antes + 2)
+        self.assertEqual(self.handler.obter_estatisticas().total(municipio='Municipio Novo'), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,80 @@
+import os
+import json
+import pickle
+from typing import Optional
+
+# Pasta padrão dos snapshots (fora da pasta do projeto, funciona também no executável)
+PASTA_CACHE_PADRAO = os.path.join(os.path.expanduser('~'), '.mortes_transito', 'cache_sheets')
+
+
+class CacheSheets:
+    """
+    Snapshots locais das abas do Google Sheets.
+
+    Cada planilha tem uma pasta com um manifesto (revisão da planilha e abas
+    válidas nessa revisão) e um arquivo pickle por aba. A revisão é o
+    modifiedTime do Drive: se a planilha mudou, os snapshots são ignorados.
+    """
+
+    def __init__(self, pasta: str = None):
+        self.pasta = pasta or PASTA_CACHE_PADRAO
+
+    def carregar_aba(self, spreadsheet_id: str, aba: str, revisao: str) -> Optional[dict]:
+        if not revisao:
+            return None
+
+        manifesto = self._ler_manifesto(spreadsheet_id)
+        if manifesto.get('revisao') != revisao or aba not in manifesto.get('abas', []):
+            return None
+
+        try:
+            with open(self._caminho_aba(spreadsheet_id, aba), 'rb') as f:
+                return pickle.load(f)
+        except Exception:
+            # Snapshot ausente ou corrompido: trata como cache vazio
+            return None
+
+    def salvar_aba(self, spreadsheet_id: str, aba: str, revisao: str, conteudo: dict):
+        # As demais abas do manifesto só continuam válidas se ele está na mesma revisão
+        if not revisao:
+            return
+
+        try:
+            os.makedirs(self._pasta_planilha(spreadsheet_id), exist_ok=True)
+            self._gravar_atomico(self._caminho_aba(spreadsheet_id, aba), pickle.dumps(conteudo))
+
+            manifesto = self._ler_manifesto(spreadsheet_id)
+            abas = set()
+            if manifesto.get('revisao') == revisao:
+                abas = set(manifesto.get('abas', []))
+            abas.add(aba)
+
+            novo_manifesto = {'revisao': revisao, 'abas': sorted(abas)}
+            self._gravar_atomico(self._caminho_manifesto(spreadsheet_id),
+                                 json.dumps(novo_manifesto).encode('utf-8'))
+
+        except Exception as e:
+            print(f"Aviso: Erro ao gravar cache da aba {aba}: {e}")
+
+    def _ler_manifesto(self, spreadsheet_id: str) -> dict:
+        try:
+            with open(self._caminho_manifesto(spreadsheet_id), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except Exception:
+            return {}
+
+    def _gravar_atomico(self, caminho: str, conteudo: bytes):
+        # Grava em arquivo temporário e substitui, para nunca deixar arquivo pela metade
+        temp = caminho + '.tmp'
+        with open(temp, 'wb') as f:
+            f.write(conteudo)
+        os.replace(temp, caminho)
+
+    def _pasta_planilha(self, spreadsheet_id: str) -> str:
+        return os.path.join(self.pasta, spreadsheet_id)
+
+    def _caminho_manifesto(self, spreadsheet_id: str) -> str:
+        return os.path.join(self._pasta_planilha(spreadsheet_id), 'manifesto.json')
+
+    def _caminho_aba(self, spreadsheet_id: str, aba: str) -> str:
+        return os.path.join(self._pasta_planilha(spreadsheet_id), f"{aba}.pkl")
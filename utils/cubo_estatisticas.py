@@ -0,0 +1,325 @@
+import threading
+from bisect import bisect_left
+from collections import Counter
+from typing import Dict, List, Optional
+import numpy as np
+import pandas as pd
+from .dados_estaticos import DIAS_SEMANA, MESES
+from .indice_datas import converter_data, converter_serie_datas
+
+# Dimensões do cubo: nome -> coluna da planilha (ano e faixa etária são derivadas)
+DIMENSOES = {
+    'ano': 'Data do Fato',
+    'mes': 'Mês',
+    'dia_semana': 'Dia da Semana',
+    'municipio': 'Município do Fato',
+    'regiao': 'Região',
+    'tipo_acidente': 'Tipo de Acidente',
+    'veiculo_vitima': 'Veículo Vítima\nOu Outros',
+    'sexo': 'Sexo',
+    'faixa_etaria': 'Idade',
+}
+
+# Faixa etária: idade até o limite (inclusive) cai no rótulo da mesma posição
+LIMITES_FAIXA_ETARIA = [17, 24, 29, 39, 49, 59]
+FAIXAS_ETARIAS = ['0 a 17', '18 a 24', '25 a 29', '30 a 39', '40 a 49', '50 a 59', '60 ou mais']
+
+# Dimensões com ordem natural (nas tabelas de cruzar); as demais em ordem alfabética
+ORDEM_VALORES = {
+    'mes': MESES,
+    'dia_semana': DIAS_SEMANA,
+    'faixa_etaria': FAIXAS_ETARIAS,
+}
+
+# Registros novos acumulados antes de serem incorporados às células
+LIMITE_PENDENTES = 2000
+
+
+class CuboEstatisticas:
+    """
+    Contagem de registros por combinação das dimensões (DIMENSOES), para
+    estatísticas e relatórios sem percorrer o DataFrame.
+
+    Montado uma vez no carregamento (um groupby) e atualizado a cada
+    registro inserido: o registro entra num contador de pendentes e nas
+    contagens por dimensão, sem tocar nas células. As consultas filtram as
+    células com operações vetoriais e somam os pendentes.
+
+    Valores ausentes (vazio, NaN, idade inválida) ficam como None.
+
+    Exemplo (relatório de março de 2025 por município):
+        cubo.detalhar('municipio', ano=2025, mes='MARÇO')
+    """
+
+    def __init__(self):
+        self._celulas = _celulas_vazias()
+        self._pendentes: Counter = Counter()
+        self._por_dimensao: Dict[str, Counter] = {d: Counter() for d in DIMENSOES}
+        self._total = 0
+        # Consultado pela interface e atualizado pela thread de gravação
+        self._lock = threading.Lock()
+
+    @classmethod
+    def montar(cls, dataframes: List[pd.DataFrame]) -> 'CuboEstatisticas':
+        cubo = cls()
+        partes = [_dimensoes_dataframe(df) for df in dataframes if len(df) > 0]
+        if not partes:
+            return cubo
+
+        dimensoes = pd.concat(partes, ignore_index=True)
+        celulas = dimensoes.groupby(list(DIMENSOES), dropna=False, observed=True, sort=False).size()
+        cubo._celulas = celulas.rename('total').reset_index()
+        cubo._total = len(dimensoes)
+        for dimensao in DIMENSOES:
+            contagens = dimensoes[dimensao].value_counts(dropna=False)
+            cubo._por_dimensao[dimensao] = Counter(
+                {_sem_nan(valor): int(total) for valor, total in contagens.items()})
+        return cubo
+
+    def registrar(self, registro: dict):
+        # O(1) por registro: só contadores
+        chave = _dimensoes_registro(registro)
+        with self._lock:
+            self._pendentes[chave] += 1
+            self._total += 1
+            for dimensao, valor in zip(DIMENSOES, chave):
+                self._por_dimensao[dimensao][valor] += 1
+
+            if len(self._pendentes) >= LIMITE_PENDENTES:
+                self._incorporar_pendentes()
+
+    def total(self, **filtros) -> int:
+        """Registros que atendem aos filtros (dimensão=valor ou dimensão=[valores])."""
+        if not filtros:
+            return self._total
+        return sum(self.detalhar(next(iter(filtros)), **filtros).values())
+
+    def detalhar(self, dimensao: str, **filtros) -> Dict:
+        """
+        Contagem por valor de uma dimensão (do maior para o menor), só entre
+        os registros que atendem aos filtros.
+        """
+        return self.detalhar_varias([dimensao], **filtros)[dimensao]
+
+    def detalhar_varias(self, dimensoes: List[str], **filtros) -> Dict[str, Dict]:
+        # Várias dimensões com os mesmos filtros: as células são filtradas uma única vez
+        _validar_dimensoes([*dimensoes, *filtros])
+
+        with self._lock:
+            if not filtros:
+                resultado = {d: {v: t for v, t in self._por_dimensao[d].items() if t > 0}
+                             for d in dimensoes}
+            else:
+                celulas = self._filtrar(filtros)
+                pendentes = list(self._pendentes_filtrados(filtros))
+                resultado = {}
+                for dimensao in dimensoes:
+                    contagens = Counter()
+                    if len(celulas):
+                        somas = celulas.groupby(dimensao, dropna=False, observed=True)['total'].sum()
+                        contagens.update({_sem_nan(v): int(t) for v, t in somas.items()})
+                    for chave, total in pendentes:
+                        contagens[chave[_posicao(dimensao)]] += total
+                    resultado[dimensao] = contagens
+
+        return {d: dict(sorted(c.items(), key=lambda item: (-item[1], _ordem_valor(item[0]))))
+                for d, c in resultado.items()}
+
+    def cruzar(self, linhas: str, colunas: str, **filtros) -> pd.DataFrame:
+        """Tabela de contagens linhas x colunas (ex.: municipio x mes)."""
+        _validar_dimensoes([linhas, colunas, *filtros])
+
+        with self._lock:
+            registros = [
+                self._celulas.loc[self._mascara(self._celulas, filtros), [linhas, colunas, 'total']]
+            ]
+            pendentes = [(chave[_posicao(linhas)], chave[_posicao(colunas)], total)
+                         for chave, total in self._pendentes_filtrados(filtros)]
+
+        if pendentes:
+            registros.append(pd.DataFrame(pendentes, columns=[linhas, colunas, 'total']))
+        tabela = pd.concat([_como_objeto(r) for r in registros], ignore_index=True)
+        tabela = tabela.fillna({linhas: 'NI', colunas: 'NI'})
+        tabela = tabela.pivot_table(index=linhas, columns=colunas, values='total',
+                                    aggfunc='sum', fill_value=0)
+        return tabela.reindex(index=_rotulos_ordenados(linhas, tabela.index),
+                              columns=_rotulos_ordenados(colunas, tabela.columns))
+
+    def resumo_mensal(self, ano: int, mes: str) -> dict:
+        """Total e principais detalhamentos de um mês (mes como na coluna Mês, ex.: 'MARÇO')."""
+        detalhes = self.detalhar_varias(['municipio', 'tipo_acidente', 'veiculo_vitima', 'sexo', 'faixa_etaria'],
+                                        ano=ano, mes=mes.upper())
+        return {'total': sum(detalhes['sexo'].values()), **detalhes}
+
+    def valores(self, dimensao: str) -> list:
+        # Valores presentes (sem None), ordenados
+        _validar_dimensoes([dimensao])
+        with self._lock:
+            valores = [v for v, t in self._por_dimensao[dimensao].items() if t > 0 and v is not None]
+        return sorted(valores, key=_ordem_valor)
+
+    def _filtrar(self, filtros: dict) -> pd.DataFrame:
+        return self._celulas[self._mascara(self._celulas, filtros)]
+
+    def _mascara(self, celulas: pd.DataFrame, filtros: dict) -> np.ndarray:
+        mascara = np.ones(len(celulas), dtype=bool)
+        for dimensao, valor in filtros.items():
+            valores = _lista_filtro(valor)
+            coluna = celulas[dimensao]
+            selecao = coluna.isin([v for v in valores if v is not None]).to_numpy()
+            if None in valores:
+                selecao = selecao | coluna.isna().to_numpy()
+            mascara &= selecao
+        return mascara
+
+    def _pendentes_filtrados(self, filtros: dict):
+        condicoes = [(_posicao(d), set(_lista_filtro(v))) for d, v in filtros.items()]
+        for chave, total in self._pendentes.items():
+            if all(chave[posicao] in valores for posicao, valores in condicoes):
+                yield chave, total
+
+    def _incorporar_pendentes(self):
+        # Chamado com o lock: soma os pendentes às células (uma vez a cada LIMITE_PENDENTES)
+        novos = pd.DataFrame([(*chave, total) for chave, total in self._pendentes.items()],
+                             columns=[*DIMENSOES, 'total'])
+        celulas = pd.concat([_como_objeto(self._celulas), novos], ignore_index=True)
+        celulas = celulas.groupby(list(DIMENSOES), dropna=False, sort=False)['total'].sum()
+        self._celulas = _dimensoes_categoricas(celulas.reset_index())
+        self._pendentes = Counter()
+
+
+# DIMENSOES DE UM DATAFRAME / REGISTRO
+
+def _dimensoes_dataframe(df: pd.DataFrame) -> pd.DataFrame:
+    dimensoes = {}
+    for dimensao, coluna in DIMENSOES.items():
+        if coluna not in df.columns:
+            dimensoes[dimensao] = pd.Series(None, index=df.index, dtype=object)
+        elif dimensao == 'ano':
+            anos = converter_serie_datas(df[coluna]).dt.year
+            dimensoes[dimensao] = anos.astype('Int16')
+        elif dimensao == 'faixa_etaria':
+            dimensoes[dimensao] = _faixas_serie(df[coluna])
+        else:
+            dimensoes[dimensao] = _texto_serie(df[coluna])
+
+    return _dimensoes_categoricas(pd.DataFrame(dimensoes))
+
+
+def _dimensoes_registro(registro: dict) -> tuple:
+    chave = []
+    for dimensao, coluna in DIMENSOES.items():
+        valor = registro.get(coluna)
+        if dimensao == 'ano':
+            data = converter_data(valor)
+            chave.append(None if pd.isna(data) else int(data.year))
+        elif dimensao == 'faixa_etaria':
+            chave.append(faixa_etaria(valor))
+        else:
+            chave.append(_texto(valor))
+    return tuple(chave)
+
+
+def faixa_etaria(idade) -> Optional[str]:
+    if idade is None or (not isinstance(idade, str) and pd.isna(idade)):
+        return None
+    try:
+        idade = float(idade)
+    except (TypeError, ValueError):
+        return None
+    if np.isnan(idade) or idade < 0:
+        return None
+    return FAIXAS_ETARIAS[bisect_left(LIMITES_FAIXA_ETARIA, idade)]
+
+
+def _faixas_serie(serie: pd.Series) -> pd.Series:
+    # Mesma regra de faixa_etaria, vetorizada
+    idades = pd.to_numeric(serie.astype(object), errors='coerce').to_numpy(dtype=float)
+    posicoes = np.searchsorted(LIMITES_FAIXA_ETARIA, idades, side='left')
+    faixas = np.array(FAIXAS_ETARIAS, dtype=object)[np.minimum(posicoes, len(FAIXAS_ETARIAS) - 1)]
+    faixas[np.isnan(idades) | (idades < 0)] = None
+    return pd.Series(faixas, index=serie.index, dtype=object)
+
+
+def _texto_serie(serie: pd.Series) -> pd.Series:
+    # Mesma regra de _texto, aplicada uma vez por valor distinto
+    if isinstance(serie.dtype, pd.CategoricalDtype):
+        textos = np.array([_texto(v) for v in serie.cat.categories] + [None], dtype=object)
+        return pd.Series(textos[serie.cat.codes.to_numpy()], index=serie.index, dtype=object)
+
+    valores = serie.astype(object)
+    presentes = valores.notna()
+    mapa = {valor: _texto(valor) for valor in pd.unique(valores[presentes])}
+    resultado = pd.Series(None, index=serie.index, dtype=object)
+    resultado[presentes] = valores[presentes].map(mapa)
+    return resultado
+
+
+def _texto(valor) -> Optional[str]:
+    if valor is None or (not isinstance(valor, str) and pd.isna(valor)):
+        return None
+    return str(valor).strip() or None
+
+
+def _dimensoes_categoricas(df: pd.DataFrame) -> pd.DataFrame:
+    # Categorias deixam os filtros (isin) e o groupby das consultas vetoriais e compactos
+    for dimensao in DIMENSOES:
+        if dimensao != 'ano':
+            df[dimensao] = df[dimensao].astype('category')
+        else:
+            df[dimensao] = df[dimensao].astype('Int16')
+    return df
+
+
+def _como_objeto(df: pd.DataFrame) -> pd.DataFrame:
+    # Valores como objetos Python (None nos ausentes), para juntar células e pendentes
+    df = df.copy()
+    for coluna in df.columns:
+        if coluna != 'total':
+            df[coluna] = df[coluna].astype(object).where(df[coluna].notna(), None)
+    return df
+
+
+def _celulas_vazias() -> pd.DataFrame:
+    vazio = pd.DataFrame({d: pd.Series(dtype=object) for d in DIMENSOES})
+    vazio['total'] = pd.Series(dtype='int64')
+    return _dimensoes_categoricas(vazio)
+
+
+def _lista_filtro(valor) -> list:
+    if isinstance(valor, (list, tuple, set, frozenset)):
+        return list(valor)
+    return [valor]
+
+
+def _posicao(dimensao: str) -> int:
+    return list(DIMENSOES).index(dimensao)
+
+
+def _validar_dimensoes(dimensoes) -> None:
+    for dimensao in dimensoes:
+        if dimensao not in DIMENSOES:
+            raise ValueError(f"Dimensão desconhecida: {dimensao}. Disponíveis: {', '.join(DIMENSOES)}")
+
+
+def _sem_nan(valor):
+    if valor is None or valor is pd.NA or (isinstance(valor, float) and np.isnan(valor)):
+        return None
+    if isinstance(valor, np.generic):
+        return valor.item()
+    return valor
+
+
+def _rotulos_ordenados(dimensao: str, rotulos) -> list:
+    ordem = ORDEM_VALORES.get(dimensao, [])
+    posicao = {valor: i for i, valor in enumerate(ordem)}
+    return sorted(rotulos, key=lambda v: (v == 'NI', posicao.get(v, len(ordem)), _ordem_valor(v)))
+
+
+def _ordem_valor(valor) -> tuple:
+    # Ausentes por último; números antes de textos
+    if valor is None:
+        return (2, '')
+    if isinstance(valor, (int, float)):
+        return (0, valor)
+    return (1, str(valor))
@@ -30,6 +30,24 @@ COLUNAS_EXCEL = [
     "OBS:"
 ]
 
+# Colunas da ocorrência: iguais para todas as vítimas de um mesmo acidente
+COLUNAS_OCORRENCIA = [
+    "Natureza da Ocorrência",
+    "Tipo de Acidente",
+    "Município do Fato",
+    "Logradouro",
+    "Subtipo do Local",
+    "Lat",
+    "Long",
+    "Data do Fato",
+    "Hora do fato",
+    "Dia da Semana",
+    "Mês",
+    "Região",
+    "Território de\nDesenvolvimento",
+    "OBS:"
+]
+
 TIPO_ACIDENTE = [
     "Atropelamento",
     "Atropelamento com Animais",
@@ -1,24 +1,64 @@
 import mysql.connector
-from typing import Tuple, Optional
+from mysql.connector import pooling
+from typing import Tuple, Optional, Callable
 from datetime import datetime, date, time
 import os
+import time as cronometro
+import numpy as np
+import pandas as pd
 from dotenv import load_dotenv
+from .esquema import serie_exibicao
 
 load_dotenv()
 
+# Conexões mantidas abertas no pool (a interface e a sincronização em segundo plano)
+TAMANHO_POOL = 2
+
+# Registros por lote (um executemany e um commit por lote) na importação em massa
+TAMANHO_LOTE_PADRAO = 1000
+
+SQL_INSERIR_OCORRENCIA = """
+    INSERT INTO ocorrencias (
+        data_fato, hora_fato, dia_semana, mes_referencia,
+        id_municipio, logradouro, subtipo_local,
+        id_natureza, id_tipo_acidente, latitude, longitude
+    ) VALUES (
+        %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s
+    )
+"""
+
+SQL_INSERIR_VITIMA = """
+    INSERT INTO vitimas (
+        id_ocorrencia, nome, sexo, data_nascimento, idade,
+        cpf, filiacao, possui_cnh, e_condutor, exame_alcoolemia,
+        uso_capacete, id_veiculo_vitima, id_veiculo_envolvido,
+        data_obito, local_morte, natureza_laudo
+    ) VALUES (
+        %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s
+    )
+"""
+
 
 class DatabaseHandler:
+    """
+    Handler MySQL de vida longa: criado uma vez na inicialização da aplicação.
+
+    As conexões vêm de um pool aberto na primeira sincronização e os caches
+    de lookup são carregados uma única vez, então cada inserção custa apenas
+    os INSERTs e o commit.
+    """
 
     def __init__(self, config: dict = None):
         self.config = config or self._carregar_config()
-        self.connection = None
-        self.cursor = None
+        self.pool = None
 
         # Cache para lookups
         self._cache_natureza = {}
         self._cache_tipo_acidente = {}
         self._cache_tipo_veiculo = {}
         self._cache_municipio = {}
+        self._caches_carregados = False
+        self._incremento = None  # Passo dos ids de um INSERT multi-linhas (0: não consecutivos)
 
     def _carregar_config(self) -> dict:
         config = {
@@ -40,17 +80,22 @@ class DatabaseHandler:
 
     def conectar(self) -> Tuple[bool, str]:
         try:
-            self.connection = mysql.connector.connect(
-                host=self.config['host'],
-                port=self.config['port'],
-                database=self.config['database'],
-                user=self.config['user'],
-                password=self.config['password'],
-                connect_timeout=15
-            )
-            self.cursor = self.connection.cursor()
-
-            self._carregar_caches()
+            if self.pool is None:
+                self.pool = pooling.MySQLConnectionPool(
+                    pool_name='mortes_transito',
+                    pool_size=TAMANHO_POOL,
+                    # Não usamos estado de sessão: evita um round-trip a cada devolução
+                    pool_reset_session=False,
+                    host=self.config['host'],
+                    port=self.config['port'],
+                    database=self.config['database'],
+                    user=self.config['user'],
+                    password=self.config['password'],
+                    connect_timeout=15
+                )
+
+            if not self._caches_carregados:
+                self._carregar_caches()
 
             return True, "Conexao com MySQL estabelecida!"
 
@@ -59,66 +104,104 @@ class DatabaseHandler:
         except Exception as e:
             return False, f"Erro ao conectar: {str(e)}"
 
+    def _obter_conexao(self):
+        # Conexão emprestada do pool (reconecta se o servidor a derrubou);
+        # close() a devolve ao pool sem encerrar o TCP
+        return self.pool.get_connection()
+
     def _carregar_caches(self):
+        conexao = None
         try:
+            conexao = self._obter_conexao()
+            cursor = conexao.cursor()
+
             # Cache natureza_ocorrencia
-            self.cursor.execute("SELECT id, descricao FROM naturezas_ocorrencia")
-            for id_val, descricao in self.cursor.fetchall():
+            cursor.execute("SELECT id, descricao FROM naturezas_ocorrencia")
+            for id_val, descricao in cursor.fetchall():
                 self._cache_natureza[descricao.strip().lower()] = id_val
 
             # Cache tipo_acidente
-            self.cursor.execute("SELECT id, descricao FROM tipos_acidente")
-            for id_val, descricao in self.cursor.fetchall():
+            cursor.execute("SELECT id, descricao FROM tipos_acidente")
+            for id_val, descricao in cursor.fetchall():
                 self._cache_tipo_acidente[descricao.strip().lower()] = id_val
 
             # Cache tipo_veiculo
-            self.cursor.execute("SELECT id, descricao FROM tipos_veiculo")
-            for id_val, descricao in self.cursor.fetchall():
+            cursor.execute("SELECT id, descricao FROM tipos_veiculo")
+            for id_val, descricao in cursor.fetchall():
                 self._cache_tipo_veiculo[descricao.strip().lower()] = id_val
 
             # Cache municipios
-            self.cursor.execute("SELECT id, nome FROM municipios")
-            for id_val, nome in self.cursor.fetchall():
+            cursor.execute("SELECT id, nome FROM municipios")
+            for id_val, nome in cursor.fetchall():
                 if nome:
                     self._cache_municipio[nome.strip().lower()] = id_val
 
+            cursor.close()
+            self._caches_carregados = True
+
         except Exception as e:
             print(f"Aviso: Erro ao carregar caches: {e}")
+        finally:
+            if conexao:
+                conexao.close()
 
     def inserir_registro(self, dados: dict) -> Tuple[bool, str]:
 
-        if not self.connection:
+        if self.pool is None or not self._caches_carregados:
             sucesso, msg = self.conectar()
             if not sucesso:
                 return False, msg
 
         try:
+            conexao = self._obter_conexao()
+        except mysql.connector.Error as e:
+            return False, f"Erro de conexao: {e}"
+
+        cursor = None
+        try:
+            cursor = conexao.cursor()
+
             # 1. Insere na tabela ocorrencias
-            id_ocorrencia = self._inserir_ocorrencia(dados)
+            id_ocorrencia = self._inserir_ocorrencia(cursor, dados)
 
             if not id_ocorrencia:
-                self.connection.rollback()
+                conexao.rollback()
                 return False, "Erro ao inserir ocorrencia"
 
             # 2. Insere na tabela vitimas com o id_ocorrencia
-            sucesso_vitima = self._inserir_vitima(dados, id_ocorrencia)
+            sucesso_vitima = self._inserir_vitima(cursor, dados, id_ocorrencia)
 
             if not sucesso_vitima:
-                self.connection.rollback()
+                conexao.rollback()
                 return False, "Erro ao inserir vitima"
 
-            self.connection.commit()
+            conexao.commit()
 
             return True, f"Registro inserido no MySQL! (Ocorrencia ID: {id_ocorrencia})"
 
         except mysql.connector.IntegrityError as e:
-            self.connection.rollback()
+            self._rollback(conexao)
             return False, f"Erro de integridade: {e}"
         except Exception as e:
-            self.connection.rollback()
+            self._rollback(conexao)
             return False, f"Erro ao inserir: {str(e)}"
+        finally:
+            if cursor:
+                try:
+                    cursor.close()
+                except Exception:
+                    pass
+            # Devolve a conexão ao pool
+            conexao.close()
+
+    def _rollback(self, conexao):
+        try:
+            conexao.rollback()
+        except Exception:
+            # Conexão caiu no meio da transação: o servidor já descartou tudo
+            pass
 
-    def _inserir_ocorrencia(self, dados: dict) -> Optional[int]:
+    def _inserir_ocorrencia(self, cursor, dados: dict) -> Optional[int]:
         data_fato = self._converter_data(self._get_valor(dados, 'Data do Fato'))
         hora_fato = self._converter_hora(self._get_valor(dados, 'Hora do fato'))
         dia_semana = self._get_valor(dados, 'Dia da Semana')
@@ -133,26 +216,16 @@ class DatabaseHandler:
         id_tipo_acidente = self._lookup_tipo_acidente(self._get_valor(dados, 'Tipo de Acidente'))
         id_municipio = self._lookup_municipio(self._get_valor(dados, 'Município do Fato'))
 
-        query = """
-            INSERT INTO ocorrencias (
-                data_fato, hora_fato, dia_semana, mes_referencia,
-                id_municipio, logradouro, subtipo_local,
-                id_natureza, id_tipo_acidente, latitude, longitude
-            ) VALUES (
-                %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s
-            )
-        """
-
         valores = (
             data_fato, hora_fato, dia_semana, mes_referencia,
             id_municipio, logradouro, subtipo_local,
             id_natureza, id_tipo_acidente, latitude, longitude
         )
 
-        self.cursor.execute(query, valores)
-        return self.cursor.lastrowid
+        cursor.execute(SQL_INSERIR_OCORRENCIA, valores)
+        return cursor.lastrowid
 
-    def _inserir_vitima(self, dados: dict, id_ocorrencia: int) -> bool:
+    def _inserir_vitima(self, cursor, dados: dict, id_ocorrencia: int) -> bool:
         nome = self._get_valor(dados, 'Vítima')
         sexo = self._get_valor(dados, 'Sexo')
         data_nascimento = self._converter_data(self._get_valor(dados, 'Data de\nNascimento'))
@@ -171,17 +244,6 @@ class DatabaseHandler:
         id_veiculo_vitima = self._lookup_veiculo(self._get_valor(dados, 'Veículo Vítima\nOu Outros'))
         id_veiculo_envolvido = self._lookup_veiculo(self._get_valor(dados, 'Veículo Envolvido\nOu Outros'))
 
-        query = """
-            INSERT INTO vitimas (
-                id_ocorrencia, nome, sexo, data_nascimento, idade,
-                cpf, filiacao, possui_cnh, e_condutor, exame_alcoolemia,
-                uso_capacete, id_veiculo_vitima, id_veiculo_envolvido,
-                data_obito, local_morte, natureza_laudo
-            ) VALUES (
-                %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s
-            )
-        """
-
         valores = (
             id_ocorrencia, nome, sexo, data_nascimento, idade,
             cpf, filiacao, possui_cnh, e_condutor, exame_alcoolemia,
@@ -189,9 +251,293 @@ class DatabaseHandler:
             data_obito, local_morte, natureza_laudo
         )
 
-        self.cursor.execute(query, valores)
+        cursor.execute(SQL_INSERIR_VITIMA, valores)
         return True
 
+    # IMPORTACAO EM LOTE
+
+    def importar_dataframe(self, df: pd.DataFrame, tamanho_lote: int = TAMANHO_LOTE_PADRAO,
+                           progresso: Callable[[int, int], None] = None,
+                           inicio: int = 0) -> Tuple[bool, str]:
+        """
+        Importa um DataFrame inteiro (colunas de COLUNAS_EXCEL) para o MySQL.
+
+        As colunas são convertidas de uma vez e cada lote grava suas
+        ocorrências e vítimas com executemany numa única transação. Se um
+        lote falhar, os lotes anteriores continuam gravados: progresso recebe
+        o total já gravado após cada commit, e inicio (esse total) retoma a
+        importação do registro seguinte sem duplicar os anteriores.
+        """
+        if df is None or len(df) == 0:
+            return False, "Nenhum registro para importar."
+
+        if not 0 <= inicio < len(df):
+            return False, f"Inicio {inicio} fora do intervalo (0 a {len(df) - 1})."
+
+        if self.pool is None or not self._caches_carregados:
+            sucesso, msg = self.conectar()
+            if not sucesso:
+                return False, msg
+
+        comeco = cronometro.perf_counter()
+        ocorrencias, vitimas = self._converter_dataframe(df.iloc[inicio:])
+        total = len(df)
+        importados = inicio
+
+        try:
+            conexao = self._obter_conexao()
+        except mysql.connector.Error as e:
+            return False, f"Erro de conexao: {e}"
+
+        cursor = None
+        try:
+            cursor = conexao.cursor()
+            incremento = self._incremento_consecutivo(cursor)
+
+            for inicio_lote in range(0, len(ocorrencias), tamanho_lote):
+                fim_lote = min(inicio_lote + tamanho_lote, len(ocorrencias))
+
+                self._gravar_lote(cursor, ocorrencias[inicio_lote:fim_lote],
+                                  vitimas[inicio_lote:fim_lote], incremento)
+
+                conexao.commit()
+                importados = inicio + fim_lote
+
+                if progresso:
+                    progresso(importados, total)
+
+        except mysql.connector.Error as e:
+            self._rollback(conexao)
+            return False, (f"Erro na importacao apos {importados} de {total} registros: {e}")
+        except Exception as e:
+            self._rollback(conexao)
+            return False, (f"Erro na importacao apos {importados} de {total} registros: {str(e)}")
+        finally:
+            if cursor:
+                try:
+                    cursor.close()
+                except Exception:
+                    pass
+            conexao.close()
+
+        duracao = cronometro.perf_counter() - comeco
+        gravados = importados - inicio
+        taxa = gravados / duracao if duracao > 0 else float(gravados)
+
+        return True, (f"{gravados} registros importados em {duracao:.1f}s "
+                      f"({taxa:.0f} registros/s).")
+
+    def inserir_lote(self, lista_dados: list) -> Tuple[bool, str]:
+        """
+        Insere vários registros numa única transação. Cada item é um dict do
+        formulário (uma ocorrência com uma vítima) ou uma lista de dicts (uma
+        ocorrência com várias vítimas, dados da ocorrência tirados do primeiro).
+        """
+        if not lista_dados:
+            return True, "Nenhum registro para inserir."
+
+        if self.pool is None or not self._caches_carregados:
+            sucesso, msg = self.conectar()
+            if not sucesso:
+                return False, msg
+
+        grupos = [item if isinstance(item, list) else [item] for item in lista_dados]
+        registros = [dados for grupo in grupos for dados in grupo]
+        ocorrencias, vitimas = self._converter_dataframe(pd.DataFrame(registros))
+
+        # Uma ocorrência por grupo; cada vítima aponta para a ocorrência do seu grupo
+        primeiras = []
+        ocorrencia_da_vitima = []
+        for indice_grupo, grupo in enumerate(grupos):
+            primeiras.append(len(ocorrencia_da_vitima))
+            ocorrencia_da_vitima.extend([indice_grupo] * len(grupo))
+        ocorrencias = [ocorrencias[i] for i in primeiras]
+
+        try:
+            conexao = self._obter_conexao()
+        except mysql.connector.Error as e:
+            return False, f"Erro de conexao: {e}"
+
+        cursor = None
+        try:
+            cursor = conexao.cursor()
+            self._gravar_lote(cursor, ocorrencias, vitimas, self._incremento_consecutivo(cursor),
+                              ocorrencia_da_vitima)
+            conexao.commit()
+
+            if len(vitimas) == len(ocorrencias):
+                return True, f"{len(ocorrencias)} registro(s) inserido(s) no MySQL!"
+            return True, (f"{len(vitimas)} vitima(s) em {len(ocorrencias)} ocorrencia(s) "
+                          f"inserida(s) no MySQL!")
+
+        except (mysql.connector.OperationalError, mysql.connector.InterfaceError) as e:
+            self._rollback(conexao)
+            return False, f"Erro de conexao: {e}"
+        except mysql.connector.IntegrityError as e:
+            self._rollback(conexao)
+            return False, f"Erro de integridade: {e}"
+        except Exception as e:
+            self._rollback(conexao)
+            return False, f"Erro ao inserir: {str(e)}"
+        finally:
+            if cursor:
+                try:
+                    cursor.close()
+                except Exception:
+                    pass
+            conexao.close()
+
+    def _gravar_lote(self, cursor, ocorrencias: list, vitimas: list, incremento: int,
+                     ocorrencia_da_vitima: list = None):
+        # ocorrencia_da_vitima[i]: índice em ocorrencias da vítima i (padrão: uma para uma);
+        # incremento 0: ids não consecutivos (ver _incremento_consecutivo)
+        if ocorrencia_da_vitima is None:
+            ocorrencia_da_vitima = range(len(vitimas))
+
+        if incremento:
+            # executemany de INSERT ... VALUES vira um único INSERT multi-linhas,
+            # que recebe ids consecutivos a partir do primeiro
+            cursor.executemany(SQL_INSERIR_OCORRENCIA, ocorrencias)
+            primeiro_id = cursor.lastrowid
+            ids = [primeiro_id + indice * incremento for indice in range(len(ocorrencias))]
+        else:
+            # Ids podem se intercalar com os de outras conexões: o de cada INSERT vem do lastrowid
+            ids = []
+            for ocorrencia in ocorrencias:
+                cursor.execute(SQL_INSERIR_OCORRENCIA, ocorrencia)
+                ids.append(cursor.lastrowid)
+
+        vitimas_lote = [
+            (ids[indice],) + vitima
+            for indice, vitima in zip(ocorrencia_da_vitima, vitimas)
+        ]
+        cursor.executemany(SQL_INSERIR_VITIMA, vitimas_lote)
+
+    def _incremento_consecutivo(self, cursor) -> int:
+        """
+        Passo entre os ids de um INSERT multi-linhas, ou 0 se o servidor não
+        garante ids consecutivos.
+
+        Com innodb_autoinc_lock_mode 0 ou 1, um INSERT com várias linhas
+        reserva os ids de uma vez, no passo de auto_increment_increment. Com o
+        modo 2 (padrão do MySQL 8), os ids de inserções simultâneas de outras
+        conexões podem se intercalar com os do lote.
+        """
+        if self._incremento is None:
+            try:
+                cursor.execute("SELECT @@innodb_autoinc_lock_mode, @@auto_increment_increment")
+                modo, incremento = cursor.fetchone()
+                self._incremento = int(incremento) if int(modo) in (0, 1) else 0
+            except mysql.connector.Error:
+                # Sem como conferir (ex.: servidor sem InnoDB): um INSERT por ocorrência
+                self._incremento = 0
+        return self._incremento
+
+    def _converter_dataframe(self, df: pd.DataFrame) -> Tuple[list, list]:
+        # Mesmas regras de _inserir_ocorrencia/_inserir_vitima, aplicadas coluna a coluna
+        colunas_ocorrencia = [
+            self._serie_datas(df, 'Data do Fato'),
+            self._serie_horas(df, 'Hora do fato'),
+            self._serie_texto(df, 'Dia da Semana'),
+            self._serie_texto(df, 'Mês'),
+            self._serie_lookup(df, 'Município do Fato', self._cache_municipio),
+            self._serie_texto(df, 'Logradouro'),
+            self._serie_texto(df, 'Subtipo do Local'),
+            self._serie_lookup(df, 'Natureza da Ocorrência', self._cache_natureza),
+            self._serie_lookup(df, 'Tipo de Acidente', self._cache_tipo_acidente),
+            self._serie_float(df, 'Lat'),
+            self._serie_float(df, 'Long'),
+        ]
+
+        # Sem o id_ocorrencia, que só é conhecido depois de inserir o lote
+        colunas_vitima = [
+            self._serie_texto(df, 'Vítima'),
+            self._serie_texto(df, 'Sexo'),
+            self._serie_datas(df, 'Data de\nNascimento'),
+            self._serie_int(df, 'Idade'),
+            self._serie_texto(df, 'CPF'),
+            self._serie_texto(df, 'Filiação'),
+            self._serie_texto(df, 'Possui\nCNH'),
+            self._serie_boolean(df, 'Condutor'),
+            self._serie_texto(df, 'Realizado Exame\nAlcoolemia'),
+            self._serie_texto(df, 'Estava usando\nCapacete'),
+            self._serie_lookup(df, 'Veículo Vítima\nOu Outros', self._cache_tipo_veiculo),
+            self._serie_lookup(df, 'Veículo Envolvido\nOu Outros', self._cache_tipo_veiculo),
+            self._serie_datas(df, 'Data do Óbito'),
+            self._serie_texto(df, 'Local da Morte'),
+            self._serie_texto(df, 'Natureza do Laudo'),
+        ]
+
+        return list(zip(*colunas_ocorrencia)), list(zip(*colunas_vitima))
+
+    def _serie_bruta(self, df: pd.DataFrame, coluna: str) -> pd.Series:
+        # Texto sem espaços nas pontas; vazio para célula ausente (NaN/None)
+        if coluna not in df.columns:
+            return pd.Series('', index=df.index, dtype=object)
+        serie = serie_exibicao(df[coluna])
+        return serie.where(serie.notna(), '').astype(str).str.strip()
+
+    def _para_lista(self, serie: pd.Series) -> list:
+        # Valores ausentes viram None (NULL no MySQL)
+        valores = serie.astype(object)
+        valores[serie.isna()] = None
+        return valores.tolist()
+
+    def _serie_texto(self, df: pd.DataFrame, coluna: str) -> list:
+        texto = self._serie_bruta(df, coluna)
+        return self._para_lista(texto.where(texto != ''))
+
+    def _serie_lookup(self, df: pd.DataFrame, coluna: str, cache: dict) -> list:
+        chaves = self._serie_bruta(df, coluna).str.lower()
+        return self._para_lista(chaves.map(cache))
+
+    def _serie_datas(self, df: pd.DataFrame, coluna: str) -> list:
+        if coluna in df.columns and pd.api.types.is_datetime64_any_dtype(df[coluna]):
+            datas = df[coluna]
+        else:
+            # dd/mm/yyyy; senão yyyy-mm-dd (inclui datetimes lidos do Excel)
+            texto = self._serie_bruta(df, coluna)
+            datas = pd.to_datetime(texto, format='%d/%m/%Y', errors='coerce')
+            datas = datas.fillna(pd.to_datetime(texto.str[:10], format='%Y-%m-%d', errors='coerce'))
+
+        return self._para_lista(datas.dt.date)
+
+    def _serie_horas(self, df: pd.DataFrame, coluna: str) -> list:
+        texto = self._serie_bruta(df, coluna)
+
+        # hh:mm[:ss] ou hhmm
+        partes = texto.str.extract(r'^(\d+):(\d+)(?::|$)')
+        compacto = texto.str.extract(r'^(\d{2})(\d{2})$')
+        horas = pd.to_numeric(partes[0].fillna(compacto[0]), errors='coerce')
+        minutos = pd.to_numeric(partes[1].fillna(compacto[1]), errors='coerce')
+
+        validas = horas.between(0, 23) & minutos.between(0, 59)
+        resultado = [None] * len(texto)
+        for i in np.flatnonzero(validas.to_numpy()):
+            resultado[i] = time(int(horas.iat[i]), int(minutos.iat[i]))
+        return resultado
+
+    def _serie_float(self, df: pd.DataFrame, coluna: str) -> list:
+        texto = self._serie_bruta(df, coluna).str.replace(',', '.', regex=False)
+        return self._para_lista(pd.to_numeric(texto.where(texto != ''), errors='coerce'))
+
+    def _serie_int(self, df: pd.DataFrame, coluna: str) -> list:
+        texto = self._serie_bruta(df, coluna)
+        numeros = pd.to_numeric(texto.where(texto != ''), errors='coerce')
+
+        # Mesma regra de _converter_int: parte inteira
+        validos = numeros.notna() & np.isfinite(numeros)
+        inteiros = [None] * len(numeros)
+        for i, valor in zip(np.flatnonzero(validos.to_numpy()), np.trunc(numeros[validos]).astype('int64').tolist()):
+            inteiros[i] = valor
+        return inteiros
+
+    def _serie_boolean(self, df: pd.DataFrame, coluna: str) -> list:
+        valores = self._serie_bruta(df, coluna).str.lower()
+        mapa = {v: True for v in ('sim', 's', 'yes', 'true', '1')}
+        mapa.update({v: False for v in ('não', 'nao', 'n', 'no', 'false', '0')})
+        return self._para_lista(valores.map(mapa))
+
     # METODOS DE LOOKUP
 
     def _lookup_natureza(self, valor: str) -> Optional[int]:
@@ -281,24 +627,21 @@ class DatabaseHandler:
         try:
             sucesso, msg = self.conectar()
             if sucesso:
-                self.cursor.execute("SELECT 1")
-                self.desconectar()
+                conexao = self._obter_conexao()
+                cursor = conexao.cursor()
+                cursor.execute("SELECT 1")
+                cursor.fetchall()
+                cursor.close()
+                conexao.close()
                 return True, "Conexao testada com sucesso!"
             return False, msg
         except Exception as e:
             return False, f"Erro no teste: {str(e)}"
 
     def desconectar(self):
-        try:
-            if self.cursor:
-                self.cursor.close()
-            if self.connection:
-                self.connection.close()
-        except:
-            pass
-        finally:
-            self.cursor = None
-            self.connection = None
+        # Solta o pool (chamado ao fechar a aplicação): as conexões ociosas fecham o
+        # socket quando ele é coletado, sem uma ida ao servidor na saída
+        self.pool = None
 
     def __del__(self):
         self.desconectar()
@@ -313,7 +656,6 @@ if __name__ == "__main__":
 
     if sucesso:
         print("\nCaches carregados:")
-        handler.conectar()
         print(f"  - Tipos Acidente: {len(handler._cache_tipo_acidente)}")
         print(f"  - Tipos Veiculo: {len(handler._cache_tipo_veiculo)}")
         print(f"  - Municipios: {len(handler._cache_municipio)}")
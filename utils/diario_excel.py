@@ -0,0 +1,131 @@
+import os
+import json
+import hashlib
+from typing import List, Optional, Tuple
+
+# Diários dos arquivos Excel abertos (um por planilha)
+PASTA_DIARIOS_PADRAO = os.path.join(os.path.expanduser('~'), '.mortes_transito', 'diarios')
+
+
+class DiarioExcel:
+    """
+    Diário (write-ahead log) dos registros inseridos numa planilha Excel.
+
+    Cada inserção acrescenta uma linha JSON e faz fsync, então o registro
+    está em disco antes de a interface confirmar. A planilha só é regravada
+    na compactação; se a aplicação cair antes, os registros do diário são
+    reaplicados no próximo carregamento do mesmo arquivo.
+
+    Formato (JSON Lines):
+        {"tipo": "base", "assinatura": [...]}             arquivo a que o diário se aplica
+        {"tipo": "registros", "seq": 1, "registros": [...]}
+        {"tipo": "compactacao", "ate": 1, "assinatura": [...]}
+
+    A linha de compactação é gravada antes de o arquivo compactado substituir
+    a planilha: se a queda acontecer entre as duas etapas, a assinatura diz
+    se a planilha já contém os registros.
+    """
+
+    def __init__(self, caminho_planilha: str, pasta: str = None):
+        pasta = pasta or PASTA_DIARIOS_PADRAO
+        os.makedirs(pasta, exist_ok=True)
+
+        caminho_absoluto = os.path.abspath(caminho_planilha)
+        nome = os.path.splitext(os.path.basename(caminho_absoluto))[0]
+        chave = hashlib.sha1(caminho_absoluto.encode('utf-8')).hexdigest()[:10]
+        self.caminho = os.path.join(pasta, f"{nome}-{chave}.jsonl")
+
+        self._arquivo = None
+        self._ultimo_seq = 0
+        self._pendentes = 0
+
+    def recuperar(self, assinatura_atual: Optional[tuple]) -> Tuple[List[list], bool]:
+        """
+        Lê o diário e retorna (lotes ainda não gravados na planilha, planilha
+        alterada fora da aplicação). Cada lote é a lista de registros de uma
+        inserção.
+        """
+        base, lotes, compactacao = self._ler()
+        alterada = base is not None and not _mesma_assinatura(base, assinatura_atual)
+
+        if compactacao and alterada:
+            # A planilha compactada substituiu a original: só os lotes posteriores faltam.
+            # Se a queda foi antes da troca, a planilha ainda é a base e todos são reaplicados.
+            alterada = not _mesma_assinatura(compactacao['assinatura'], assinatura_atual)
+            lotes = [lote for lote in lotes if lote['seq'] > compactacao['ate']]
+
+        self._ultimo_seq = max((lote['seq'] for lote in lotes), default=0)
+        return [lote['registros'] for lote in lotes], alterada
+
+    def iniciar(self, assinatura: Optional[tuple], lotes: List[list] = ()):
+        """Recomeça o diário para a planilha com esta assinatura (e os lotes ainda pendentes)."""
+        self.fechar()
+
+        temporario = f"{self.caminho}.tmp"
+        with open(temporario, 'w', encoding='utf-8') as f:
+            f.write(_linha({'tipo': 'base', 'assinatura': assinatura}))
+            for seq, registros in enumerate(lotes, start=1):
+                f.write(_linha({'tipo': 'registros', 'seq': seq, 'registros': registros}))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temporario, self.caminho)
+
+        self._ultimo_seq = len(lotes)
+        self._pendentes = len(lotes)
+
+    def registrar(self, registros: list):
+        self._ultimo_seq += 1
+        self._gravar({'tipo': 'registros', 'seq': self._ultimo_seq, 'registros': registros})
+        self._pendentes += 1
+
+    def marcar_compactacao(self, assinatura: tuple):
+        # Todos os lotes até aqui estão no arquivo com esta assinatura
+        self._gravar({'tipo': 'compactacao', 'ate': self._ultimo_seq, 'assinatura': assinatura})
+
+    def pendentes(self) -> int:
+        # Lotes registrados desde o último início (ainda não compactados)
+        return self._pendentes
+
+    def fechar(self):
+        if self._arquivo is not None:
+            self._arquivo.close()
+            self._arquivo = None
+
+    def _gravar(self, entrada: dict):
+        if self._arquivo is None:
+            self._arquivo = open(self.caminho, 'a', encoding='utf-8')
+
+        self._arquivo.write(_linha(entrada))
+        self._arquivo.flush()
+        os.fsync(self._arquivo.fileno())
+
+    def _ler(self) -> Tuple[Optional[list], List[dict], Optional[dict]]:
+        base, lotes, compactacao = None, [], None
+        try:
+            with open(self.caminho, encoding='utf-8') as f:
+                for linha in f:
+                    try:
+                        entrada = json.loads(linha)
+                    except json.JSONDecodeError:
+                        # Última linha incompleta (queda durante a escrita): nunca foi confirmada
+                        break
+
+                    if entrada['tipo'] == 'base':
+                        base = entrada['assinatura']
+                    elif entrada['tipo'] == 'registros':
+                        lotes.append(entrada)
+                    elif entrada['tipo'] == 'compactacao':
+                        compactacao = entrada
+        except FileNotFoundError:
+            pass
+
+        return base, lotes, compactacao
+
+
+def _linha(entrada: dict) -> str:
+    return json.dumps(entrada, ensure_ascii=False, default=str) + '\n'
+
+
+def _mesma_assinatura(gravada, atual) -> bool:
+    # A assinatura volta do JSON como lista
+    return gravada is not None and atual is not None and list(gravada) == list(atual)
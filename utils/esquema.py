@@ -0,0 +1,343 @@
+import numpy as np
+import pandas as pd
+from datetime import datetime
+from typing import Optional, Tuple
+from .dados_estaticos import (
+    TIPO_ACIDENTE, NATUREZA_LAUDO, SEXO, POSSUI_CNH, CONDUTOR, EXAME_ALCOOLEMIA,
+    USANDO_CAPACETE, SUBTIPO_LOCAL, DIAS_SEMANA, MESES, VEICULOS_VITIMA,
+    VEICULOS_ENVOLVIDO, REGIAO
+)
+
+# Tipos das colunas do DataFrame em memória (as demais continuam como texto).
+# O nome é comparado sem quebras de linha: 'Data de\nNascimento' == 'Data de Nascimento'
+CATEGORIA = 'categoria'
+DATA = 'data'
+COORDENADA = 'coordenada'
+INTEIRO = 'inteiro'
+
+ESQUEMA_COLUNAS = {
+    # Vocabulários fechados (valores fora da lista também são aceitos)
+    'Tipo de Acidente': (CATEGORIA, TIPO_ACIDENTE),
+    'Natureza do Laudo': (CATEGORIA, NATUREZA_LAUDO),
+    'Sexo': (CATEGORIA, SEXO),
+    'Possui CNH': (CATEGORIA, POSSUI_CNH),
+    'Condutor': (CATEGORIA, CONDUTOR),
+    'Realizado Exame Alcoolemia': (CATEGORIA, EXAME_ALCOOLEMIA),
+    'Estava usando Capacete': (CATEGORIA, USANDO_CAPACETE),
+    'Subtipo do Local': (CATEGORIA, SUBTIPO_LOCAL),
+    'Dia da Semana': (CATEGORIA, DIAS_SEMANA),
+    'Mês': (CATEGORIA, MESES),
+    'Veículo Vítima Ou Outros': (CATEGORIA, VEICULOS_VITIMA),
+    'Veículo Envolvido Ou Outros': (CATEGORIA, VEICULOS_ENVOLVIDO),
+    'Região': (CATEGORIA, REGIAO),
+    # Vocabulários abertos, mas com muita repetição
+    'Natureza da Ocorrência': (CATEGORIA, []),
+    'Município do Fato': (CATEGORIA, []),
+    'Local da Morte': (CATEGORIA, []),
+    'Território de Desenvolvimento': (CATEGORIA, []),
+    'Data do Óbito': (DATA, None),
+    'Data de Nascimento': (DATA, None),
+    'Data do Fato': (DATA, None),
+    'Lat': (COORDENADA, None),
+    'Long': (COORDENADA, None),
+    'Idade': (INTEIRO, None),
+}
+
+# Casas decimais das coordenadas (as mesmas do formulário de cadastro)
+CASAS_COORDENADA = 6
+
+PADRAO_INTEIRO = r'-?(0|[1-9][0-9]*)'
+PADRAO_DATA = r'[0-9]{2}/[0-9]{2}/[0-9]{4}'
+
+
+def tipo_coluna(coluna: str) -> Optional[tuple]:
+    return ESQUEMA_COLUNAS.get(' '.join(str(coluna).split()))
+
+
+def aplicar_esquema(df: pd.DataFrame, datas_em_texto: bool = True) -> pd.DataFrame:
+    """
+    Converte as colunas do esquema para tipos compactos (category, datetime64,
+    float32, Int16). A conversão só é feita se for sem perda, isto é, se
+    valor_exibicao devolver o mesmo conteúdo; senão a coluna fica como está.
+
+    Com datas_em_texto=False, colunas de data que contêm texto não são
+    convertidas (no Excel a célula passaria de texto para data).
+    """
+    convertidas = {}
+    for coluna in df.columns:
+        tipo = tipo_coluna(coluna)
+        if tipo is None:
+            continue
+        if tipo[0] == DATA and not datas_em_texto and not pd.api.types.is_datetime64_any_dtype(df[coluna]):
+            continue
+
+        tipada = _tipar_serie(df[coluna], *tipo)
+        if tipada is not None and tipada.dtype != df[coluna].dtype:
+            convertidas[coluna] = tipada
+
+    if not convertidas:
+        return df
+
+    df = df.copy(deep=False)
+    for coluna, serie in convertidas.items():
+        df[coluna] = serie
+    return df
+
+
+def alinhar_tipos(df: pd.DataFrame, novos: pd.DataFrame) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Prepara registros novos para serem concatenados a df sem perder os tipos.
+
+    Categorias novas são acrescentadas à coluna; se um valor não cabe no tipo
+    da coluna (ex.: data inválida), a coluna volta a ser object. Retorna
+    (df, novos) sem alterar o df original.
+    """
+    df_alinhado = df.copy(deep=False)
+    novos = novos.copy()
+
+    for coluna in novos.columns:
+        if coluna not in df.columns:
+            continue
+
+        dtype = df[coluna].dtype
+        tipo = tipo_coluna(coluna)
+        if tipo is None or not _tipo_compativel(dtype, tipo[0]):
+            continue
+
+        if isinstance(dtype, pd.CategoricalDtype):
+            tipada = _tipar_serie(novos[coluna], CATEGORIA, [])
+            if tipada is None:
+                df_alinhado[coluna] = df[coluna].astype(object)
+                continue
+            faltantes = [c for c in tipada.cat.categories if c not in dtype.categories]
+            if faltantes:
+                df_alinhado[coluna] = df[coluna].cat.add_categories(faltantes)
+            novos[coluna] = tipada.astype(df_alinhado[coluna].dtype)
+            continue
+
+        tipada = _tipar_serie(novos[coluna], *tipo)
+        if tipada is None:
+            df_alinhado[coluna] = df[coluna].astype(object)
+        elif tipada.dtype == dtype:
+            novos[coluna] = tipada
+        elif tipo[0] == COORDENADA and tipada.dtype == np.float64:
+            # Coordenada que não cabe em float32 sem perda: a coluna passa a float64
+            df_alinhado[coluna] = df[coluna].astype(np.float64).round(CASAS_COORDENADA)
+            novos[coluna] = tipada
+        elif tipo[0] == COORDENADA and dtype == np.float64:
+            # Coluna já em float64: o valor float32 volta pelo mesmo arredondamento da gravação
+            novos[coluna] = tipada.astype(np.float64).round(CASAS_COORDENADA)
+        else:
+            novos[coluna] = tipada.astype(dtype)
+
+    return df_alinhado, novos
+
+
+def valor_exibicao(valor):
+    """
+    Converte um valor do DataFrame tipado de volta para o valor gravado na
+    planilha (datas continuam datetime; cada handler as formata).
+    """
+    if valor is None or valor is pd.NA or valor is pd.NaT:
+        return None
+    if isinstance(valor, np.float32):
+        return None if np.isnan(valor) else round(float(valor), CASAS_COORDENADA)
+    if isinstance(valor, float) and np.isnan(valor):
+        return None
+    if isinstance(valor, np.generic):
+        return valor.item()
+    return valor
+
+
+def serie_exibicao(serie: pd.Series) -> pd.Series:
+    # Mesma conversão de valor_exibicao, para a coluna inteira (datas continuam datetime64)
+    if isinstance(serie.dtype, pd.CategoricalDtype):
+        return serie.astype(object)
+    if serie.dtype == np.float32:
+        return serie.astype(np.float64).round(CASAS_COORDENADA)
+    if isinstance(serie.dtype, pd.api.extensions.ExtensionDtype) and pd.api.types.is_integer_dtype(serie.dtype):
+        valores = serie.astype(object)
+        valores[serie.isna()] = None
+        return valores
+    return serie
+
+
+def dataframe_exibicao(df: pd.DataFrame) -> pd.DataFrame:
+    # Cópia com os tipos usados antes do esquema, para gravar a planilha inteira
+    convertidas = {}
+    for coluna in df.columns:
+        original = df[coluna]
+        serie = serie_exibicao(original)
+        if serie is not original:
+            convertidas[coluna] = serie
+
+    if not convertidas:
+        return df
+
+    df = df.copy(deep=False)
+    for coluna, serie in convertidas.items():
+        df[coluna] = serie
+    return df
+
+
+def _tipo_compativel(dtype, tipo: str) -> bool:
+    # Se a coluna está no tipo que aplicar_esquema daria (senão fica como está)
+    if tipo == CATEGORIA:
+        return isinstance(dtype, pd.CategoricalDtype)
+    if tipo == DATA:
+        return pd.api.types.is_datetime64_any_dtype(dtype)
+    if tipo == COORDENADA:
+        return dtype in (np.float32, np.float64)
+    if tipo == INTEIRO:
+        return isinstance(dtype, pd.Int16Dtype)
+    return False
+
+
+def _tipar_serie(serie: pd.Series, tipo: str, vocabulario) -> Optional[pd.Series]:
+    # Série convertida para o tipo do esquema, ou None se a conversão perderia informação
+    if tipo == CATEGORIA:
+        return _tipar_categoria(serie, vocabulario)
+    if tipo == DATA:
+        return _tipar_data(serie)
+    if tipo == COORDENADA:
+        return _tipar_coordenada(serie)
+    if tipo == INTEIRO:
+        return _tipar_inteiro(serie)
+    return None
+
+
+def _tipar_categoria(serie: pd.Series, vocabulario: list) -> Optional[pd.Series]:
+    if isinstance(serie.dtype, pd.CategoricalDtype):
+        return serie
+
+    valores = serie.dropna().unique()
+    if not all(isinstance(v, str) for v in valores):
+        return None
+
+    # Ordem do vocabulário primeiro; valores fora dele no fim, em ordem alfabética
+    extras = sorted(set(valores) - set(vocabulario))
+    categorias = list(dict.fromkeys(list(vocabulario) + extras))
+    return serie.astype(object).astype(pd.CategoricalDtype(categorias))
+
+
+def _tipar_data(serie: pd.Series) -> Optional[pd.Series]:
+    if pd.api.types.is_datetime64_any_dtype(serie):
+        return None if getattr(serie.dt, 'tz', None) is not None else serie
+
+    preenchidos, vazios = _separar_vazios(serie)
+    eh_data = _mascara_tipo(preenchidos, (datetime,))
+    eh_texto = _mascara_tipo(preenchidos, (str,))
+    if not (eh_texto | eh_data).all():
+        return None
+
+    try:
+        datas = pd.Series(pd.NaT, index=serie.index, dtype='datetime64[ns]')
+        if eh_data.any():
+            convertidas = pd.to_datetime(preenchidos[eh_data].tolist())
+            if convertidas.tz is not None:
+                return None
+            datas[eh_data.index[eh_data]] = convertidas
+
+        # Textos só se estiverem exatamente em dd/mm/yyyy (voltam iguais na gravação)
+        textos = preenchidos[eh_texto].astype(str)
+        if not textos.empty:
+            if not textos.str.fullmatch(PADRAO_DATA).all():
+                return None
+            convertidas = pd.to_datetime(textos, format='%d/%m/%Y', errors='coerce')
+            if convertidas.isna().any():
+                return None
+            datas[textos.index] = convertidas
+    except (ValueError, OverflowError, pd.errors.OutOfBoundsDatetime):
+        return None
+
+    return datas
+
+
+def _tipar_coordenada(serie: pd.Series) -> Optional[pd.Series]:
+    if serie.dtype == np.float32:
+        return serie
+
+    if pd.api.types.is_numeric_dtype(serie) and not pd.api.types.is_bool_dtype(serie):
+        numeros = serie.astype(np.float64)
+    else:
+        preenchidos, vazios = _separar_vazios(serie)
+        if not _mascara_tipo(preenchidos, (str,)).all():
+            return None
+
+        # Textos só se a gravação reproduzir o mesmo texto (ex.: '-5,1' e '5.10' ficam como texto)
+        textos = preenchidos.astype(str)
+        convertidos = pd.to_numeric(textos, errors='coerce')
+        if convertidos.isna().any() or (_texto_numeros(convertidos) != textos).any():
+            return None
+        numeros = pd.Series(np.nan, index=serie.index)
+        numeros[textos.index] = convertidos
+
+    if not np.isfinite(numeros.dropna()).all():
+        return None
+
+    # float32 se o arredondamento da gravação devolver o valor original; senão float64
+    compacto = numeros.astype(np.float32)
+    volta = compacto.astype(np.float64).round(CASAS_COORDENADA)
+    if ((volta == numeros) | numeros.isna()).all():
+        return compacto
+    return numeros
+
+
+def _tipar_inteiro(serie: pd.Series) -> Optional[pd.Series]:
+    if isinstance(serie.dtype, pd.Int16Dtype):
+        return serie
+
+    limites = np.iinfo(np.int16)
+
+    if pd.api.types.is_numeric_dtype(serie) and not pd.api.types.is_bool_dtype(serie):
+        numeros = serie.astype(np.float64)
+    else:
+        preenchidos, vazios = _separar_vazios(serie)
+
+        # Só inteiros, ou textos de inteiros sem zeros à esquerda
+        eh_inteiro = _mascara_tipo(preenchidos, (int, np.integer), excluidos=(bool, np.bool_))
+        eh_texto = _mascara_tipo(preenchidos, (str,))
+        if not (eh_inteiro | eh_texto).all():
+            return None
+
+        textos = preenchidos.astype(str)
+        if not textos[eh_texto].str.fullmatch(PADRAO_INTEIRO).all():
+            return None
+        numeros = pd.Series(np.nan, index=serie.index)
+        numeros[textos.index] = pd.to_numeric(textos).astype(np.float64)
+
+    validos = numeros.dropna()
+    if not (np.isfinite(validos).all() and (validos == np.trunc(validos)).all()
+            and validos.between(limites.min, limites.max).all()):
+        return None
+
+    return numeros.astype('Int16')
+
+
+def _separar_vazios(serie: pd.Series) -> Tuple[pd.Series, pd.Series]:
+    # Células preenchidas (como object) e máscara das vazias (NaN/None/'')
+    valores = serie.astype(object)
+    vazios = valores.isna() | (valores == '')
+    return valores[~vazios], vazios
+
+
+def _mascara_tipo(valores: pd.Series, tipos: tuple, excluidos: tuple = ()) -> pd.Series:
+    # Valores cuja classe é um dos tipos (a checagem é feita uma vez por classe)
+    classes = pd.Series([type(v) for v in valores.to_numpy()], index=valores.index, dtype=object)
+    aceitas = [c for c in classes.unique() if issubclass(c, tipos) and not issubclass(c, excluidos)]
+    return classes.isin(aceitas)
+
+
+def _texto_numeros(numeros: pd.Series) -> pd.Series:
+    # Versão vetorizada de _texto_numero
+    texto = numeros.astype(str)
+    inteiros = numeros == np.trunc(numeros)
+    texto[inteiros] = numeros[inteiros].map(_texto_numero)
+    return texto
+
+
+def _texto_numero(numero: float) -> str:
+    # Mesma regra de SheetsHandler._formatar_celula
+    if float(numero).is_integer():
+        return str(int(numero))
+    return str(float(numero))
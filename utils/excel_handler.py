@@ -1,56 +1,137 @@
+import os
+import threading
 import pandas as pd
-from typing import Tuple, Optional
+import numpy as np
+from typing import Tuple, Optional, Callable
 from datetime import datetime
 from openpyxl import load_workbook
 from openpyxl.styles import Font, Alignment, Border, PatternFill
 from copy import copy
 from .dados_estaticos import COLUNAS_EXCEL
 from .calculos import parse_data_excel
+from .indice_datas import IndiceDatas, converter_data, converter_serie_datas, chave_data
+from .indice_valores import IndiceValoresUnicos
+from .cubo_estatisticas import CuboEstatisticas
+from .indice_espacial import IndiceEspacial
+from .esquema import aplicar_esquema, alinhar_tipos, valor_exibicao, dataframe_exibicao
+from .diario_excel import DiarioExcel
+
+# Linhas lidas por bloco no carregamento em streaming
+TAMANHO_BLOCO_LEITURA = 5000
 
 
 class ExcelHandler:
 
-    def __init__(self, caminho_arquivo: str = None):
+    def __init__(self, caminho_arquivo: str = None, usar_diario: bool = True, pasta_diario: str = None):
 
         self.caminho_arquivo = caminho_arquivo
         self.df = None
         self.dados_carregados = False
-
-    def carregar_arquivo(self, caminho: str) -> Tuple[bool, str]:
+        self._indice_datas = IndiceDatas()
+        self._indice_valores = IndiceValoresUnicos()
+        self._cubo = CuboEstatisticas()
+        self._indice_espacial = IndiceEspacial()
+
+        # Controle do salvamento incremental: arquivo que corresponde ao
+        # DataFrame sem as linhas novas e posições (no DataFrame) das linhas novas
+        self._caminho_base = None
+        self._assinatura_base = None
+        self._linhas_novas = []
+
+        # Diário das inserções ainda não gravadas na planilha (ver compactar_diario)
+        self.usar_diario = usar_diario
+        self._pasta_diario = pasta_diario
+        self._diario = None
+
+        # Inserção (thread do trabalhador) e salvamento (interface) não se sobrepõem
+        self._trava = threading.RLock()
+
+    def carregar_arquivo(self, caminho: str, progresso: Callable[[int, int, str], None] = None,
+                         cancelado: Callable[[], bool] = None) -> Tuple[bool, str]:
+        """
+        Carrega e valida a planilha. progresso(linhas, total, mensagem) e
+        cancelado() são opcionais e permitem rodar o carregamento numa thread.
+        """
 
         try:
-            # Carrega o arquivo
-            self.df = pd.read_excel(caminho)
+            # Leitura em streaming (read_only): o cabeçalho é validado antes de ler os dados
+            wb = load_workbook(caminho, read_only=True, data_only=True)
+            try:
+                ws = wb.worksheets[0]
+                cabecalho = self._ler_cabecalho(ws)
+
+                # Valida as colunas (aceita 29 ou 33)
+                num_colunas = len(cabecalho)
+                colunas_esperadas = [col.strip() for col in COLUNAS_EXCEL]
+
+                if num_colunas == 33:
+                    # Planilha antiga (33 colunas) - remove as 4 do Boletim
+                    colunas_remover = [
+                        "Nº de\nBOS", "Nº de\nVítimas",
+                        "Nº Laudo IML", "Nº do BO"
+                    ]
+                    colunas_remover_strip = [c.strip() for c in colunas_remover]
+                    colunas_existentes = [col for col in cabecalho
+                                          if col.strip() not in colunas_remover_strip]
+
+                elif num_colunas == 29:
+                    colunas_existentes = cabecalho
+
+                else:
+                    return False, f"Arquivo possui {num_colunas} colunas. Esperado: 29 ou 33 colunas."
+
+                # Verifica se os nomes das colunas batem
+                colunas_arquivo = [col.strip() for col in colunas_existentes]
+
+                if colunas_arquivo != colunas_esperadas:
+                    return False, "Estrutura de colunas do arquivo nao corresponde ao esperado."
+
+                df = self._ler_registros(ws, cabecalho, progresso, cancelado)
+                if df is None:
+                    return False, "Carregamento cancelado."
+            finally:
+                wb.close()
+
+            self.df = df[colunas_existentes]
             self.caminho_arquivo = caminho
 
-            # Valida as colunas (aceita 29 ou 33)
-            num_colunas = len(self.df.columns)
-            colunas_esperadas = [col.strip() for col in COLUNAS_EXCEL]
-
-            if num_colunas == 33:
-                # Planilha antiga (33 colunas) - remove as 4 do Boletim
-                colunas_remover = [
-                    "Nº de\nBOS", "Nº de\nVítimas",
-                    "Nº Laudo IML", "Nº do BO"
-                ]
-                colunas_remover_strip = [c.strip() for c in colunas_remover]
-                colunas_existentes = [col for col in self.df.columns
-                                      if col.strip() not in colunas_remover_strip]
-                self.df = self.df[colunas_existentes]
+            if cancelado and cancelado():
+                return False, "Carregamento cancelado."
+            if progresso:
+                progresso(len(self.df), len(self.df), "Ordenando registros por data...")
 
-            elif num_colunas != 29:
-                return False, f"Arquivo possui {num_colunas} colunas. Esperado: 29 ou 33 colunas."
+            reordenado = self._ordenar_por_data_fato()
 
-            # Verifica se os nomes das colunas batem
-            colunas_arquivo = [col.strip() for col in self.df.columns]
+            # Tipos compactos (categorias, datas, float32, Int16) onde a conversão é sem perda
+            self.df = aplicar_esquema(self.df, datas_em_texto=False)
+            self._indice_valores = IndiceValoresUnicos()
+            self._cubo = CuboEstatisticas.montar([self.df])
+            self._indice_espacial = IndiceEspacial.montar([self.df])
 
-            if colunas_arquivo != colunas_esperadas:
-                return False, "Estrutura de colunas do arquivo nao corresponde ao esperado."
+            # Só permite salvar incrementalmente se as linhas do arquivo
+            # estiverem na mesma ordem e com as mesmas colunas do DataFrame
+            self._linhas_novas = []
+            if num_colunas == 29 and not reordenado:
+                self._marcar_base(caminho)
+            else:
+                self._caminho_base = None
+                self._assinatura_base = None
 
             self.dados_carregados = True
+            mensagem_diario = ""
+            if self.usar_diario:
+                try:
+                    mensagem_diario = self._abrir_diario(caminho)
+                except OSError as e:
+                    # Sem o diário a aplicação funciona como antes (salvar pelo botão)
+                    self._diario = None
+                    mensagem_diario = f" Diário local indisponível: {str(e)}"
             total_registros = len(self.df)
 
-            return True, f"Arquivo carregado com sucesso! {total_registros} registros encontrados."
+            if progresso:
+                progresso(total_registros, total_registros, "Concluído")
+
+            return True, f"Arquivo carregado com sucesso! {total_registros} registros encontrados.{mensagem_diario}"
 
         except FileNotFoundError:
             return False, "Arquivo não encontrado."
@@ -59,6 +140,101 @@ class ExcelHandler:
         except Exception as e:
             return False, f"Erro ao carregar arquivo: {str(e)}"
 
+    def _abrir_diario(self, caminho: str) -> str:
+        """
+        Reaplica os registros do diário que não chegaram à planilha (aplicação
+        fechada ou interrompida antes da compactação) e recomeça o diário.
+        """
+        # Compactação interrompida antes da troca de arquivos
+        temporario = self._caminho_compactacao(caminho)
+        if os.path.exists(temporario):
+            os.remove(temporario)
+
+        self._diario = DiarioExcel(caminho, self._pasta_diario)
+        lotes, alterada = self._diario.recuperar(self._assinatura(caminho))
+
+        recuperados = 0
+        for lote in lotes:
+            sucesso, _, _ = self._inserir_registros(lote)
+            if sucesso:
+                recuperados += len(lote)
+
+        self._diario.iniciar(self._assinatura(caminho), lotes)
+
+        if not recuperados:
+            return ""
+
+        mensagem = f" {recuperados} registro(s) recuperado(s) do diário local."
+        if alterada:
+            mensagem += " A planilha foi alterada fora do sistema: confira se há registros duplicados."
+        return mensagem
+
+    def _ler_cabecalho(self, ws) -> list:
+        linha = next(ws.iter_rows(min_row=1, max_row=1, values_only=True), ())
+
+        # Mesmos nomes que o pd.read_excel daria (células vazias no fim são ignoradas)
+        valores = list(linha)
+        while valores and valores[-1] is None:
+            valores.pop()
+
+        return [str(v) if v is not None else f"Unnamed: {i}" for i, v in enumerate(valores)]
+
+    def _ler_registros(self, ws, cabecalho: list, progresso: Callable[[int, int, str], None] = None,
+                       cancelado: Callable[[], bool] = None) -> Optional[pd.DataFrame]:
+        """
+        Lê as linhas de dados em blocos de TAMANHO_BLOCO_LEITURA, sem montar o
+        modelo de células do openpyxl. Retorna None se o carregamento for cancelado.
+        """
+        num_colunas = len(cabecalho)
+
+        # Dimensão gravada no arquivo: só serve como estimativa para o progresso
+        total_estimado = max((ws.max_row or 1) - 1, 0)
+        ws.reset_dimensions()
+
+        blocos = []
+        bloco = []
+        vazias = 0  # Linhas vazias seguidas (descartadas se estiverem no fim)
+        lidas = 0
+
+        for linha in ws.iter_rows(min_row=2, values_only=True):
+            linha = tuple(linha[:num_colunas])
+            if len(linha) < num_colunas:
+                linha += (None,) * (num_colunas - len(linha))
+
+            if all(v is None for v in linha):
+                vazias += 1
+                continue
+
+            bloco.extend([(None,) * num_colunas] * vazias)
+            vazias = 0
+            bloco.append(linha)
+
+            if len(bloco) >= TAMANHO_BLOCO_LEITURA:
+                blocos.append(self._montar_bloco(bloco, cabecalho))
+                lidas += len(bloco)
+                bloco = []
+
+                if cancelado and cancelado():
+                    return None
+                if progresso:
+                    progresso(lidas, max(total_estimado, lidas), "Lendo registros...")
+
+        if bloco:
+            blocos.append(self._montar_bloco(bloco, cabecalho))
+
+        if not blocos:
+            return pd.DataFrame(columns=cabecalho, dtype=object)
+
+        # Blocos com tipos diferentes na mesma coluna (ex.: datas e um bloco
+        # todo vazio) viram object no concat; nova inferência deixa os tipos
+        # iguais aos do pd.read_excel
+        return pd.concat(blocos, ignore_index=True).infer_objects()
+
+    def _montar_bloco(self, linhas: list, cabecalho: list) -> pd.DataFrame:
+        # Colunas tipadas por bloco: números e datas deixam de ser objetos Python
+        bloco = pd.DataFrame.from_records(linhas, columns=cabecalho)
+        return bloco.replace({None: np.nan}).infer_objects()
+
     def obter_info_arquivo(self) -> dict:
 
         if not self.dados_carregados or self.df is None:
@@ -79,112 +255,166 @@ class ExcelHandler:
         return {
             'total_registros': len(self.df),
             'ultima_data': ultima_data,
-            'municipios_unicos': self.df['Município do Fato'].nunique()
+            'municipios_unicos': len(self._cubo.valores('municipio'))
         }
 
-    def inserir_registro(self, dados: dict) -> Tuple[bool, str, int]:
+    def obter_estatisticas(self) -> CuboEstatisticas:
+        # Contagens por município, mês, tipo de acidente, sexo... (mantidas a cada inserção)
+        return self._cubo
 
+    def obter_indice_espacial(self) -> IndiceEspacial:
+        # Busca por raio/retângulo e pontos críticos sobre Lat/Long (mantido a cada inserção)
+        return self._indice_espacial
+
+    def inserir_registro(self, dados: dict) -> Tuple[bool, str, int]:
+        return self.inserir_registros([dados])
+
+    def inserir_registros(self, lista_dados: list) -> Tuple[bool, str, int]:
+        """
+        Insere vários registros (ex.: as vítimas de uma mesma ocorrência) com
+        uma única concatenação. Retorna a linha no Excel do primeiro deles.
+
+        Os registros vão para o diário (gravado em disco na hora) depois de o
+        DataFrame novo estar montado e antes de ele substituir o atual: um
+        registro que falha não fica no diário para ser reaplicado. A planilha
+        só é regravada na compactação.
+        """
         if not self.dados_carregados:
             return False, "Nenhum arquivo carregado.", -1
 
+        if not lista_dados:
+            return False, "Nenhum registro para inserir.", -1
+
+        with self._trava:
+            return self._inserir_registros(lista_dados, self._diario)
+
+    def _inserir_registros(self, lista_dados: list, diario: DiarioExcel = None) -> Tuple[bool, str, int]:
+        # Sem diário na reaplicação dos lotes do próprio diário
+        try:
+            insercao = self._preparar_insercao(lista_dados)
+        except Exception as e:
+            return False, f"Erro ao inserir registro: {str(e)}", -1
+
+        if diario is not None:
+            try:
+                diario.registrar(lista_dados)
+            except OSError as e:
+                return False, f"Erro ao gravar o diário local: {str(e)}", -1
+
+        return self._aplicar_insercao(*insercao)
+
+    def _preparar_insercao(self, lista_dados: list) -> tuple:
+        # Monta o DataFrame novo sem alterar o atual: uma falha aqui não deixa nada pela metade
+        registros = []
+        for dados in lista_dados:
+            registro = dict(dados)
+            registro['Data do Fato'] = converter_data(dados.get('Data do Fato'))
+            registros.append(registro)
+
+        # Em ordem de data (estável): cada registro entra depois dos que têm a mesma data
+        registros.sort(key=lambda registro: chave_data(registro['Data do Fato']))
+
+        # Posições no DataFrame atual (busca binária no índice de datas)
+        originais = [self._indice_datas.posicao_insercao(r['Data do Fato']) for r in registros]
+
+        novos = pd.DataFrame(registros)
+        df, novos = alinhar_tipos(self.df, novos)
+
+        # Intercala os registros novos nas posições, mantendo o DataFrame ordenado
+        partes = []
+        inicio = 0
+        for i, posicao in enumerate(originais):
+            partes.append(df.iloc[inicio:posicao])
+            partes.append(novos.iloc[i:i + 1])
+            inicio = posicao
+        partes.append(df.iloc[inicio:])
+        df = pd.concat([p for p in partes if len(p) > 0], ignore_index=True)
+
+        # Posição final de cada registro: desloca pelos novos inseridos antes dele
+        posicoes = [posicao + i for i, posicao in enumerate(originais)]
+
+        # Linhas novas (as posteriores a cada registro deslocam uma posição)
+        linhas_novas = list(self._linhas_novas)
+        for posicao in posicoes:
+            linhas_novas = [p + 1 if p >= posicao else p for p in linhas_novas]
+            linhas_novas.append(posicao)
+
+        return df, linhas_novas, posicoes, registros
+
+    def _aplicar_insercao(self, df: pd.DataFrame, linhas_novas: list,
+                          posicoes: list, registros: list) -> Tuple[bool, str, int]:
+        # Daqui em diante os registros estão no DataFrame: o resultado é sucesso
+        self.df = df
+        self._linhas_novas = linhas_novas
+        self._atualizar_indices(posicoes, registros)
+
+        if len(registros) == 1:
+            mensagem = "Registro inserido com sucesso!"
+        else:
+            mensagem = f"{len(registros)} registros inseridos com sucesso!"
+
+        # +1 porque Excel começa em 1 e tem cabeçalho
+        return True, mensagem, posicoes[0] + 1
+
+    def _atualizar_indices(self, posicoes: list, registros: list):
         try:
-            # Cria um novo registro como DataFrame
-            novo_registro = pd.DataFrame([dados])
+            for posicao, registro in zip(posicoes, registros):
+                self._indice_datas.inserir(posicao, registro['Data do Fato'])
+                self._indice_valores.registrar(registro)
+                self._cubo.registrar(registro)
+                self._indice_espacial.registrar(registro)
+        except Exception:
+            # Atualização interrompida no meio: remonta os índices a partir do DataFrame
+            self._remontar_indices()
 
-            # Adiciona ao DataFrame existente
-            self.df = pd.concat([self.df, novo_registro], ignore_index=True)
+    def _remontar_indices(self):
+        self._indice_datas = IndiceDatas(self.df['Data do Fato'])
+        self._indice_valores = IndiceValoresUnicos()
+        self._cubo = CuboEstatisticas.montar([self.df])
+        self._indice_espacial = IndiceEspacial.montar([self.df])
 
-            # Ordena por Data do Fato
-            self.df['Data do Fato'] = pd.to_datetime(self.df['Data do Fato'], errors='coerce')
-            self.df = self.df.sort_values(by='Data do Fato', ascending=True)
-            self.df = self.df.reset_index(drop=True)
+    def _ordenar_por_data_fato(self) -> bool:
 
-            # Encontra a posição onde o registro foi inserido
-            # (procura pela vítima e data do fato)
-            posicao = -1
-            for idx, row in self.df.iterrows():
-                if (row['Vítima'] == dados.get('Vítima') and
-                    row['Data do Fato'] == pd.to_datetime(dados.get('Data do Fato'))):
-                    posicao = idx + 1  # +1 porque Excel começa em 1 e tem cabeçalho
-                    break
+        # Converte a coluna uma única vez e ordena (registros sem data ficam no fim)
+        self.df['Data do Fato'] = converter_serie_datas(self.df['Data do Fato'])
+        self.df = self.df.sort_values(by='Data do Fato', ascending=True,
+                                      kind='stable', na_position='last')
+        reordenado = not self.df.index.is_monotonic_increasing
+        self.df = self.df.reset_index(drop=True)
 
-            return True, "Registro inserido com sucesso!", posicao
+        self._indice_datas = IndiceDatas(self.df['Data do Fato'])
 
-        except Exception as e:
-            return False, f"Erro ao inserir registro: {str(e)}", -1
+        return reordenado
 
-    def salvar_arquivo(self, caminho_destino: str = None) -> Tuple[bool, str]:
+    def salvar_arquivo(self, caminho_destino: str = None, incremental: bool = True) -> Tuple[bool, str]:
 
         if not self.dados_carregados:
             return False, "Nenhum dado para salvar."
 
-        import os
+        if caminho_destino is None:
+            caminho_destino = self.caminho_arquivo
+
+        # Gravar sobre a própria planilha é uma compactação do diário (troca atômica)
+        if self._diario is not None and os.path.abspath(caminho_destino) == os.path.abspath(self.caminho_arquivo):
+            sucesso, mensagem = self.compactar_diario(forcar=True)
+            if sucesso:
+                mensagem = f"Arquivo salvo com sucesso em: {caminho_destino}"
+            return sucesso, mensagem
+
+        with self._trava:
+            return self._salvar(caminho_destino, incremental)
+
+    def _salvar(self, caminho_destino: str, incremental: bool) -> Tuple[bool, str]:
 
         try:
-            if caminho_destino is None:
-                caminho_destino = self.caminho_arquivo
-
-            # Carrega o workbook original para copiar formatação
-            wb_original = load_workbook(self.caminho_arquivo)
-            ws_original = wb_original.active
-
-            # Salva temporariamente com pandas (usa extensão .xlsx para o temp)
-            temp_file = caminho_destino.replace('.xlsx', '') + '_temp.xlsx'
-            self.df.to_excel(temp_file, index=False, engine='openpyxl')
-
-            # Carrega o arquivo temporário
-            wb_novo = load_workbook(temp_file)
-            ws_novo = wb_novo.active
-
-            # Copia formatação das colunas
-            for col_idx in range(1, len(self.df.columns) + 1):
-                # Copia largura da coluna
-                col_letter_original = ws_original.cell(1, col_idx).column_letter
-                col_letter_novo = ws_novo.cell(1, col_idx).column_letter
-
-                if col_letter_original in ws_original.column_dimensions:
-                    ws_novo.column_dimensions[col_letter_novo].width = \
-                        ws_original.column_dimensions[col_letter_original].width
-
-                # Copia formatação do cabeçalho
-                cell_original = ws_original.cell(1, col_idx)
-                cell_novo = ws_novo.cell(1, col_idx)
-
-                if cell_original.font:
-                    cell_novo.font = copy(cell_original.font)
-                if cell_original.alignment:
-                    cell_novo.alignment = copy(cell_original.alignment)
-                if cell_original.fill:
-                    cell_novo.fill = copy(cell_original.fill)
-                if cell_original.border:
-                    cell_novo.border = copy(cell_original.border)
-
-                # Aplica formatação de data para colunas de data
-                nome_coluna = self.df.columns[col_idx - 1]
-                if 'Data' in nome_coluna or nome_coluna == 'Hora do fato':
-                    # Pega formatação de uma célula de data do original
-                    formato_original = None
-                    for row_idx in range(2, min(10, ws_original.max_row + 1)):
-                        cell = ws_original.cell(row_idx, col_idx)
-                        if cell.value and cell.number_format:
-                            formato_original = cell.number_format
-                            break
-
-                    # Aplica formato em todas as células da coluna
-                    if formato_original:
-                        for row_idx in range(2, ws_novo.max_row + 1):
-                            cell = ws_novo.cell(row_idx, col_idx)
-                            cell.number_format = formato_original
-
-            # Formata colunas de data especificamente
-            self._formatar_colunas_data(ws_novo)
-
-            # Salva o arquivo final
-            wb_novo.save(caminho_destino)
-
-            # Remove arquivo temporário
-            if os.path.exists(temp_file):
-                os.remove(temp_file)
+            # Tenta reaproveitar o arquivo base inserindo só as linhas novas (ele ainda é
+            # lido e gravado inteiro, mas sem remontar a formatação); senão, regrava tudo
+            salvo = incremental and self._salvar_incremental(caminho_destino)
+            if not salvo:
+                self._salvar_completo(caminho_destino)
+
+            self._linhas_novas = []
+            self._marcar_base(caminho_destino)
 
             return True, f"Arquivo salvo com sucesso em: {caminho_destino}"
 
@@ -193,6 +423,184 @@ class ExcelHandler:
         except Exception as e:
             return False, f"Erro ao salvar arquivo: {str(e)}"
 
+    def compactar_diario(self, forcar: bool = False) -> Tuple[bool, str]:
+        """
+        Grava na planilha os registros do diário e recomeça o diário.
+
+        A planilha nova é gravada num arquivo temporário ao lado e só então
+        substitui a original (os.replace): uma queda no meio deixa a planilha
+        antiga intacta e o diário é reaplicado no próximo carregamento.
+        """
+        if self._diario is None:
+            return False, "Diário local desativado."
+
+        with self._trava:
+            if not forcar and self._diario.pendentes() == 0:
+                return True, "Nenhum registro pendente no diário."
+
+            caminho = self.caminho_arquivo
+            temporario = self._caminho_compactacao(caminho)
+            pendentes = self._diario.pendentes()
+
+            try:
+                sucesso, mensagem = self._salvar(temporario, incremental=True)
+                if not sucesso:
+                    return False, mensagem
+
+                # Marca antes da troca: se a queda vier depois dela, a assinatura
+                # do arquivo mostra que os registros já estão na planilha
+                assinatura = self._assinatura(temporario)
+                self._diario.marcar_compactacao(assinatura)
+                os.replace(temporario, caminho)
+
+                self._diario.iniciar(assinatura)
+                self._marcar_base(caminho)
+
+                return True, f"{pendentes} inserção(ões) gravada(s) na planilha."
+
+            except PermissionError:
+                return False, "Sem permissão para salvar o arquivo. Verifique se ele não está aberto."
+            except Exception as e:
+                return False, f"Erro ao compactar o diário: {str(e)}"
+            finally:
+                if os.path.exists(temporario):
+                    os.remove(temporario)
+
+    def _caminho_compactacao(self, caminho: str) -> str:
+        # Mesma pasta da planilha, para que os.replace seja uma troca atômica
+        nome_base, extensao = os.path.splitext(caminho)
+        return f"{nome_base}.compactando{extensao}"
+
+    def _salvar_completo(self, caminho_destino: str):
+
+        # Carrega o workbook original para copiar formatação
+        wb_original = load_workbook(self.caminho_arquivo)
+        ws_original = wb_original.active
+
+        # Salva temporariamente com pandas (usa extensão .xlsx para o temp)
+        temp_file = caminho_destino.replace('.xlsx', '') + '_temp.xlsx'
+        dataframe_exibicao(self.df).to_excel(temp_file, index=False, engine='openpyxl')
+
+        # Carrega o arquivo temporário
+        wb_novo = load_workbook(temp_file)
+        ws_novo = wb_novo.active
+
+        # Copia formatação das colunas
+        for col_idx in range(1, len(self.df.columns) + 1):
+            # Copia largura da coluna
+            col_letter_original = ws_original.cell(1, col_idx).column_letter
+            col_letter_novo = ws_novo.cell(1, col_idx).column_letter
+
+            if col_letter_original in ws_original.column_dimensions:
+                ws_novo.column_dimensions[col_letter_novo].width = \
+                    ws_original.column_dimensions[col_letter_original].width
+
+            # Copia formatação do cabeçalho
+            cell_original = ws_original.cell(1, col_idx)
+            cell_novo = ws_novo.cell(1, col_idx)
+
+            if cell_original.font:
+                cell_novo.font = copy(cell_original.font)
+            if cell_original.alignment:
+                cell_novo.alignment = copy(cell_original.alignment)
+            if cell_original.fill:
+                cell_novo.fill = copy(cell_original.fill)
+            if cell_original.border:
+                cell_novo.border = copy(cell_original.border)
+
+            # Aplica formatação de data para colunas de data
+            nome_coluna = self.df.columns[col_idx - 1]
+            if 'Data' in nome_coluna or nome_coluna == 'Hora do fato':
+                # Pega formatação de uma célula de data do original
+                formato_original = None
+                for row_idx in range(2, min(10, ws_original.max_row + 1)):
+                    cell = ws_original.cell(row_idx, col_idx)
+                    if cell.value and cell.number_format:
+                        formato_original = cell.number_format
+                        break
+
+                # Aplica formato em todas as células da coluna
+                if formato_original:
+                    for row_idx in range(2, ws_novo.max_row + 1):
+                        cell = ws_novo.cell(row_idx, col_idx)
+                        cell.number_format = formato_original
+
+        # Formata colunas de data especificamente
+        self._formatar_colunas_data(ws_novo)
+
+        # Salva o arquivo final
+        wb_novo.save(caminho_destino)
+
+        # Remove arquivo temporário
+        if os.path.exists(temp_file):
+            os.remove(temp_file)
+
+    def _salvar_incremental(self, caminho_destino: str) -> bool:
+
+        # O arquivo base precisa existir e não pode ter mudado desde o último salvamento
+        if not self._caminho_base or self._assinatura_base != self._assinatura(self._caminho_base):
+            return False
+
+        # Abre o arquivo base uma única vez (formatação existente fica intacta)
+        wb = load_workbook(self._caminho_base)
+        ws = wb.active
+
+        if ws.max_row - 1 != len(self.df) - len(self._linhas_novas):
+            return False
+
+        colunas_data = {'Data do Óbito', 'Data de\nNascimento', 'Data do Fato'}
+
+        # Posições consecutivas formam um bloco: o insert_rows do openpyxl desloca todas
+        # as células abaixo, então é feito uma vez por bloco e não por linha
+        blocos = []
+        for posicao in sorted(self._linhas_novas):
+            if blocos and blocos[-1][0] + blocos[-1][1] == posicao:
+                blocos[-1][1] += 1
+            else:
+                blocos.append([posicao, 1])
+
+        # Em ordem crescente, cada bloco já entra na sua posição final
+        for posicao_inicial, quantidade in blocos:
+            linha_inicial = posicao_inicial + 2  # +2 por causa do cabeçalho
+            ws.insert_rows(linha_inicial, amount=quantidade)
+
+            # Copia o estilo de uma linha de dados vizinha ao bloco
+            linha_modelo = linha_inicial - 1 if linha_inicial > 2 else linha_inicial + quantidade
+
+            for posicao in range(posicao_inicial, posicao_inicial + quantidade):
+                linha_excel = posicao + 2
+                registro = self.df.iloc[posicao]
+
+                for col_idx, nome_coluna in enumerate(self.df.columns, start=1):
+                    cell = ws.cell(linha_excel, col_idx)
+                    modelo = ws.cell(linha_modelo, col_idx)
+                    if modelo.has_style:
+                        cell._style = copy(modelo._style)
+
+                    cell.value = self._valor_para_celula(registro[nome_coluna])
+                    if nome_coluna in colunas_data:
+                        cell.number_format = 'DD/MM/YYYY'
+
+        wb.save(caminho_destino)
+        return True
+
+    def _valor_para_celula(self, valor):
+        valor = valor_exibicao(valor)
+        if isinstance(valor, pd.Timestamp):
+            return valor.to_pydatetime()
+        return valor
+
+    def _assinatura(self, caminho: str) -> Optional[tuple]:
+        try:
+            info = os.stat(caminho)
+            return (info.st_mtime_ns, info.st_size)
+        except OSError:
+            return None
+
+    def _marcar_base(self, caminho: str):
+        self._caminho_base = caminho
+        self._assinatura_base = self._assinatura(caminho)
+
     def _formatar_colunas_data(self, ws):
 
         # Mapeia colunas que contêm datas
@@ -225,8 +633,8 @@ class ExcelHandler:
         if not self.dados_carregados or coluna not in self.df.columns:
             return []
 
-        valores = self.df[coluna].dropna().unique().tolist()
-        return sorted(valores)
+        # Índice mantido a cada inserção: não percorre o DataFrame de novo
+        return self._indice_valores.obter(coluna, [self.df])
 
     def obter_ultimo_registro(self) -> Optional[dict]:
     
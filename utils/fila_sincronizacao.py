@@ -0,0 +1,101 @@
+import os
+import json
+import time
+import sqlite3
+import threading
+from typing import List, Tuple, Optional
+
+# Fila persistente dos registros ainda não gravados no MySQL
+CAMINHO_FILA_PADRAO = os.path.join(os.path.expanduser('~'), '.mortes_transito', 'fila_mysql.sqlite3')
+
+# Espera entre tentativas: dobra a cada falha, de 5 segundos até 10 minutos
+ESPERA_INICIAL = 5.0
+ESPERA_MAXIMA = 600.0
+
+
+class FilaSincronizacao:
+    """
+    Outbox local (SQLite) dos registros a sincronizar com o MySQL.
+
+    O registro entra na fila assim que é gravado na planilha e só sai
+    quando o MySQL confirma o commit, então nada se perde se o banco estiver
+    fora do ar ou se a aplicação for fechada antes da sincronização.
+    """
+
+    def __init__(self, caminho: str = None):
+        self.caminho = caminho or CAMINHO_FILA_PADRAO
+        os.makedirs(os.path.dirname(self.caminho), exist_ok=True)
+
+        # Uma conexão compartilhada entre a interface e o trabalhador, protegida por lock
+        self._lock = threading.Lock()
+        self._conexao = sqlite3.connect(self.caminho, check_same_thread=False)
+        self._conexao.execute("PRAGMA journal_mode=WAL")
+        self._conexao.execute("PRAGMA synchronous=FULL")
+        self._conexao.execute("""
+            CREATE TABLE IF NOT EXISTS pendentes (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                dados TEXT NOT NULL,
+                tentativas INTEGER NOT NULL DEFAULT 0,
+                proxima_tentativa REAL NOT NULL DEFAULT 0,
+                ultimo_erro TEXT
+            )
+        """)
+        self._conexao.commit()
+
+    def enfileirar(self, dados) -> int:
+        # dados: dict de um registro ou lista de dicts (vítimas de uma mesma ocorrência)
+        with self._lock:
+            cursor = self._conexao.execute(
+                "INSERT INTO pendentes (dados) VALUES (?)",
+                (json.dumps(dados, ensure_ascii=False, default=str),)
+            )
+            self._conexao.commit()
+            return cursor.lastrowid
+
+    def proximos(self, limite: int) -> List[Tuple[int, dict]]:
+        # Registros cuja espera já terminou, na ordem de chegada
+        with self._lock:
+            linhas = self._conexao.execute(
+                "SELECT id, dados FROM pendentes WHERE proxima_tentativa <= ? ORDER BY id LIMIT ?",
+                (time.time(), limite)
+            ).fetchall()
+        return [(id_registro, json.loads(dados)) for id_registro, dados in linhas]
+
+    def confirmar(self, ids: List[int]):
+        with self._lock:
+            self._conexao.executemany("DELETE FROM pendentes WHERE id = ?", [(i,) for i in ids])
+            self._conexao.commit()
+
+    def registrar_falha(self, ids: List[int], erro: str):
+        agora = time.time()
+        with self._lock:
+            for id_registro in ids:
+                linha = self._conexao.execute(
+                    "SELECT tentativas FROM pendentes WHERE id = ?", (id_registro,)
+                ).fetchone()
+                if linha is None:
+                    continue
+
+                tentativas = linha[0] + 1
+                espera = min(ESPERA_MAXIMA, ESPERA_INICIAL * 2 ** (tentativas - 1))
+                self._conexao.execute(
+                    "UPDATE pendentes SET tentativas = ?, proxima_tentativa = ?, ultimo_erro = ? WHERE id = ?",
+                    (tentativas, agora + espera, erro, id_registro)
+                )
+            self._conexao.commit()
+
+    def tamanho(self) -> int:
+        with self._lock:
+            return self._conexao.execute("SELECT COUNT(*) FROM pendentes").fetchone()[0]
+
+    def segundos_ate_proxima(self) -> Optional[float]:
+        # None se a fila estiver vazia; 0 se já há registro pronto para envio
+        with self._lock:
+            linha = self._conexao.execute("SELECT MIN(proxima_tentativa) FROM pendentes").fetchone()
+        if linha[0] is None:
+            return None
+        return max(0.0, linha[0] - time.time())
+
+    def fechar(self):
+        with self._lock:
+            self._conexao.close()
@@ -0,0 +1,74 @@
+import sys
+from bisect import bisect_right
+from typing import List
+import pandas as pd
+from .calculos import parse_data_excel
+
+# Registros sem data valida ficam sempre no fim (mesmo comportamento do sort_values)
+CHAVE_SEM_DATA = sys.maxsize
+
+
+def converter_data(valor) -> pd.Timestamp:
+    """
+    Converte um valor de data (string dd/mm/yyyy, datetime, Timestamp)
+    para Timestamp. Retorna NaT se nao puder converter.
+    """
+    if isinstance(valor, pd.Timestamp):
+        return valor
+
+    data = parse_data_excel(valor)
+    if data is None:
+        return pd.NaT
+
+    return pd.Timestamp(data)
+
+
+def converter_serie_datas(serie: pd.Series) -> pd.Series:
+    """
+    Converte uma coluna de datas para datetime64 uma unica vez.
+    Strings sao interpretadas como dd/mm/yyyy (mesma regra de parse_data_excel).
+    """
+    if pd.api.types.is_datetime64_any_dtype(serie):
+        return serie
+
+    return pd.to_datetime(serie.map(converter_data), errors='coerce')
+
+
+def chave_data(data) -> int:
+    if data is None or pd.isna(data):
+        return CHAVE_SEM_DATA
+    return pd.Timestamp(data).value
+
+
+class IndiceDatas:
+    """
+    Indice ordenado das datas de um DataFrame ja ordenado por data.
+
+    Mantem as chaves (nanossegundos) em uma lista para localizar a posicao
+    de insercao de um novo registro com busca binaria, sem reordenar nem
+    percorrer o DataFrame.
+    """
+
+    def __init__(self, datas: pd.Series = None):
+        self._chaves: List[int] = []
+        if datas is not None:
+            self.reconstruir(datas)
+
+    def reconstruir(self, datas: pd.Series):
+        datas = converter_serie_datas(datas)
+        chaves = datas.to_numpy(dtype='datetime64[ns]').astype('int64')
+        chaves[datas.isna().to_numpy()] = CHAVE_SEM_DATA
+        self._chaves = chaves.tolist()
+
+    def posicao_insercao(self, data) -> int:
+        # bisect_right: registros com a mesma data ficam na ordem de chegada
+        return bisect_right(self._chaves, chave_data(data))
+
+    def inserir(self, posicao: int, data):
+        self._chaves.insert(posicao, chave_data(data))
+
+    def remover(self, posicao: int):
+        del self._chaves[posicao]
+
+    def __len__(self) -> int:
+        return len(self._chaves)
@@ -0,0 +1,316 @@
+import threading
+from typing import List, Optional, Tuple
+import numpy as np
+import pandas as pd
+from .indice_datas import converter_data, converter_serie_datas
+
+# Lado de cada célula da grade, em graus (~1,1 km de latitude)
+TAMANHO_CELULA_PADRAO = 0.01
+
+RAIO_TERRA_M = 6371008.8
+METROS_POR_GRAU_LAT = np.pi * RAIO_TERRA_M / 180
+
+# Pontos inseridos acumulados antes de serem incorporados à grade
+LIMITE_PENDENTES = 5000
+
+# Dia usado para registros sem data (nunca atende a um filtro de período)
+SEM_DATA = np.iinfo(np.int64).min
+
+
+class IndiceEspacial:
+    """
+    Grade uniforme sobre Lat/Long dos registros geocodificados, para busca
+    por raio, por retângulo e pelas células com mais registros.
+
+    Os pontos ficam em arrays NumPy ordenados pela célula (cada linha da
+    grade é um trecho contíguo), então uma consulta só calcula distâncias
+    para os pontos das células que cruzam a área. Registros inseridos depois
+    da montagem vão para uma lista de pendentes, consultada por força bruta
+    e incorporada à grade a cada LIMITE_PENDENTES pontos.
+
+    Registros sem coordenada válida (vazia, fora de -90..90/-180..180 ou
+    0,0) não entram no índice.
+
+    Exemplo (mortes a até 500 m do ponto nos últimos 24 meses):
+        indice.contar_raio(-5.0892, -42.8016, 500, desde=hoje - pd.DateOffset(months=24))
+    """
+
+    def __init__(self, tamanho_celula: float = TAMANHO_CELULA_PADRAO):
+        self.tamanho_celula = tamanho_celula
+        self._pontos = _pontos_vazios()
+        self._celulas = np.empty(0, dtype=np.int64)
+        self._pendentes: List[tuple] = []
+        # Consultado pela interface e atualizado pela thread de gravação
+        self._lock = threading.Lock()
+
+    @classmethod
+    def montar(cls, dataframes: List[pd.DataFrame],
+               tamanho_celula: float = TAMANHO_CELULA_PADRAO) -> 'IndiceEspacial':
+        indice = cls(tamanho_celula)
+        partes = [_pontos_dataframe(df) for df in dataframes if len(df) > 0]
+        if partes:
+            indice._ordenar(_concatenar(partes))
+        return indice
+
+    def registrar(self, registro: dict):
+        ponto = _ponto_registro(registro)
+        if ponto is None:
+            return
+
+        with self._lock:
+            self._pendentes.append(ponto)
+            if len(self._pendentes) >= LIMITE_PENDENTES:
+                self._incorporar_pendentes()
+
+    def __len__(self) -> int:
+        return len(self._celulas) + len(self._pendentes)
+
+    def buscar_raio(self, lat: float, lon: float, raio_m: float,
+                    desde=None, ate=None) -> pd.DataFrame:
+        """
+        Registros a até raio_m metros do ponto (distância na esfera), do mais
+        próximo ao mais distante. desde/ate limitam a Data do Fato (inclusive).
+        """
+        delta_lat = raio_m / METROS_POR_GRAU_LAT
+        delta_lon = raio_m / (METROS_POR_GRAU_LAT * max(np.cos(np.radians(lat)), 1e-6))
+
+        with self._lock:
+            candidatos = self._candidatos(lat - delta_lat, lat + delta_lat,
+                                          lon - delta_lon, lon + delta_lon)
+
+        distancias = _distancia_m(lat, lon, candidatos['lat'], candidatos['lon'])
+        selecao = np.flatnonzero((distancias <= raio_m) & _no_periodo(candidatos['dia'], desde, ate))
+        selecao = selecao[np.argsort(distancias[selecao], kind='stable')]
+
+        resultado = _para_exibicao(_selecionar(candidatos, selecao))
+        resultado['distancia_m'] = distancias[selecao]
+        return resultado
+
+    def contar_raio(self, lat: float, lon: float, raio_m: float, desde=None, ate=None) -> int:
+        delta_lat = raio_m / METROS_POR_GRAU_LAT
+        delta_lon = raio_m / (METROS_POR_GRAU_LAT * max(np.cos(np.radians(lat)), 1e-6))
+
+        with self._lock:
+            candidatos = self._candidatos(lat - delta_lat, lat + delta_lat,
+                                          lon - delta_lon, lon + delta_lon)
+
+        distancias = _distancia_m(lat, lon, candidatos['lat'], candidatos['lon'])
+        return int(np.count_nonzero((distancias <= raio_m) & _no_periodo(candidatos['dia'], desde, ate)))
+
+    def buscar_retangulo(self, lat_min: float, lat_max: float, lon_min: float, lon_max: float,
+                         desde=None, ate=None) -> pd.DataFrame:
+        with self._lock:
+            candidatos = self._candidatos(lat_min, lat_max, lon_min, lon_max)
+
+        lat = candidatos['lat']
+        lon = candidatos['lon']
+        selecao = ((lat >= lat_min) & (lat <= lat_max) & (lon >= lon_min) & (lon <= lon_max)
+                   & _no_periodo(candidatos['dia'], desde, ate))
+        return _para_exibicao(_selecionar(candidatos, np.flatnonzero(selecao)))
+
+    def celulas_mais_densas(self, quantidade: int = 10, desde=None, ate=None) -> List[Tuple[float, float, int]]:
+        """As células com mais registros: (lat do centro, long do centro, total), da maior para a menor."""
+        with self._lock:
+            celulas = self._celulas
+            dias = self._pontos['dia']
+            if self._pendentes:
+                pendentes = _pontos_lista(self._pendentes)
+                celulas = np.concatenate([celulas, self._celula(pendentes['lat'], pendentes['lon'])])
+                dias = np.concatenate([dias, pendentes['dia']])
+
+        celulas = celulas[_no_periodo(dias, desde, ate)]
+        if len(celulas) == 0:
+            return []
+
+        valores, totais = np.unique(celulas, return_counts=True)
+        maiores = np.argsort(-totais, kind='stable')[:quantidade]
+
+        resultado = []
+        for celula, total in zip(valores[maiores], totais[maiores]):
+            linha, coluna = divmod(int(celula), _COLUNAS_GRADE)
+            resultado.append((round((linha + 0.5) * self.tamanho_celula - 90, 7),
+                              round((coluna + 0.5) * self.tamanho_celula - 180, 7),
+                              int(total)))
+        return resultado
+
+    def _candidatos(self, lat_min: float, lat_max: float, lon_min: float, lon_max: float) -> dict:
+        # Chamado com o lock: pontos das células que cruzam o retângulo (e todos os pendentes)
+        partes = []
+        if len(self._celulas):
+            linha_min, coluna_min = self._linha_coluna(max(lat_min, -90.0), max(lon_min, -180.0))
+            linha_max, coluna_max = self._linha_coluna(min(lat_max, 90.0), min(lon_max, 180.0))
+
+            # Numa linha da grade, as células entre coluna_min e coluna_max são contíguas
+            linhas = np.arange(linha_min, linha_max + 1, dtype=np.int64) * _COLUNAS_GRADE
+            inicios = np.searchsorted(self._celulas, linhas + coluna_min, side='left')
+            fins = np.searchsorted(self._celulas, linhas + coluna_max, side='right')
+            posicoes = [np.arange(i, f) for i, f in zip(inicios, fins) if f > i]
+            if posicoes:
+                partes.append(_selecionar(self._pontos, np.concatenate(posicoes)))
+
+        if self._pendentes:
+            partes.append(_pontos_lista(self._pendentes))
+
+        return _concatenar(partes)
+
+    def _incorporar_pendentes(self):
+        # Chamado com o lock
+        self._ordenar(_concatenar([self._pontos, _pontos_lista(self._pendentes)]))
+        self._pendentes = []
+
+    def _ordenar(self, pontos: dict):
+        celulas = self._celula(pontos['lat'], pontos['lon'])
+        ordem = np.argsort(celulas, kind='stable')
+        self._pontos = _selecionar(pontos, ordem)
+        self._celulas = celulas[ordem]
+
+    def _celula(self, lat: np.ndarray, lon: np.ndarray) -> np.ndarray:
+        linhas, colunas = self._linha_coluna(lat, lon)
+        return np.asarray(linhas, dtype=np.int64) * _COLUNAS_GRADE + colunas
+
+    def _linha_coluna(self, lat, lon):
+        linhas = np.floor((np.asarray(lat, dtype=float) + 90) / self.tamanho_celula).astype(np.int64)
+        colunas = np.floor((np.asarray(lon, dtype=float) + 180) / self.tamanho_celula).astype(np.int64)
+        return linhas, colunas
+
+
+# Colunas por linha da grade (folga para qualquer tamanho de célula >= 1e-5 grau)
+_COLUNAS_GRADE = 10 ** 8
+
+
+# PONTOS DE UM DATAFRAME / REGISTRO
+
+def _pontos_dataframe(df: pd.DataFrame) -> dict:
+    if 'Lat' not in df.columns or 'Long' not in df.columns:
+        return _pontos_vazios()
+
+    lat = _coordenadas_serie(df['Lat'])
+    lon = _coordenadas_serie(df['Long'])
+    validos = _coordenada_valida(lat, lon)
+
+    if 'Data do Fato' in df.columns:
+        dias = _dias(converter_serie_datas(df['Data do Fato']))
+    else:
+        dias = np.full(len(df), SEM_DATA, dtype=np.int64)
+
+    if 'Município do Fato' in df.columns:
+        municipios = df['Município do Fato'].astype(object).to_numpy()
+    else:
+        municipios = np.full(len(df), None, dtype=object)
+
+    return {
+        'lat': lat[validos],
+        'lon': lon[validos],
+        'dia': dias[validos],
+        'municipio': municipios[validos],
+    }
+
+
+def _ponto_registro(registro: dict) -> Optional[tuple]:
+    lat = _coordenada(registro.get('Lat'))
+    lon = _coordenada(registro.get('Long'))
+    if lat is None or lon is None or not _coordenada_valida(np.array([lat]), np.array([lon]))[0]:
+        return None
+
+    dia = _dia(registro.get('Data do Fato'))
+    return lat, lon, SEM_DATA if dia is None else dia, registro.get('Município do Fato')
+
+
+def _coordenadas_serie(serie: pd.Series) -> np.ndarray:
+    if pd.api.types.is_numeric_dtype(serie.dtype):
+        # float32 do esquema: volta para float64 com as casas gravadas na planilha
+        return np.round(serie.to_numpy(dtype=float, na_value=np.nan), 7)
+    return np.array([_coordenada(v) if v is not None else np.nan for v in serie.astype(object)],
+                    dtype=float)
+
+
+def _coordenada(valor) -> Optional[float]:
+    if valor is None or (not isinstance(valor, str) and pd.isna(valor)):
+        return None
+    try:
+        return round(float(str(valor).strip().replace(',', '.')), 7)
+    except ValueError:
+        return None
+
+
+def _coordenada_valida(lat: np.ndarray, lon: np.ndarray) -> np.ndarray:
+    lat = np.asarray(lat, dtype=float)
+    lon = np.asarray(lon, dtype=float)
+    with np.errstate(invalid='ignore'):
+        return (np.isfinite(lat) & np.isfinite(lon)
+                & (np.abs(lat) <= 90) & (np.abs(lon) <= 180)
+                & ~((lat == 0) & (lon == 0)))
+
+
+def _dias(datas: pd.Series) -> np.ndarray:
+    # Dias desde 1970-01-01 (SEM_DATA onde não há data)
+    datas = pd.to_datetime(datas, errors='coerce')
+    dias = datas.to_numpy(dtype='datetime64[D]').astype(np.int64)
+    dias[datas.isna().to_numpy()] = SEM_DATA
+    return dias
+
+
+def _dia(valor) -> Optional[int]:
+    data = converter_data(valor)
+    if pd.isna(data):
+        return None
+    return int(np.datetime64(data.date(), 'D').astype(np.int64))
+
+
+def _no_periodo(dias: np.ndarray, desde, ate) -> np.ndarray:
+    selecao = np.ones(len(dias), dtype=bool)
+    if desde is not None:
+        inicio = _dia(desde)
+        selecao &= (dias != SEM_DATA) & (dias >= (inicio if inicio is not None else SEM_DATA))
+    if ate is not None:
+        fim = _dia(ate)
+        selecao &= (dias != SEM_DATA) & (dias <= (fim if fim is not None else SEM_DATA))
+    return selecao
+
+
+def _distancia_m(lat: float, lon: float, lats: np.ndarray, lons: np.ndarray) -> np.ndarray:
+    # Haversine
+    fi1 = np.radians(lat)
+    fi2 = np.radians(lats)
+    dfi = fi2 - fi1
+    dlambda = np.radians(lons - lon)
+    a = np.sin(dfi / 2) ** 2 + np.cos(fi1) * np.cos(fi2) * np.sin(dlambda / 2) ** 2
+    return 2 * RAIO_TERRA_M * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+
+# Pontos: dicionário de arrays NumPy paralelos (lat, lon, dia, municipio)
+
+def _pontos_lista(pontos: List[tuple]) -> dict:
+    lat, lon, dia, municipio = zip(*pontos) if pontos else ((), (), (), ())
+    return {
+        'lat': np.array(lat, dtype=float),
+        'lon': np.array(lon, dtype=float),
+        'dia': np.array(dia, dtype=np.int64),
+        'municipio': np.array(municipio, dtype=object),
+    }
+
+
+def _pontos_vazios() -> dict:
+    return _pontos_lista([])
+
+
+def _selecionar(pontos: dict, posicoes: np.ndarray) -> dict:
+    return {campo: valores[posicoes] for campo, valores in pontos.items()}
+
+
+def _concatenar(partes: List[dict]) -> dict:
+    if not partes:
+        return _pontos_vazios()
+    if len(partes) == 1:
+        return partes[0]
+    return {campo: np.concatenate([parte[campo] for parte in partes]) for campo in partes[0]}
+
+
+def _para_exibicao(pontos: dict) -> pd.DataFrame:
+    # Nomes das colunas da planilha; dia volta a ser data (SEM_DATA é o próprio NaT do NumPy)
+    return pd.DataFrame({
+        'Lat': pontos['lat'],
+        'Long': pontos['lon'],
+        'Data do Fato': pd.to_datetime(pontos['dia'].astype('datetime64[D]')),
+        'Município do Fato': pontos['municipio'],
+    })
@@ -0,0 +1,52 @@
+import threading
+from bisect import bisect_left
+from typing import Dict, List, Iterable
+import pandas as pd
+
+
+class IndiceValoresUnicos:
+    """
+    Valores distintos e ordenados de colunas do DataFrame (ex.: municípios
+    para os combos do formulário).
+
+    Cada coluna é montada na primeira consulta, percorrendo os DataFrames uma
+    única vez; depois é atualizada a cada registro inserido, sem percorrer o
+    DataFrame de novo. Um carregamento novo deve criar outro índice.
+    """
+
+    def __init__(self, ignorar: Iterable = ()):
+        self._ignorar = set(ignorar)
+        self._valores: Dict[str, List] = {}
+        # Consultado pela interface e atualizado pela thread de gravação
+        self._lock = threading.Lock()
+
+    def obter(self, coluna: str, dataframes: List[pd.DataFrame]) -> list:
+        with self._lock:
+            if coluna not in self._valores:
+                self._valores[coluna] = self._montar(coluna, dataframes)
+            return list(self._valores[coluna])
+
+    def registrar(self, registro: dict):
+        # Acrescenta os valores de um registro novo às colunas já montadas
+        with self._lock:
+            for coluna, valores in self._valores.items():
+                valor = registro.get(coluna)
+                if not self._valido(valor):
+                    continue
+
+                posicao = bisect_left(valores, valor)
+                if posicao == len(valores) or valores[posicao] != valor:
+                    valores.insert(posicao, valor)
+
+    def _montar(self, coluna: str, dataframes: List[pd.DataFrame]) -> list:
+        valores = set()
+        for df in dataframes:
+            if coluna in df.columns:
+                valores.update(df[coluna].dropna().unique().tolist())
+
+        return sorted(v for v in valores if self._valido(v))
+
+    def _valido(self, valor) -> bool:
+        if valor is None or (not isinstance(valor, str) and pd.isna(valor)):
+            return False
+        return valor not in self._ignorar
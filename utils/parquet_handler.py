@@ -0,0 +1,441 @@
+import os
+import importlib.util
+import numpy as np
+import pandas as pd
+from typing import Tuple, Optional, Callable
+from .calculos import parse_data_excel
+from .indice_datas import IndiceDatas, converter_data, chave_data
+from .indice_valores import IndiceValoresUnicos
+from .cubo_estatisticas import CuboEstatisticas
+from .indice_espacial import IndiceEspacial
+from .esquema import aplicar_esquema, alinhar_tipos, serie_exibicao, dataframe_exibicao
+
+# Uma pasta por partição (ano=2024/dados.parquet), como nos datasets do Arrow
+PREFIXO_PARTICAO = 'ano='
+ARQUIVO_PARTICAO = 'dados.parquet'
+
+# Registros sem Data do Fato válida (partição sempre por último, como no Excel)
+PARTICAO_SEM_DATA = 'sem_data'
+
+# Tipos de coluna object que o Arrow grava sem conversão
+TIPOS_GRAVAVEIS = {'string', 'empty', 'integer', 'floating', 'mixed-integer-float',
+                   'boolean', 'datetime', 'datetime64', 'date', 'time'}
+
+MENSAGEM_SEM_PYARROW = "O modo Parquet precisa do pacote pyarrow. Instale com: pip install pyarrow"
+
+
+def pyarrow_disponivel() -> bool:
+    return importlib.util.find_spec('pyarrow') is not None
+
+
+class ParquetHandler:
+    """
+    Registros num dataset Parquet local, particionado pelo ano da Data do Fato.
+
+    As partições guardam os tipos do esquema (categorias, datas, float32,
+    Int16), então o carregamento não converte nada. Cada partição fica
+    ordenada por data em memória; uma inserção só regrava as partições dos
+    anos dos registros novos. A planilha .xlsx é gerada sob demanda
+    (salvar_arquivo).
+    """
+
+    def __init__(self, caminho_pasta: str = None):
+        self.caminho_arquivo = caminho_pasta  # Alias para compatibilidade com ExcelHandler
+        self.dados_carregados = False
+
+        # ano -> {'df': DataFrame ordenado por data, 'indice': IndiceDatas}
+        self.particoes = {}
+        self._df_completo = None
+
+        self._indice_valores = IndiceValoresUnicos()
+        self._cubo = CuboEstatisticas()
+        self._indice_espacial = IndiceEspacial()
+
+    @staticmethod
+    def possui_base(caminho_pasta: str) -> bool:
+        return bool(_listar_particoes(caminho_pasta))
+
+    def carregar_pasta(self, caminho_pasta: str, progresso: Callable[[int, int, str], None] = None,
+                       cancelado: Callable[[], bool] = None) -> Tuple[bool, str]:
+        """
+        Lê todas as partições da pasta. progresso(partições, total, mensagem)
+        e cancelado() são opcionais, como em ExcelHandler.carregar_arquivo.
+        """
+        if not pyarrow_disponivel():
+            return False, MENSAGEM_SEM_PYARROW
+
+        try:
+            anos = _listar_particoes(caminho_pasta)
+            if not anos:
+                return False, "Nenhuma base Parquet encontrada na pasta. Crie a base a partir de uma planilha Excel."
+
+            particoes = {}
+            for i, ano in enumerate(anos):
+                if cancelado and cancelado():
+                    return False, "Carregamento cancelado."
+                if progresso:
+                    progresso(i, len(anos), f"Lendo registros de {ano}...")
+
+                df = pd.read_parquet(_caminho_particao(caminho_pasta, ano), engine='pyarrow')
+                particoes[ano] = _nova_particao(df)
+
+            self._ativar(caminho_pasta, particoes)
+
+            total_registros = sum(len(p['df']) for p in particoes.values())
+            if progresso:
+                progresso(len(anos), len(anos), "Concluído")
+
+            return True, f"Base carregada com sucesso! {total_registros} registros encontrados."
+
+        except PermissionError:
+            return False, "Sem permissão para ler a base. Verifique as permissões da pasta."
+        except Exception as e:
+            return False, f"Erro ao carregar base Parquet: {str(e)}"
+
+    def importar_excel(self, caminho_excel: str, caminho_pasta: str,
+                       progresso: Callable[[int, int, str], None] = None,
+                       cancelado: Callable[[], bool] = None) -> Tuple[bool, str]:
+        """Cria a base na pasta a partir de uma planilha .xlsx e a deixa carregada."""
+        if not pyarrow_disponivel():
+            return False, MENSAGEM_SEM_PYARROW
+
+        if _listar_particoes(caminho_pasta):
+            return False, "A pasta escolhida já contém uma base Parquet."
+
+        from .excel_handler import ExcelHandler
+        excel = ExcelHandler(usar_diario=False)
+        sucesso, mensagem = excel.carregar_arquivo(caminho_excel, progresso, cancelado)
+        if not sucesso:
+            return False, mensagem
+
+        try:
+            df = excel.obter_dataframe()
+            if progresso:
+                progresso(len(df), len(df), "Gravando partições...")
+
+            # O DataFrame do Excel já está ordenado por data: cada ano é um trecho contíguo
+            nomes = pd.Series([_nome_particao(data) for data in df['Data do Fato']], index=df.index)
+            particoes = {}
+            for ano in sorted(nomes.unique(), key=_ordem_particao):
+                particoes[ano] = _nova_particao(df[nomes == ano].reset_index(drop=True))
+
+            os.makedirs(caminho_pasta, exist_ok=True)
+            for ano, particao in particoes.items():
+                _gravar_particao(caminho_pasta, ano, particao['df'])
+
+            self._ativar(caminho_pasta, particoes)
+
+            return True, f"Base criada com sucesso! {len(df)} registros em {len(particoes)} partição(ões)."
+
+        except PermissionError:
+            return False, "Sem permissão para gravar na pasta escolhida."
+        except Exception as e:
+            return False, f"Erro ao criar base Parquet: {str(e)}"
+
+    def _ativar(self, caminho_pasta: str, particoes: dict):
+        self.caminho_arquivo = caminho_pasta
+        self.particoes = particoes
+        self._df_completo = None
+        self._indice_valores = IndiceValoresUnicos()
+        self._cubo = CuboEstatisticas.montar([p['df'] for p in particoes.values()])
+        self._indice_espacial = IndiceEspacial.montar([p['df'] for p in particoes.values()])
+        self.dados_carregados = True
+
+    def obter_info_arquivo(self) -> dict:
+
+        if not self.dados_carregados:
+            return {
+                'total_registros': 0,
+                'ultima_data': None,
+                'municipios_unicos': 0
+            }
+
+        # Última data: último registro com data da partição mais recente
+        ultima_data = None
+        for ano in reversed(list(self.particoes)):
+            datas_validas = self.particoes[ano]['df']['Data do Fato'].dropna()
+            if len(datas_validas) > 0:
+                ultima_data = parse_data_excel(datas_validas.iloc[-1])
+                break
+
+        return {
+            'total_registros': sum(len(p['df']) for p in self.particoes.values()),
+            'ultima_data': ultima_data,
+            'municipios_unicos': len(self._cubo.valores('municipio'))
+        }
+
+    def obter_estatisticas(self) -> CuboEstatisticas:
+        # Contagens de todas as partições (mantidas a cada inserção)
+        return self._cubo
+
+    def obter_indice_espacial(self) -> IndiceEspacial:
+        # Busca por raio/retângulo e pontos críticos sobre Lat/Long de todas as partições
+        return self._indice_espacial
+
+    def inserir_registro(self, dados: dict) -> Tuple[bool, str, int]:
+        return self.inserir_registros([dados])
+
+    def inserir_registros(self, lista_dados: list) -> Tuple[bool, str, int]:
+        """
+        Insere vários registros (ex.: as vítimas de uma mesma ocorrência).
+        Só as partições dos anos dos registros são regravadas; se a gravação
+        falhar, nada muda em memória. Retorna a linha do primeiro registro.
+        """
+        if not self.dados_carregados:
+            return False, "Nenhuma base carregada.", -1
+
+        if not lista_dados:
+            return False, "Nenhum registro para inserir.", -1
+
+        try:
+            grupos = {}
+            for dados in lista_dados:
+                registro = dict(dados)
+                registro['Data do Fato'] = converter_data(dados.get('Data do Fato'))
+                grupos.setdefault(_nome_particao(registro['Data do Fato']), []).append(registro)
+
+            # Monta as partições novas sem alterar as atuais
+            alteradas = {}
+            for ano, registros in grupos.items():
+                particao = self.particoes.get(ano)
+                if particao is None:
+                    # Ano novo: partição vazia com as colunas e tipos das existentes
+                    particao = {'df': self._particao_vazia(registros[0]), 'indice': IndiceDatas()}
+                alteradas[ano] = _intercalar(particao, registros)
+
+            gravadas = []
+            try:
+                for ano, (df, _, _) in alteradas.items():
+                    _gravar_particao(self.caminho_arquivo, ano, df)
+                    gravadas.append(ano)
+            except Exception:
+                # Volta as partições já regravadas para não divergir da memória
+                for ano in gravadas:
+                    if ano in self.particoes:
+                        _gravar_particao(self.caminho_arquivo, ano, self.particoes[ano]['df'])
+                    else:
+                        _remover_particao(self.caminho_arquivo, ano)
+                raise
+
+        except PermissionError:
+            return False, "Sem permissão para gravar na pasta da base.", -1
+        except Exception as e:
+            return False, f"Erro ao inserir registro: {str(e)}", -1
+
+        # Partições gravadas: daqui em diante o resultado é sucesso
+        for ano, (df, _, _) in alteradas.items():
+            self.particoes.setdefault(ano, {'indice': IndiceDatas()})['df'] = df
+
+        # Partições em ordem cronológica (um ano novo pode ter sido criado)
+        self.particoes = {ano: self.particoes[ano] for ano in sorted(self.particoes, key=_ordem_particao)}
+        self._df_completo = None
+        self._atualizar_indices(alteradas)
+
+        # Linha (na planilha exportada) do primeiro registro da partição mais antiga
+        ano = min(alteradas, key=_ordem_particao)
+        deslocamento = 0
+        for outro in self.particoes:
+            if outro == ano:
+                break
+            deslocamento += len(self.particoes[outro]['df'])
+
+        total = len(lista_dados)
+        if total == 1:
+            mensagem = f"Registro inserido com sucesso na partição {ano}!"
+        else:
+            mensagem = f"{total} registros inseridos com sucesso!"
+
+        # +1 porque o Excel começa em 1 e tem cabeçalho
+        return True, mensagem, deslocamento + alteradas[ano][1][0] + 1
+
+    def _atualizar_indices(self, alteradas: dict):
+        try:
+            for ano, (_, posicoes, registros) in alteradas.items():
+                for posicao, registro in zip(posicoes, registros):
+                    self.particoes[ano]['indice'].inserir(posicao, registro['Data do Fato'])
+                    self._indice_valores.registrar(registro)
+                    self._cubo.registrar(registro)
+                    self._indice_espacial.registrar(registro)
+        except Exception:
+            # Atualização interrompida no meio: remonta os índices a partir das partições
+            self._remontar_indices()
+
+    def _remontar_indices(self):
+        dataframes = [p['df'] for p in self.particoes.values()]
+        for particao in self.particoes.values():
+            particao['indice'] = IndiceDatas(particao['df']['Data do Fato'])
+        self._indice_valores = IndiceValoresUnicos()
+        self._cubo = CuboEstatisticas.montar(dataframes)
+        self._indice_espacial = IndiceEspacial.montar(dataframes)
+
+    def _particao_vazia(self, registro: dict) -> pd.DataFrame:
+        for particao in self.particoes.values():
+            return particao['df'].iloc[0:0]
+        return pd.DataFrame(columns=list(registro.keys()))
+
+    def salvar_arquivo(self, caminho_destino: str = None, incremental: bool = True) -> Tuple[bool, str]:
+        """
+        Exporta todos os registros para uma planilha .xlsx. A base Parquet já
+        está sempre gravada; incremental é aceito só por compatibilidade.
+        """
+        if not self.dados_carregados:
+            return False, "Nenhum dado para salvar."
+
+        if not caminho_destino:
+            return False, "Informe o arquivo .xlsx de destino."
+
+        try:
+            df = dataframe_exibicao(self.obter_dataframe())
+            with pd.ExcelWriter(caminho_destino, engine='openpyxl',
+                                date_format='DD/MM/YYYY', datetime_format='DD/MM/YYYY') as writer:
+                df.to_excel(writer, index=False)
+
+            return True, f"Arquivo salvo com sucesso em: {caminho_destino}"
+
+        except PermissionError:
+            return False, "Sem permissão para salvar o arquivo. Verifique se ele não está aberto."
+        except Exception as e:
+            return False, f"Erro ao salvar arquivo: {str(e)}"
+
+    def obter_dataframe(self) -> Optional[pd.DataFrame]:
+        if not self.dados_carregados:
+            return None
+
+        # Todas as partições em ordem cronológica (montado uma vez por inserção)
+        if self._df_completo is None:
+            dataframes = [p['df'] for p in self.particoes.values()]
+            if len(dataframes) == 1:
+                self._df_completo = dataframes[0]
+            else:
+                self._df_completo = pd.concat(_alinhar_particoes(dataframes), ignore_index=True)
+        return self._df_completo
+
+    def obter_valores_unicos(self, coluna: str) -> list:
+        if not self.dados_carregados:
+            return []
+
+        # Índice mantido a cada inserção: não percorre as partições de novo
+        dataframes = [p['df'] for p in self.particoes.values() if coluna in p['df'].columns]
+        return self._indice_valores.obter(coluna, dataframes)
+
+    def obter_ultimo_registro(self) -> Optional[dict]:
+        for particao in reversed(list(self.particoes.values())):
+            if len(particao['df']) > 0:
+                return particao['df'].iloc[-1].to_dict()
+        return None
+
+
+def _nova_particao(df: pd.DataFrame) -> dict:
+    # Tipos do esquema (sem custo se a partição já foi gravada com eles)
+    df = aplicar_esquema(df, datas_em_texto=False)
+    return {'df': df, 'indice': IndiceDatas(df['Data do Fato'])}
+
+
+def _intercalar(particao: dict, registros: list) -> Tuple[pd.DataFrame, list, list]:
+    # Em ordem de data (estável): cada registro entra depois dos que têm a mesma data
+    registros = sorted(registros, key=lambda registro: chave_data(registro['Data do Fato']))
+    originais = [particao['indice'].posicao_insercao(r['Data do Fato']) for r in registros]
+
+    df, novos = alinhar_tipos(particao['df'], pd.DataFrame(registros))
+
+    partes = []
+    inicio = 0
+    for i, posicao in enumerate(originais):
+        partes.append(df.iloc[inicio:posicao])
+        partes.append(novos.iloc[i:i + 1])
+        inicio = posicao
+    partes.append(df.iloc[inicio:])
+    df = pd.concat([p for p in partes if len(p) > 0], ignore_index=True)
+
+    return df, [posicao + i for i, posicao in enumerate(originais)], registros
+
+
+def _alinhar_particoes(dataframes: list) -> list:
+    """
+    Deixa as colunas das partições com o mesmo tipo antes de concatenar:
+    categorias passam a ter as mesmas categorias (senão a coluna viraria
+    object) e coordenadas float32 passam a float64 pelo mesmo arredondamento
+    da gravação, se alguma partição já estiver em float64.
+    """
+    alterados = [df.copy(deep=False) for df in dataframes]
+
+    for coluna in dataframes[0].columns:
+        series = [df[coluna] for df in dataframes if coluna in df.columns]
+        tipos = [serie.dtype for serie in series]
+
+        if all(isinstance(tipo, pd.CategoricalDtype) for tipo in tipos):
+            categorias = list(dict.fromkeys(c for tipo in tipos for c in tipo.categories))
+            for df in alterados:
+                if coluna in df.columns and len(df[coluna].cat.categories) != len(categorias):
+                    df[coluna] = df[coluna].cat.set_categories(categorias)
+
+        elif np.float32 in tipos and np.float64 in tipos:
+            for df in alterados:
+                if coluna in df.columns and df[coluna].dtype == np.float32:
+                    df[coluna] = serie_exibicao(df[coluna])
+
+    return alterados
+
+
+def _nome_particao(data) -> str:
+    data = converter_data(data)
+    return PARTICAO_SEM_DATA if pd.isna(data) else str(data.year)
+
+
+def _ordem_particao(ano: str) -> tuple:
+    return (ano == PARTICAO_SEM_DATA, ano)
+
+
+def _listar_particoes(caminho_pasta: str) -> list:
+    try:
+        nomes = os.listdir(caminho_pasta)
+    except OSError:
+        return []
+
+    anos = [nome[len(PREFIXO_PARTICAO):] for nome in nomes
+            if nome.startswith(PREFIXO_PARTICAO)
+            and os.path.isfile(os.path.join(caminho_pasta, nome, ARQUIVO_PARTICAO))]
+    return sorted(anos, key=_ordem_particao)
+
+
+def _caminho_particao(caminho_pasta: str, ano: str) -> str:
+    return os.path.join(caminho_pasta, f"{PREFIXO_PARTICAO}{ano}", ARQUIVO_PARTICAO)
+
+
+def _gravar_particao(caminho_pasta: str, ano: str, df: pd.DataFrame):
+    destino = _caminho_particao(caminho_pasta, ano)
+    os.makedirs(os.path.dirname(destino), exist_ok=True)
+
+    # Arquivo temporário + os.replace: uma queda nunca deixa a partição pela metade
+    temporario = f"{destino}.tmp"
+    _dataframe_gravavel(df).to_parquet(temporario, engine='pyarrow', index=False)
+    os.replace(temporario, destino)
+
+
+def _remover_particao(caminho_pasta: str, ano: str):
+    destino = _caminho_particao(caminho_pasta, ano)
+    if os.path.exists(destino):
+        os.remove(destino)
+
+
+def _dataframe_gravavel(df: pd.DataFrame) -> pd.DataFrame:
+    # Colunas object com tipos misturados (ex.: hora e texto) são gravadas como texto
+    convertidas = {}
+    for coluna in df.columns:
+        serie = df[coluna]
+        if serie.dtype == object and pd.api.types.infer_dtype(serie, skipna=True) not in TIPOS_GRAVAVEIS:
+            convertidas[coluna] = serie.map(_texto_ou_vazio)
+
+    if not convertidas:
+        return df
+
+    df = df.copy(deep=False)
+    for coluna, serie in convertidas.items():
+        df[coluna] = serie
+    return df
+
+
+def _texto_ou_vazio(valor):
+    if valor is None or (isinstance(valor, float) and np.isnan(valor)):
+        return None
+    return str(valor)
@@ -0,0 +1,88 @@
+import sys
+import time
+import builtins
+import threading
+import importlib.util
+from collections import defaultdict
+
+# Opção de linha de comando que ativa a medição
+OPCAO_PERFIL = '--profile-startup'
+
+
+class PerfilInicializacao:
+    """
+    Mede o tempo de importação de cada pacote e o tempo até a primeira janela.
+
+    Substitui builtins.__import__ enquanto está ativo: cada módulo importado
+    pela primeira vez (na thread principal) tem o tempo próprio, sem o dos
+    módulos que ele importa, somado ao pacote de nível superior.
+    """
+
+    def __init__(self):
+        self.inicio = time.perf_counter()
+        self.tempos = defaultdict(float)
+        self._pilha = []
+        self._import_original = None
+        self._thread = threading.main_thread()
+
+    @classmethod
+    def iniciar_se_pedido(cls, argv: list):
+        # Retorna o perfil ativo (e remove a opção de argv) ou None
+        if OPCAO_PERFIL not in argv:
+            return None
+
+        argv.remove(OPCAO_PERFIL)
+        perfil = cls()
+        perfil.instalar()
+        return perfil
+
+    def instalar(self):
+        self._import_original = builtins.__import__
+        builtins.__import__ = self._importar
+
+    def desinstalar(self):
+        if self._import_original is not None:
+            builtins.__import__ = self._import_original
+            self._import_original = None
+
+    def _importar(self, name, globals=None, locals=None, fromlist=(), level=0):
+        importar = self._import_original
+        if threading.current_thread() is not self._thread:
+            return importar(name, globals, locals, fromlist, level)
+
+        modulo = name
+        if level > 0:
+            try:
+                modulo = importlib.util.resolve_name('.' * level + name, (globals or {}).get('__package__'))
+            except (ImportError, ValueError):
+                return importar(name, globals, locals, fromlist, level)
+
+        if modulo in sys.modules:
+            return importar(name, globals, locals, fromlist, level)
+
+        inicio = time.perf_counter()
+        self._pilha.append(0.0)
+        try:
+            return importar(name, globals, locals, fromlist, level)
+        finally:
+            filhos = self._pilha.pop()
+            total = time.perf_counter() - inicio
+            self.tempos[modulo.partition('.')[0]] += total - filhos
+            if self._pilha:
+                self._pilha[-1] += total
+
+    def relatorio(self, etapa: str, limite: int = 15) -> str:
+        decorrido = time.perf_counter() - self.inicio
+        total_importacoes = sum(self.tempos.values())
+
+        linhas = [
+            f"{etapa}: {decorrido * 1000:.0f} ms desde o início",
+            f"Importações: {total_importacoes * 1000:.0f} ms em {len(self.tempos)} pacotes",
+        ]
+        for pacote, tempo in sorted(self.tempos.items(), key=lambda item: item[1], reverse=True)[:limite]:
+            linhas.append(f"  {tempo * 1000:8.1f} ms  {pacote}")
+
+        pesados = [p for p in ('pandas', 'numpy', 'openpyxl', 'gspread', 'google', 'mysql')
+                   if p in sys.modules]
+        linhas.append(f"Bibliotecas pesadas já carregadas: {', '.join(pesados) or 'nenhuma'}")
+        return '\n'.join(linhas)
@@ -1,15 +1,31 @@
+import re
 import pandas as pd
-from typing import Tuple, Optional
+from typing import Tuple, Optional, Callable
 from datetime import datetime
 import gspread
 from google.oauth2.service_account import Credentials
 from .dados_estaticos import COLUNAS_EXCEL
 from .calculos import parse_data_excel
+from .indice_datas import IndiceDatas, chave_data
+from .cache_sheets import CacheSheets
+from .indice_valores import IndiceValoresUnicos
+from .cubo_estatisticas import CuboEstatisticas
+from .indice_espacial import IndiceEspacial
+from .esquema import aplicar_esquema, alinhar_tipos, valor_exibicao, dataframe_exibicao
+
+# Padrões de data reconhecidos na normalização
+PADRAO_DATA_ISO = r'(\d{4})[-/](\d{1,2})[-/](\d{1,2})'
+PADRAO_DATA_BR = r'(\d{1,2})/(\d{1,2})/(\d{4})'
+
+# Fora deste intervalo de anos a normalização usa a regra célula a célula
+ANO_MINIMO = 1900
+ANO_MAXIMO = 2200
 
 
 class SheetsHandler:
 
-    def __init__(self, credentials_path: str = None, spreadsheet_url: str = None):
+    def __init__(self, credentials_path: str = None, spreadsheet_url: str = None,
+                 usar_cache: bool = True):
         self.credentials_path = credentials_path
         self.spreadsheet_url = spreadsheet_url
         self.caminho_arquivo = spreadsheet_url  # Alias para compatibilidade com ExcelHandler
@@ -20,6 +36,20 @@ class SheetsHandler:
         self.df = None
         self.dados_carregados = False
         self.ano_atual = None  # Ano da aba atualmente carregada
+        self._indice_datas = IndiceDatas()
+        self._aba_sincronizada = False  # Aba remota na mesma ordem/formato do DataFrame
+
+        # Snapshots das abas: em memória e em disco, válidos para uma revisão da planilha
+        self.cache = CacheSheets() if usar_cache else None
+        self._revisao = None
+
+        # Partições residentes: uma por aba de ano (ano -> df, índice de datas, estado)
+        self.abas_por_ano = {}
+
+        # Valores distintos por coluna em todas as abas (combos do formulário)
+        self._indice_valores = IndiceValoresUnicos(ignorar={''})
+        self._cubo = CuboEstatisticas()
+        self._indice_espacial = IndiceEspacial()
 
     def autenticar(self) -> Tuple[bool, str]:
         try:
@@ -45,7 +75,13 @@ class SheetsHandler:
         except Exception as e:
             return False, f"Erro na autenticação: {str(e)}"
 
-    def carregar_planilha(self, spreadsheet_url: str = None) -> Tuple[bool, str]:
+    def carregar_planilha(self, spreadsheet_url: str = None,
+                          progresso: Callable[[int, int, str], None] = None,
+                          cancelado: Callable[[], bool] = None) -> Tuple[bool, str]:
+        """
+        Abre a planilha e carrega todas as abas de ano. progresso(abas, total,
+        mensagem) é chamado a cada aba e cancelado() é conferido entre elas.
+        """
         if spreadsheet_url:
             self.spreadsheet_url = spreadsheet_url
 
@@ -55,71 +91,47 @@ class SheetsHandler:
         try:
             # Abre a planilha pela URL
             self.spreadsheet = self.client.open_by_url(self.spreadsheet_url)
-
-            # Carrega todas as abas de anos disponíveis
-            anos_disponiveis = ['2024', '2025', '2026']
-            total_registros_geral = 0
-
-            for ano in anos_disponiveis:
-                try:
-                    worksheet = self.spreadsheet.worksheet(ano)
-                    self.worksheets_por_ano[ano] = worksheet
-
-                    # Carrega dados da aba
-                    dados = worksheet.get_all_values()
-                    if dados and len(dados) > 1:
-                        total_registros_geral += len(dados) - 1  # -1 para excluir cabeçalho
-
-                except gspread.exceptions.WorksheetNotFound:
-                    # Se a aba do ano não existir, ignora
-                    pass
+            self._revisao = self._obter_revisao()
+
+            # Metadados de todas as abas numa única chamada
+            self.worksheets_por_ano = {}
+            self.abas_por_ano = {}
+            self.ano_atual = None
+            self._indice_valores = IndiceValoresUnicos(ignorar={''})
+
+            # Toda aba cujo título é um ano (ex.: 2024) é uma aba de dados
+            for worksheet in self.spreadsheet.worksheets():
+                titulo = worksheet.title.strip()
+                if len(titulo) == 4 and titulo.isdigit():
+                    self.worksheets_por_ano[titulo] = worksheet
+
+            # Carrega todas as abas de anos (do cache local ou num único batch_get)
+            abas = self._ler_abas(sorted(self.worksheets_por_ano.keys()), progresso, cancelado)
+            if abas is None:
+                return False, "Carregamento cancelado."
+            total_registros_geral = sum(len(aba['df']) for aba in abas.values())
 
             if not self.worksheets_por_ano:
-                return False, "Nenhuma aba de ano (2024, 2025, 2026) encontrada na planilha."
-
-            # Define a aba do ano atual como padrão (2026 se existir, senão o mais recente)
-            if '2026' in self.worksheets_por_ano:
-                self.ano_atual = '2026'
-            else:
-                self.ano_atual = max(self.worksheets_por_ano.keys())
+                return False, "Nenhuma aba de ano (ex.: 2025) encontrada na planilha."
 
-            self.worksheet = self.worksheets_por_ano[self.ano_atual]
+            # Define a aba do ano mais recente como padrão
+            ano_padrao = max(self.worksheets_por_ano.keys())
 
-            # Carrega dados da aba atual em DataFrame
-            dados = self.worksheet.get_all_values()
+            aba = abas[ano_padrao]
 
-            if not dados:
+            if aba['num_colunas'] == 0:
                 return False, "Planilha vazia."
 
-            # Cria DataFrame
-            self.df = pd.DataFrame(dados[1:], columns=dados[0])
-
             # Valida colunas (aceita 28 ou 29 colunas)
-            num_colunas = len(self.df.columns)
+            num_colunas = aba['num_colunas']
             if num_colunas < 28 or num_colunas > 29:
                 return False, f"Planilha possui {num_colunas} colunas. Esperado: 28 ou 29 colunas."
 
-            # Verifica estrutura das colunas (flexivel)
-            colunas_planilha = [col.strip() for col in self.df.columns]
-            colunas_esperadas = [col.strip() for col in COLUNAS_EXCEL]
-
-            # Se a planilha tem 28 colunas, verifica qual esta faltando e adiciona
-            if num_colunas == 28:
-                colunas_faltantes = []
-                for col_esperada in colunas_esperadas:
-                    if col_esperada not in colunas_planilha:
-                        colunas_faltantes.append(col_esperada)
-
-                for col_faltante in colunas_faltantes:
-                    self.df[col_faltante] = ''
-
-                self.df = self.df[colunas_esperadas]
-
+            self._ativar_aba(ano_padrao, aba)
+            self._cubo = CuboEstatisticas.montar(self._dataframes_anos())
+            self._indice_espacial = IndiceEspacial.montar(self._dataframes_anos())
             self.dados_carregados = True
 
-            # Normaliza as datas existentes na planilha para dd/mm/yyyy
-            self._normalizar_datas_dataframe()
-
             anos_carregados = ', '.join(sorted(self.worksheets_por_ano.keys()))
 
             return True, f"Planilha carregada com sucesso!\nAbas encontradas: {anos_carregados}\nTotal: {total_registros_geral} registros."
@@ -144,33 +156,52 @@ class SheetsHandler:
                 'nome_planilha': None
             }
 
-        # Processa a última data
+        # Estatísticas de todas as abas de ano já residentes em memória
+        total_registros = 0
         ultima_data = None
-        if 'Data do Fato' in self.df.columns:
-            datas_validas = self.df['Data do Fato'].dropna()
-            if len(datas_validas) > 0:
-                ultima_data_valor = datas_validas.iloc[-1]
-                ultima_data = parse_data_excel(ultima_data_valor)
+
+        for df in self._dataframes_anos():
+            total_registros += len(df)
+
+            if 'Data do Fato' in df.columns:
+                datas_validas = df['Data do Fato'].dropna()
+                if len(datas_validas) > 0:
+                    data = parse_data_excel(datas_validas.iloc[-1])
+                    if data is not None and (ultima_data is None or data > ultima_data):
+                        ultima_data = data
 
         return {
-            'total_registros': len(self.df),
+            'total_registros': total_registros,
             'ultima_data': ultima_data,
-            'municipios_unicos': self.df['Município do Fato'].nunique(),
+            'municipios_unicos': len(self._cubo.valores('municipio')),
             'nome_planilha': self.spreadsheet.title if self.spreadsheet else None
         }
 
     def inserir_registro(self, dados: dict) -> Tuple[bool, str, int]:
+        return self.inserir_registros([dados])
+
+    def inserir_registros(self, lista_dados: list) -> Tuple[bool, str, int]:
+        """
+        Insere vários registros do mesmo ano (ex.: as vítimas de uma mesma
+        ocorrência) numa única chamada à API. Retorna a linha do primeiro.
+        """
         if not self.dados_carregados:
             return False, "Nenhuma planilha carregada.", -1
 
+        if not lista_dados:
+            return False, "Nenhum registro para inserir.", -1
+
         try:
             # Converte dados para formato compatível com DataFrame
-            dados_formatados = self._formatar_dados_para_sheets(dados)
+            registros = [self._formatar_dados_para_sheets(dados) for dados in lista_dados]
 
             # Extrai o ano da Data do Fato
-            ano_registro = self._extrair_ano_data(dados_formatados.get('Data do Fato', ''))
+            anos = {self._extrair_ano_data(r.get('Data do Fato', '')) for r in registros}
+            ano_registro = anos.pop() if len(anos) == 1 else None
 
             if not ano_registro:
+                if anos:
+                    return False, "Registros gravados juntos devem ter a Data do Fato no mesmo ano.", -1
                 return False, "Não foi possível determinar o ano da Data do Fato.", -1
 
             # Verifica se existe aba para este ano
@@ -180,51 +211,105 @@ class SheetsHandler:
             # Carrega a aba correta baseada no ano
             self._carregar_aba_ano(ano_registro)
 
-            # Cria um novo registro como DataFrame
-            novo_registro = pd.DataFrame([dados_formatados])
-
-            # Adiciona ao DataFrame existente
-            self.df = pd.concat([self.df, novo_registro], ignore_index=True)
-
-            # Normaliza todas as datas para formato dd/mm/yyyy antes de ordenar
-            self._normalizar_datas_dataframe()
-
-            # Converte coluna de data para ordenação
-            df_temp = self.df.copy()
-            df_temp['Data do Fato_sort'] = pd.to_datetime(
-                df_temp['Data do Fato'],
-                format='%d/%m/%Y',
-                errors='coerce'
-            )
-
-            # Ordena por Data do Fato
-            df_temp = df_temp.sort_values(by='Data do Fato_sort', ascending=True)
-            df_temp = df_temp.drop('Data do Fato_sort', axis=1)
-            df_temp = df_temp.reset_index(drop=True)
-
-            # Substitui o DataFrame original
-            self.df = df_temp
-
-            # Atualiza a planilha no Google Sheets
-            sucesso_update = self._atualizar_sheets()
+            # Em ordem de data (estável): cada registro entra depois dos que têm a mesma data
+            datas = [pd.to_datetime(r.get('Data do Fato'), format='%d/%m/%Y', errors='coerce')
+                     for r in registros]
+            ordem = sorted(range(len(registros)), key=lambda i: chave_data(datas[i]))
+            registros = [registros[i] for i in ordem]
+            datas = [datas[i] for i in ordem]
+
+            # Posições no DataFrame atual (busca binária no índice de datas)
+            originais = [self._indice_datas.posicao_insercao(data) for data in datas]
+            posicoes = [posicao + i for i, posicao in enumerate(originais)]
+
+            # Intercala os registros novos nas posições, mantendo o DataFrame ordenado
+            df_anterior = self.df
+            novos = pd.DataFrame(registros)
+            df_alinhado, novos = alinhar_tipos(self.df, novos)
+            partes = []
+            inicio = 0
+            for i, posicao in enumerate(originais):
+                partes.append(df_alinhado.iloc[inicio:posicao])
+                partes.append(novos.iloc[i:i + 1])
+                inicio = posicao
+            partes.append(df_alinhado.iloc[inicio:])
+            df = pd.concat([p for p in partes if len(p) > 0], ignore_index=True)
+
+            # Coluna nova no registro: a aba remota precisa ser regravada inteira
+            aba_sincronizada = self._aba_sincronizada and list(df.columns) == list(df_anterior.columns)
+
+            # Atualiza a planilha no Google Sheets (só as linhas novas, se a aba já está ordenada)
+            self.df = df
+            try:
+                if aba_sincronizada:
+                    sucesso_update = self._inserir_linhas_sheets(
+                        posicoes, [df.iloc[posicao].tolist() for posicao in posicoes])
+                else:
+                    sucesso_update = self._atualizar_sheets()
+                    self._aba_sincronizada = sucesso_update
+            except Exception:
+                sucesso_update = False
 
             if not sucesso_update:
+                # Desfaz a inserção local para não divergir da aba remota
+                self.df = df_anterior
                 return False, "Erro ao atualizar Google Sheets.", -1
 
-            # Encontra a posição onde o registro foi inserido
-            posicao = self._encontrar_posicao_registro(dados_formatados)
-
-            return True, f"Registro inserido com sucesso na aba {ano_registro}!", posicao
-
         except Exception as e:
             return False, f"Erro ao inserir registro: {str(e)}", -1
 
+        # Gravado no Google Sheets: daqui em diante o resultado é sucesso
+        self._concluir_insercao(ano_registro, posicoes, datas, registros)
+
+        if len(registros) == 1:
+            mensagem = f"Registro inserido com sucesso na aba {ano_registro}!"
+        else:
+            mensagem = f"{len(registros)} registros inseridos com sucesso na aba {ano_registro}!"
+
+        # +2 porque a planilha começa em 1 e tem cabeçalho
+        return True, mensagem, posicoes[0] + 2
+
+    def _concluir_insercao(self, ano: str, posicoes: list, datas: list, registros: list):
+        try:
+            for posicao, data in zip(posicoes, datas):
+                self._indice_datas.inserir(posicao, data)
+            self._registrar_escrita(ano)
+            for registro in registros:
+                self._indice_valores.registrar(registro)
+                self._cubo.registrar(registro)
+                self._indice_espacial.registrar(registro)
+        except Exception:
+            # Atualização interrompida no meio: remonta os índices a partir das abas
+            self._indice_datas = IndiceDatas(self.df['Data do Fato'])
+            self.abas_por_ano[ano] = self._estado_aba(len(self.df.columns))
+            self._remontar_agregados()
+
+    def _remontar_agregados(self):
+        # Índices sobre todas as abas residentes (valores, cubo e espacial)
+        self._indice_valores = IndiceValoresUnicos(ignorar={''})
+        self._cubo = CuboEstatisticas.montar(self._dataframes_anos())
+        self._indice_espacial = IndiceEspacial.montar(self._dataframes_anos())
+
+    def _preparar_ordenacao(self, aba_alterada: bool = False):
+
+        # Ordena uma única vez por Data do Fato (registros sem data ficam no fim)
+        datas = pd.to_datetime(self.df['Data do Fato'], format='%d/%m/%Y', errors='coerce')
+        ordem = datas.sort_values(kind='stable', na_position='last').index
+        reordenado = not ordem.is_monotonic_increasing
+
+        self.df = self.df.loc[ordem].reset_index(drop=True)
+        self._indice_datas = IndiceDatas(datas.loc[ordem].reset_index(drop=True))
+
+        # Se a aba remota não está no formato do DataFrame, a primeira inserção regrava tudo
+        self._aba_sincronizada = not (aba_alterada or reordenado)
+
     def _normalizar_datas_dataframe(self):
-        import re
 
         # Se DataFrame vazio, não faz nada
         if self.df is None or len(self.df) == 0:
-            return
+            return False
+
+        alterado = False
 
         # Colunas que contêm datas
         colunas_data = ['Data do Fato', 'Data de Nascimento', 'Data do Óbito']
@@ -233,53 +318,122 @@ class SheetsHandler:
             if coluna not in self.df.columns:
                 continue
 
-            for idx, valor in self.df[coluna].items():
-                if not valor or pd.isna(valor):
-                    continue
-
-                valor_str = str(valor).strip()
-                if not valor_str:
-                    continue
-
-                # Tenta detectar o formato da data
-                data_normalizada = None
+            normalizadas = self._normalizar_serie_datas(self.df[coluna])
+            if normalizadas.empty:
+                continue
 
-                # Formato yyyy-mm-dd ou yyyy/mm/dd (ISO)
-                if re.match(r'(\d{4})[-/](\d{1,2})[-/](\d{1,2})', valor_str):
+            # Atualiza de uma vez só as células que foram normalizadas
+            originais = self.df.loc[normalizadas.index, coluna]
+            alterado = alterado or bool((normalizadas != originais).any())
+            self.df.loc[normalizadas.index, coluna] = normalizadas
+
+        return alterado
+
+    def _normalizar_serie_datas(self, serie: pd.Series) -> pd.Series:
+        """
+        Normaliza uma coluna de datas para dd/mm/yyyy de forma vetorizada.
+
+        Returns:
+            Série só com as células que puderam ser normalizadas (mesmo índice da coluna)
+        """
+        texto = serie[serie.notna()].astype(str).str.strip()
+        texto = texto[texto != '']
+        resultado = pd.Series(index=texto.index, dtype=object)
+
+        # Mesmas regras de detecção de _normalizar_valor_data
+        eh_iso = texto.str.match(PADRAO_DATA_ISO)
+        eh_br = ~eh_iso & texto.str.match(PADRAO_DATA_BR)
+        residuo = pd.Series(False, index=texto.index)
+
+        # Formato yyyy-mm-dd ou yyyy/mm/dd (ISO) exato, opcionalmente com hora zerada
+        partes = texto[eh_iso].str.extract(r'^([0-9]{4})([-/])([0-9]{1,2})\2([0-9]{1,2})(?: 00:00:00)?$')
+        residuo[partes.index[partes[0].isna()]] = True
+        partes = partes.dropna()
+        ano, mes, dia = partes[0], partes[2], partes[3]
+        validas = self._datas_validas(ano, mes, dia)
+        resultado[validas.index[validas]] = (dia.str.zfill(2) + '/' + mes.str.zfill(2) + '/' + ano)[validas]
+        residuo[validas.index[~validas]] = True
+
+        # Formato dd/mm/yyyy ou mm/dd/yyyy exato
+        partes = texto[eh_br].str.extract(r'^([0-9]{1,2})/([0-9]{1,2})/([0-9]{4})$')
+        residuo[partes.index[partes[0].isna()]] = True
+        partes = partes.dropna()
+        dia, mes, ano = partes[0], partes[1], partes[2]
+        dia_num, mes_num = dia.astype(int), mes.astype(int)
+
+        # Dia > 12: definitivamente dd/mm/yyyy
+        dmy = dia_num > 12
+        resultado[dmy.index[dmy]] = (dia.str.zfill(2) + '/' + mes.str.zfill(2) + '/' + ano)[dmy]
+
+        # Mês > 12: definitivamente mm/dd/yyyy
+        mdy = ~dmy & (mes_num > 12)
+        resultado[mdy.index[mdy]] = (mes.str.zfill(2) + '/' + dia.str.zfill(2) + '/' + ano)[mdy]
+
+        # Ambíguo: vale dd/mm/yyyy se for uma data válida
+        ambiguo = ~dmy & ~mdy
+        validas = self._datas_validas(ano[ambiguo], mes[ambiguo], dia[ambiguo])
+        resultado[validas.index[validas]] = (dia.str.zfill(2) + '/' + mes.str.zfill(2) + '/' + ano)[validas.index[validas]]
+        fora_intervalo = ~ano[ambiguo].astype(int).between(ANO_MINIMO, ANO_MAXIMO)
+        residuo[fora_intervalo.index[fora_intervalo]] = True
+
+        # Casos raros (texto extra, separadores mistos, datas inválidas) seguem a regra célula a célula
+        # (cada valor distinto é avaliado uma única vez)
+        if residuo.any():
+            valores = texto[residuo]
+            normalizados = {valor: self._normalizar_valor_data(valor) for valor in valores.unique()}
+            resultado[residuo] = valores.map(normalizados)
+
+        return resultado.dropna()
+
+    def _datas_validas(self, ano: pd.Series, mes: pd.Series, dia: pd.Series) -> pd.Series:
+        if ano.empty:
+            return pd.Series(False, index=ano.index)
+
+        ano_num = ano.astype(int)
+        datas = pd.to_datetime(
+            pd.DataFrame({'year': ano_num, 'month': mes.astype(int), 'day': dia.astype(int)}),
+            errors='coerce'
+        )
+        return datas.notna() & ano_num.between(ANO_MINIMO, ANO_MAXIMO)
+
+    @staticmethod
+    def _normalizar_valor_data(valor_str: str) -> Optional[str]:
+        data_normalizada = None
+
+        # Formato yyyy-mm-dd ou yyyy/mm/dd (ISO)
+        if re.match(PADRAO_DATA_ISO, valor_str):
+            try:
+                dt = pd.to_datetime(valor_str, errors='coerce')
+                if not pd.isna(dt):
+                    data_normalizada = dt.strftime('%d/%m/%Y')
+            except:
+                pass
+
+        # Formato dd/mm/yyyy (já correto)
+        elif re.match(PADRAO_DATA_BR, valor_str):
+            partes = valor_str.split('/')
+            if len(partes) == 3:
+                dia, mes, ano = partes
+                # Verifica se é dd/mm/yyyy ou mm/dd/yyyy
+                if int(dia) > 12:  # Definitivamente dd/mm/yyyy
+                    data_normalizada = f"{dia.zfill(2)}/{mes.zfill(2)}/{ano}"
+                elif int(mes) > 12:  # Definitivamente mm/dd/yyyy
+                    data_normalizada = f"{mes.zfill(2)}/{dia.zfill(2)}/{ano}"
+                else:  # Ambíguo - tenta parsear como dd/mm/yyyy
                     try:
-                        dt = pd.to_datetime(valor_str, errors='coerce')
+                        dt = pd.to_datetime(valor_str, format='%d/%m/%Y', errors='coerce')
                         if not pd.isna(dt):
                             data_normalizada = dt.strftime('%d/%m/%Y')
                     except:
-                        pass
-
-                # Formato dd/mm/yyyy (já correto)
-                elif re.match(r'(\d{1,2})/(\d{1,2})/(\d{4})', valor_str):
-                    partes = valor_str.split('/')
-                    if len(partes) == 3:
-                        dia, mes, ano = partes
-                        # Verifica se é dd/mm/yyyy ou mm/dd/yyyy
-                        if int(dia) > 12:  # Definitivamente dd/mm/yyyy
-                            data_normalizada = f"{dia.zfill(2)}/{mes.zfill(2)}/{ano}"
-                        elif int(mes) > 12:  # Definitivamente mm/dd/yyyy
-                            data_normalizada = f"{mes.zfill(2)}/{dia.zfill(2)}/{ano}"
-                        else:  # Ambíguo - tenta parsear como dd/mm/yyyy
-                            try:
-                                dt = pd.to_datetime(valor_str, format='%d/%m/%Y', errors='coerce')
-                                if not pd.isna(dt):
-                                    data_normalizada = dt.strftime('%d/%m/%Y')
-                            except:
-                                # Se falhar, tenta mm/dd/yyyy
-                                try:
-                                    dt = pd.to_datetime(valor_str, format='%m/%d/%Y', errors='coerce')
-                                    if not pd.isna(dt):
-                                        data_normalizada = dt.strftime('%d/%m/%Y')
-                                except:
-                                    pass
-
-                # Se conseguiu normalizar, atualiza
-                if data_normalizada:
-                    self.df.at[idx, coluna] = data_normalizada
+                        # Se falhar, tenta mm/dd/yyyy
+                        try:
+                            dt = pd.to_datetime(valor_str, format='%m/%d/%Y', errors='coerce')
+                            if not pd.isna(dt):
+                                data_normalizada = dt.strftime('%d/%m/%Y')
+                        except:
+                            pass
+
+        return data_normalizada
 
     def _formatar_dados_para_sheets(self, dados: dict) -> dict:
         dados_formatados = {}
@@ -302,59 +456,129 @@ class SheetsHandler:
 
         return dados_formatados
 
-    def _atualizar_sheets(self) -> bool:
+    def _formatar_celula(self, cell) -> str:
+        cell = valor_exibicao(cell)
+        if cell is None or (isinstance(cell, float) and pd.isna(cell)):
+            return ''
+        elif isinstance(cell, datetime):
+            return cell.strftime('%d/%m/%Y')
+        elif isinstance(cell, (int, float)):
+            # Remove .0 de números inteiros
+            if isinstance(cell, float) and cell.is_integer():
+                return str(int(cell))
+            return str(cell)
+        return str(cell)
+
+    def _inserir_linhas_sheets(self, posicoes: list, linhas: list) -> bool:
+        # posicoes: posição final (no DataFrame, em ordem crescente) de cada linha
         try:
-            # Limpa a planilha
-            self.worksheet.clear()
+            sheet_id = self.worksheet.id
+
+            # Linhas em posições consecutivas formam um bloco (um insert + um update)
+            blocos = []
+            for posicao, linha in zip(posicoes, linhas):
+                if blocos and blocos[-1][0] + len(blocos[-1][1]) == posicao:
+                    blocos[-1][1].append(linha)
+                else:
+                    blocos.append((posicao, [linha]))
+
+            requisicoes = []
+            for posicao, linhas_bloco in blocos:
+                # Linha 0 da aba é o cabeçalho
+                inicio = posicao + 1
+
+                linhas_celulas = []
+                for linha in linhas_bloco:
+                    valores = []
+                    for cell in linha:
+                        texto = self._formatar_celula(cell)
+                        valores.append({'userEnteredValue': {'stringValue': texto}} if texto else {})
+                    linhas_celulas.append({'values': valores})
+
+                requisicoes.append({
+                    'insertDimension': {
+                        'range': {
+                            'sheetId': sheet_id,
+                            'dimension': 'ROWS',
+                            'startIndex': inicio,
+                            'endIndex': inicio + len(linhas_bloco)
+                        },
+                        'inheritFromBefore': inicio > 1
+                    }
+                })
+                requisicoes.append({
+                    'updateCells': {
+                        'start': {'sheetId': sheet_id, 'rowIndex': inicio, 'columnIndex': 0},
+                        'rows': linhas_celulas,
+                        'fields': 'userEnteredValue'
+                    }
+                })
+
+            # Abre espaço e grava os valores de todos os blocos numa única chamada à API
+            self.spreadsheet.batch_update({'requests': requisicoes})
+
+            return True
 
+        except Exception as e:
+            print(f"Erro ao inserir linhas no sheets: {e}")
+            return False
+
+    def _atualizar_sheets(self) -> bool:
+        try:
             # Prepara dados para atualização
-            dados_para_sheets = [self.df.columns.tolist()] + self.df.values.tolist()
+            dados_para_sheets = [self.df.columns.tolist()] + dataframe_exibicao(self.df).values.tolist()
 
             # Converte todos os valores para string com formatação adequada
-            dados_formatados = []
-            for row in dados_para_sheets:
-                row_formatada = []
-                for cell in row:
-                    if cell is None or (isinstance(cell, float) and pd.isna(cell)):
-                        row_formatada.append('')
-                    elif isinstance(cell, (int, float)):
-                        # Remove .0 de números inteiros
-                        if isinstance(cell, float) and cell.is_integer():
-                            row_formatada.append(str(int(cell)))
-                        else:
-                            row_formatada.append(str(cell))
-                    else:
-                        row_formatada.append(str(cell))
-                dados_formatados.append(row_formatada)
-
-            # Atualiza a planilha
+            dados_formatados = [
+                [self._formatar_celula(cell) for cell in row]
+                for row in dados_para_sheets
+            ]
+
+            # Sobrescreve a partir de A1 (sem clear antes: uma falha não deixa a aba vazia)
             self.worksheet.update('A1', dados_formatados)
 
+            # Limpa linhas antigas que sobraram abaixo dos dados. O intervalo vai até o fim
+            # da aba ("A101:AC"): o row_count guardado pelo gspread não acompanha as
+            # linhas inseridas pelo batch_update
+            num_colunas = max(len(dados_formatados[0]), self.worksheet.col_count)
+            ultima_coluna = gspread.utils.rowcol_to_a1(1, num_colunas).rstrip('0123456789')
+            self.worksheet.batch_clear([f"A{len(dados_formatados) + 1}:{ultima_coluna}"])
+
             return True
 
         except Exception as e:
             print(f"Erro ao atualizar sheets: {e}")
             return False
 
-    def _encontrar_posicao_registro(self, dados: dict) -> int:
-        try:
-            for idx, row in self.df.iterrows():
-                if (row['Vítima'] == dados.get('Vítima') and
-                    row['Data do Fato'] == dados.get('Data do Fato')):
-                    return idx + 2  # +2 porque Excel começa em 1 e tem cabeçalho
-            return -1
-        except:
-            return -1
-
     def obter_valores_unicos(self, coluna: str) -> list:
-        if not self.dados_carregados or coluna not in self.df.columns:
+        if not self.dados_carregados:
             return []
 
-        valores = self.df[coluna].dropna().unique().tolist()
-        return sorted([v for v in valores if v != ''])
+        # Índice mantido a cada inserção: não percorre as abas de novo
+        return self._indice_valores.obter(coluna, self._dataframes_anos())
+
+    def obter_estatisticas(self) -> CuboEstatisticas:
+        # Contagens de todas as abas de ano (mantidas a cada inserção)
+        return self._cubo
+
+    def obter_indice_espacial(self) -> IndiceEspacial:
+        # Busca por raio/retângulo e pontos críticos sobre Lat/Long de todas as abas
+        return self._indice_espacial
 
     def obter_dataframe(self) -> Optional[pd.DataFrame]:
-        return self.df if self.dados_carregados else None
+        if not self.dados_carregados:
+            return None
+
+        # Todas as abas de ano, em ordem cronológica
+        dataframes = self._dataframes_anos()
+        if len(dataframes) == 1:
+            return dataframes[0]
+        return pd.concat(dataframes, ignore_index=True)
+
+    def _dataframes_anos(self) -> list:
+        # A aba ativa é sempre self.df (pode ter sido alterada depois do registro)
+        return [self.df if ano == self.ano_atual else self.abas_por_ano[ano]['df']
+                for ano in sorted(self.abas_por_ano)]
 
     def _extrair_ano_data(self, data_str: str) -> Optional[str]:
         try:
@@ -376,19 +600,170 @@ class SheetsHandler:
         if ano not in self.worksheets_por_ano:
             raise ValueError(f"Aba para o ano {ano} não encontrada.")
 
-        # Atualiza a worksheet atual
-        self.worksheet = self.worksheets_por_ano[ano]
-        self.ano_atual = ano
+        # As abas residentes só valem enquanto a planilha não mudou: antes de gravar,
+        # relê o que pode ter sido alterado por outra pessoa
+        anos, revisao = self._abas_desatualizadas(ano)
+        if anos:
+            self._recarregar_abas(anos, revisao)
+
+        self._ativar_aba(ano, self._ler_abas([ano])[ano])
+
+    def _abas_desatualizadas(self, ano: str) -> Tuple[list, Optional[str]]:
+        # Retorna as abas a reler e a revisão que elas terão depois de relidas
+        if self._revisao is not None:
+            revisao = self._obter_revisao()
+            if revisao == self._revisao:
+                # Ninguém alterou a planilha: as abas residentes continuam valendo
+                return [], revisao
+            if revisao is not None:
+                # Outra pessoa alterou alguma aba: relê todas numa única requisição
+                return sorted(set(self.abas_por_ano) | {ano}), revisao
+
+        # Revisão desconhecida (a nossa última escrita a mudou): sem como saber se
+        # mais alguém gravou, relê só a aba que vai receber a escrita
+        return [ano], None
+
+    def _recarregar_abas(self, anos: list, revisao: Optional[str]):
+        residentes = dict(self.abas_por_ano)
+        revisao_anterior = self._revisao
+
+        for ano in anos:
+            self.abas_por_ano.pop(ano, None)
+        self._revisao = revisao
 
-        # Carrega dados da aba
-        dados = self.worksheet.get_all_values()
+        try:
+            abas = self._ler_abas(anos)
+        except Exception:
+            # Falha ao baixar: mantém as abas que já estavam em memória
+            self.abas_por_ano = residentes
+            self._revisao = revisao_anterior
+            if self.ano_atual in residentes:
+                self._ativar_aba(self.ano_atual, residentes[self.ano_atual])
+            raise
+
+        if self.ano_atual in self.abas_por_ano:
+            self._ativar_aba(self.ano_atual, self.abas_por_ano[self.ano_atual])
+
+        # Só remonta os índices globais se alguma aba de fato mudou
+        if any(ano not in residentes or not abas[ano]['df'].equals(residentes[ano]['df'])
+               for ano in anos):
+            self._remontar_agregados()
+
+    def _ler_abas(self, anos: list, progresso: Callable[[int, int, str], None] = None,
+                  cancelado: Callable[[], bool] = None) -> Optional[dict]:
+        # Retorna None se o carregamento for cancelado
+        abas = {}
+        faltantes = []
+
+        def avisar(mensagem):
+            if progresso:
+                progresso(len(abas), len(anos), mensagem)
+
+        for ano in anos:
+            # 1. Memória
+            if ano in self.abas_por_ano:
+                abas[ano] = self.abas_por_ano[ano]
+                continue
+
+            # 2. Disco (só se a planilha não mudou desde o snapshot)
+            aba = None
+            if self.cache:
+                aba = self.cache.carregar_aba(self.spreadsheet.id, ano, self._revisao)
+
+            if aba is None:
+                faltantes.append(ano)
+            else:
+                abas[ano] = aba
+                self.abas_por_ano[ano] = aba
+                avisar(f"Aba {ano} carregada do cache local")
+
+        # 3. Google Sheets: todas as abas faltantes numa única requisição
+        if faltantes:
+            if cancelado and cancelado():
+                return None
+            avisar(f"Baixando {len(faltantes)} aba(s) do Google Sheets...")
+            resposta = self.spreadsheet.values_batch_get([f"'{ano}'" for ano in faltantes])
+
+            for ano, intervalo in zip(faltantes, resposta.get('valueRanges', [])):
+                if cancelado and cancelado():
+                    return None
+                avisar(f"Processando aba {ano}...")
+
+                # A API omite células vazias no fim das linhas
+                valores = intervalo.get('values', [])
+                dados = gspread.utils.fill_gaps(valores) if valores else []
+                aba = self._processar_aba(dados)
+
+                if self.cache:
+                    self.cache.salvar_aba(self.spreadsheet.id, ano, self._revisao, aba)
+
+                abas[ano] = aba
+                self.abas_por_ano[ano] = aba
+
+        avisar("Concluído")
+        return abas
+
+    def _processar_aba(self, dados: list) -> dict:
 
         if not dados:
             # Se a aba estiver vazia, cria DataFrame vazio com as colunas esperadas
             self.df = pd.DataFrame(columns=COLUNAS_EXCEL)
+            num_colunas = 0
         else:
             # Cria DataFrame com os dados
             self.df = pd.DataFrame(dados[1:], columns=dados[0])
+            num_colunas = len(self.df.columns)
+
+        # Se a aba tem 28 colunas, adiciona a que está faltando
+        colunas_adicionadas = False
+        if num_colunas == 28:
+            colunas_planilha = [col.strip() for col in self.df.columns]
+            colunas_esperadas = [col.strip() for col in COLUNAS_EXCEL]
+
+            for col_esperada in colunas_esperadas:
+                if col_esperada not in colunas_planilha:
+                    self.df[col_esperada] = ''
+                    colunas_adicionadas = True
+
+            self.df = self.df[colunas_esperadas]
+
+        # Normaliza as datas existentes para dd/mm/yyyy e ordena
+        datas_alteradas = self._normalizar_datas_dataframe()
+        self._preparar_ordenacao(datas_alteradas or colunas_adicionadas)
+
+        # Tipos compactos (categorias, datas, float32, Int16) onde a conversão é sem perda
+        self.df = aplicar_esquema(self.df)
+
+        return self._estado_aba(num_colunas)
+
+    def _estado_aba(self, num_colunas: int) -> dict:
+        return {
+            'df': self.df,
+            'indice': self._indice_datas,
+            'sincronizada': self._aba_sincronizada,
+            'num_colunas': num_colunas
+        }
+
+    def _ativar_aba(self, ano: str, aba: dict):
+        self.worksheet = self.worksheets_por_ano[ano]
+        self.ano_atual = ano
+        self.df = aba['df']
+        self._indice_datas = aba['indice']
+        self._aba_sincronizada = aba['sincronizada']
+
+    def _obter_revisao(self) -> Optional[str]:
+        # modifiedTime do Drive: muda a cada alteração em qualquer aba
+        try:
+            return self.spreadsheet.get_lastUpdateTime()
+        except Exception:
+            return None
+
+    def _registrar_escrita(self, ano: str):
+
+        self.abas_por_ano[ano] = self._estado_aba(len(self.df.columns))
 
-        # Normaliza as datas existentes
-        self._normalizar_datas_dataframe()
+        # A nossa escrita mudou a revisão. Ela não é relida aqui (seria outra chamada ao
+        # Drive por inserção): a próxima gravação relê a aba antes de escrever e o
+        # snapshot em disco, ainda na revisão do carregamento, é descartado na próxima
+        # abertura da planilha
+        self._revisao = None
@@ -0,0 +1,624 @@
+import os
+import sqlite3
+import threading
+import pandas as pd
+from datetime import date, datetime, time
+from typing import Tuple, Optional, Callable
+from .dados_estaticos import COLUNAS_EXCEL, COLUNAS_OCORRENCIA
+from .calculos import parse_data_excel, parse_hora_excel
+from .esquema import aplicar_esquema, valor_exibicao, dataframe_exibicao
+from .cubo_estatisticas import CuboEstatisticas, DIMENSOES
+from .indice_espacial import IndiceEspacial
+
+# Registros gravados por transação na importação de uma planilha
+TAMANHO_LOTE_IMPORTACAO = 1000
+
+# Mesmas tabelas de setup_database.sql. A base local é a cópia principal dos
+# registros, então guarda também as colunas da planilha que o MySQL descarta
+# (região, território, observação e o texto de "Condutor"); os valores de
+# lookup desconhecidos são acrescentados às tabelas em vez de virarem NULL.
+ESQUEMA_SQL = """
+    CREATE TABLE IF NOT EXISTS tipos_acidente (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        descricao TEXT NOT NULL UNIQUE COLLATE NOCASE
+    );
+
+    CREATE TABLE IF NOT EXISTS tipos_veiculo (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        descricao TEXT NOT NULL UNIQUE COLLATE NOCASE
+    );
+
+    CREATE TABLE IF NOT EXISTS municipios (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        nome TEXT NOT NULL UNIQUE COLLATE NOCASE
+    );
+
+    CREATE TABLE IF NOT EXISTS naturezas_ocorrencia (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        descricao TEXT NOT NULL UNIQUE COLLATE NOCASE
+    );
+
+    CREATE TABLE IF NOT EXISTS ocorrencias (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        data_fato DATE,
+        hora_fato TIME,
+        dia_semana TEXT,
+        mes_referencia TEXT,
+        id_municipio INTEGER REFERENCES municipios(id),
+        logradouro TEXT,
+        subtipo_local TEXT,
+        id_natureza INTEGER REFERENCES naturezas_ocorrencia(id),
+        id_tipo_acidente INTEGER REFERENCES tipos_acidente(id),
+        latitude REAL,
+        longitude REAL,
+        regiao TEXT,
+        territorio TEXT,
+        observacao TEXT,
+        criado_em TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    );
+
+    CREATE TABLE IF NOT EXISTS vitimas (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        id_ocorrencia INTEGER NOT NULL REFERENCES ocorrencias(id),
+        nome TEXT,
+        sexo TEXT,
+        data_nascimento DATE,
+        idade INTEGER,
+        cpf TEXT,
+        filiacao TEXT,
+        possui_cnh TEXT,
+        e_condutor BOOLEAN,
+        condutor TEXT,
+        exame_alcoolemia TEXT,
+        uso_capacete TEXT,
+        id_veiculo_vitima INTEGER REFERENCES tipos_veiculo(id),
+        id_veiculo_envolvido INTEGER REFERENCES tipos_veiculo(id),
+        data_obito DATE,
+        local_morte TEXT,
+        natureza_laudo TEXT,
+        criado_em TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    );
+
+    -- Ordenação e contagens por data, combos do formulário e busca por CPF
+    CREATE INDEX IF NOT EXISTS idx_ocorrencias_data_fato ON ocorrencias (data_fato);
+    CREATE INDEX IF NOT EXISTS idx_ocorrencias_municipio ON ocorrencias (id_municipio);
+    CREATE INDEX IF NOT EXISTS idx_ocorrencias_natureza ON ocorrencias (id_natureza);
+    CREATE INDEX IF NOT EXISTS idx_ocorrencias_territorio ON ocorrencias (territorio);
+    CREATE INDEX IF NOT EXISTS idx_vitimas_ocorrencia ON vitimas (id_ocorrencia);
+    CREATE INDEX IF NOT EXISTS idx_vitimas_cpf ON vitimas (cpf);
+    CREATE INDEX IF NOT EXISTS idx_vitimas_local_morte ON vitimas (local_morte);
+"""
+
+SQL_INSERIR_OCORRENCIA = """
+    INSERT INTO ocorrencias (
+        data_fato, hora_fato, dia_semana, mes_referencia,
+        id_municipio, logradouro, subtipo_local,
+        id_natureza, id_tipo_acidente, latitude, longitude,
+        regiao, territorio, observacao
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+SQL_INSERIR_VITIMA = """
+    INSERT INTO vitimas (
+        id_ocorrencia, nome, sexo, data_nascimento, idade,
+        cpf, filiacao, possui_cnh, e_condutor, condutor, exame_alcoolemia,
+        uso_capacete, id_veiculo_vitima, id_veiculo_envolvido,
+        data_obito, local_morte, natureza_laudo
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+# Expressão SQL de cada coluna da planilha (sobre FROM_REGISTROS)
+COLUNAS_SQL = {
+    "Natureza da Ocorrência": "nat.descricao",
+    "Tipo de Acidente": "tac.descricao",
+    "Natureza do Laudo": "v.natureza_laudo",
+    "Data do Óbito": "v.data_obito",
+    "Vítima": "v.nome",
+    "Sexo": "v.sexo",
+    "Filiação": "v.filiacao",
+    "Data de\nNascimento": "v.data_nascimento",
+    "Idade": "v.idade",
+    "CPF": "v.cpf",
+    "Possui\nCNH": "v.possui_cnh",
+    "Condutor": "v.condutor",
+    "Realizado Exame\nAlcoolemia": "v.exame_alcoolemia",
+    "Estava usando\nCapacete": "v.uso_capacete",
+    "Município do Fato": "mun.nome",
+    "Logradouro": "o.logradouro",
+    "Subtipo do Local": "o.subtipo_local",
+    "Lat": "o.latitude",
+    "Long": "o.longitude",
+    "Data do Fato": "o.data_fato",
+    "Hora do fato": "o.hora_fato",
+    "Dia da Semana": "o.dia_semana",
+    "Mês": "o.mes_referencia",
+    "Local da Morte": "v.local_morte",
+    "Veículo Vítima\nOu Outros": "vvi.descricao",
+    "Veículo Envolvido\nOu Outros": "ven.descricao",
+    "Região": "o.regiao",
+    "Território de\nDesenvolvimento": "o.territorio",
+    "OBS:": "o.observacao",
+}
+
+FROM_REGISTROS = """
+    FROM vitimas v
+    JOIN ocorrencias o ON o.id = v.id_ocorrencia
+    LEFT JOIN naturezas_ocorrencia nat ON nat.id = o.id_natureza
+    LEFT JOIN tipos_acidente tac ON tac.id = o.id_tipo_acidente
+    LEFT JOIN municipios mun ON mun.id = o.id_municipio
+    LEFT JOIN tipos_veiculo vvi ON vvi.id = v.id_veiculo_vitima
+    LEFT JOIN tipos_veiculo ven ON ven.id = v.id_veiculo_envolvido
+"""
+
+# Mesma ordem das planilhas: por data, registros sem data no fim, depois por chegada
+ORDEM_REGISTROS = "ORDER BY o.data_fato IS NULL, o.data_fato, v.id"
+
+# Colunas de lookup: valores distintos direto da tabela (só os usados, pelo índice)
+VALORES_LOOKUP = {
+    "Natureza da Ocorrência": ("naturezas_ocorrencia", "descricao", "ocorrencias", "id_natureza"),
+    "Tipo de Acidente": ("tipos_acidente", "descricao", "ocorrencias", "id_tipo_acidente"),
+    "Município do Fato": ("municipios", "nome", "ocorrencias", "id_municipio"),
+}
+
+# Tabelas de lookup: (tabela, coluna do valor)
+LOOKUPS = {
+    'natureza': ('naturezas_ocorrencia', 'descricao'),
+    'tipo_acidente': ('tipos_acidente', 'descricao'),
+    'municipio': ('municipios', 'nome'),
+    'veiculo': ('tipos_veiculo', 'descricao'),
+}
+
+
+class SQLiteHandler:
+    """
+    Registros numa base SQLite local (modo offline), nas tabelas do MySQL.
+
+    Cada inserção é uma transação curta (uma ocorrência e suas vítimas) e as
+    consultas da interface (valores dos combos, estatísticas) usam os
+    índices, sem montar o DataFrame. O DataFrame completo só é montado
+    quando pedido (obter_dataframe, exportação para .xlsx).
+    """
+
+    def __init__(self, caminho_banco: str = None):
+        self.caminho_arquivo = caminho_banco  # Alias para compatibilidade com ExcelHandler
+        self.dados_carregados = False
+        self._conexao = None
+        self._df_completo = None
+
+        # Uma conexão compartilhada entre a interface e o trabalhador, protegida por lock
+        self._lock = threading.Lock()
+        self._cache_lookup = {nome: {} for nome in LOOKUPS}
+        self._cubo = CuboEstatisticas()
+        self._indice_espacial = IndiceEspacial()
+
+    def carregar_banco(self, caminho_banco: str, progresso: Callable[[int, int, str], None] = None,
+                       cancelado: Callable[[], bool] = None) -> Tuple[bool, str]:
+        """Abre a base (criando as tabelas se o arquivo for novo)."""
+        try:
+            if progresso:
+                progresso(0, 0, "Abrindo base SQLite...")
+
+            self._abrir(caminho_banco)
+            total_registros = self._consultar_valor("SELECT COUNT(*) FROM vitimas")
+
+            if progresso:
+                progresso(0, 1, "Montando estatísticas...")
+            self._montar_indices()
+
+            if progresso:
+                progresso(1, 1, "Concluído")
+
+            return True, f"Base carregada com sucesso! {total_registros} registros encontrados."
+
+        except ValueError as e:
+            return False, str(e)
+        except sqlite3.DatabaseError as e:
+            return False, f"Erro ao abrir base SQLite: {e}"
+        except Exception as e:
+            return False, f"Erro ao carregar base SQLite: {str(e)}"
+
+    def importar_excel(self, caminho_excel: str, caminho_banco: str,
+                       progresso: Callable[[int, int, str], None] = None,
+                       cancelado: Callable[[], bool] = None) -> Tuple[bool, str]:
+        """Cria a base a partir de uma planilha .xlsx (uma ocorrência por linha) e a deixa aberta."""
+        if os.path.exists(caminho_banco):
+            return False, "O arquivo escolhido já existe. Escolha outro nome para a base."
+
+        from .excel_handler import ExcelHandler
+        excel = ExcelHandler(usar_diario=False)
+        sucesso, mensagem = excel.carregar_arquivo(caminho_excel, progresso, cancelado)
+        if not sucesso:
+            return False, mensagem
+
+        try:
+            self._abrir(caminho_banco)
+            registros = dataframe_exibicao(excel.obter_dataframe()).to_dict('records')
+            total = len(registros)
+
+            for inicio in range(0, total, TAMANHO_LOTE_IMPORTACAO):
+                if cancelado and cancelado():
+                    self._descartar_base(caminho_banco)
+                    return False, "Carregamento cancelado."
+
+                lote = registros[inicio:inicio + TAMANHO_LOTE_IMPORTACAO]
+                with self._lock:
+                    self._gravar_transacao([[dados] for dados in lote])
+
+                if progresso:
+                    progresso(min(inicio + TAMANHO_LOTE_IMPORTACAO, total), total, "Gravando registros...")
+
+            # Mesmos registros da planilha: as contagens já montadas pelo ExcelHandler valem
+            self._cubo = excel.obter_estatisticas()
+            self._indice_espacial = excel.obter_indice_espacial()
+
+            return True, f"Base criada com sucesso! {total} registros importados."
+
+        except Exception as e:
+            # Base incompleta: removida para que a importação possa ser repetida com o mesmo nome
+            self._descartar_base(caminho_banco)
+            return False, f"Erro ao criar base SQLite: {str(e)}"
+
+    def _descartar_base(self, caminho_banco: str):
+        self.fechar()
+        for caminho in (caminho_banco, f"{caminho_banco}-wal", f"{caminho_banco}-shm"):
+            if os.path.exists(caminho):
+                os.remove(caminho)
+
+    def _abrir(self, caminho_banco: str):
+        self.fechar()
+
+        conexao = sqlite3.connect(caminho_banco, check_same_thread=False)
+        try:
+            tabelas = {nome for (nome,) in conexao.execute(
+                "SELECT name FROM sqlite_master WHERE type = 'table'")}
+            if tabelas - {'sqlite_sequence'} and 'vitimas' not in tabelas:
+                raise ValueError("O arquivo não é uma base de registros deste sistema.")
+
+            conexao.execute("PRAGMA journal_mode=WAL")
+            conexao.execute("PRAGMA synchronous=FULL")
+            conexao.execute("PRAGMA foreign_keys=ON")
+            conexao.executescript(ESQUEMA_SQL)
+            conexao.commit()
+        except Exception:
+            conexao.close()
+            raise
+
+        self._conexao = conexao
+        self.caminho_arquivo = caminho_banco
+        self._df_completo = None
+        self._cache_lookup = {nome: {} for nome in LOOKUPS}
+        self.dados_carregados = True
+
+    def fechar(self):
+        with self._lock:
+            if self._conexao is not None:
+                self._conexao.close()
+                self._conexao = None
+        self.dados_carregados = False
+
+    def obter_info_arquivo(self) -> dict:
+
+        if not self.dados_carregados:
+            return {
+                'total_registros': 0,
+                'ultima_data': None,
+                'municipios_unicos': 0
+            }
+
+        # Contagens pelos índices: não percorre os registros
+        ultima_data = self._consultar_valor("SELECT MAX(data_fato) FROM ocorrencias")
+        return {
+            'total_registros': self._consultar_valor("SELECT COUNT(*) FROM vitimas"),
+            'ultima_data': parse_data_excel(ultima_data) if ultima_data else None,
+            'municipios_unicos': self._consultar_valor(
+                "SELECT COUNT(DISTINCT id_municipio) FROM ocorrencias")
+        }
+
+    def inserir_registro(self, dados: dict) -> Tuple[bool, str, int]:
+        return self.inserir_registros([dados])
+
+    def inserir_registros(self, lista_dados: list) -> Tuple[bool, str, int]:
+        """
+        Grava uma ocorrência com uma ou mais vítimas (dados da ocorrência
+        tirados do primeiro registro) numa única transação. Retorna a linha
+        do primeiro registro na ordem por data.
+        """
+        if not self.dados_carregados:
+            return False, "Nenhuma base carregada.", -1
+
+        if not lista_dados:
+            return False, "Nenhum registro para inserir.", -1
+
+        try:
+            with self._lock:
+                data_fato, id_vitima = self._gravar_transacao([lista_dados])[0]
+        except sqlite3.IntegrityError as e:
+            return False, f"Erro de integridade: {e}", -1
+        except Exception as e:
+            return False, f"Erro ao inserir registro: {str(e)}", -1
+
+        # Transação confirmada: daqui em diante o resultado é sucesso
+        self._df_completo = None
+        self._atualizar_indices(lista_dados)
+
+        try:
+            with self._lock:
+                posicao = self._posicao(data_fato, id_vitima)
+        except Exception:
+            # Só informativa: com -1 a tela de confirmação não mostra a linha
+            posicao = -1
+
+        if len(lista_dados) == 1:
+            mensagem = "Registro inserido com sucesso!"
+        else:
+            mensagem = f"{len(lista_dados)} registros inseridos com sucesso!"
+        return True, mensagem, posicao
+
+    def _atualizar_indices(self, lista_dados: list):
+        # Todas as vítimas ficam com os dados da ocorrência do primeiro registro
+        ocorrencia = {coluna: lista_dados[0].get(coluna) for coluna in COLUNAS_OCORRENCIA}
+        try:
+            for dados in lista_dados:
+                self._cubo.registrar({**dados, **ocorrencia})
+                self._indice_espacial.registrar({**dados, **ocorrencia})
+        except Exception:
+            # Atualização interrompida no meio: remonta os índices a partir da base
+            try:
+                self._montar_indices()
+            except sqlite3.Error:
+                # Ficam como estão até a base ser reaberta (o registro já está gravado)
+                pass
+
+    def _gravar_transacao(self, ocorrencias: list) -> list:
+        # Chamado com o lock: grava as ocorrências (listas de vítimas) numa única transação
+        try:
+            with self._conexao:
+                return [self._gravar_ocorrencia(lista_dados) for lista_dados in ocorrencias]
+        except Exception:
+            # Ids acrescentados ao cache durante a transação desfeita não existem na base
+            self._cache_lookup = {nome: {} for nome in LOOKUPS}
+            raise
+
+    def _gravar_ocorrencia(self, lista_dados: list) -> Tuple[Optional[str], int]:
+        # Chamado dentro de uma transação; retorna (data_fato, id da primeira vítima)
+        dados = lista_dados[0]
+        data_fato = _data_iso(dados.get('Data do Fato'), manter_texto=False)
+
+        cursor = self._conexao.execute(SQL_INSERIR_OCORRENCIA, (
+            data_fato,
+            _hora(dados.get('Hora do fato')),
+            _texto(dados.get('Dia da Semana')),
+            _texto(dados.get('Mês')),
+            self._lookup('municipio', dados.get('Município do Fato')),
+            _texto(dados.get('Logradouro')),
+            _texto(dados.get('Subtipo do Local')),
+            self._lookup('natureza', dados.get('Natureza da Ocorrência')),
+            self._lookup('tipo_acidente', dados.get('Tipo de Acidente')),
+            _numero(dados.get('Lat')),
+            _numero(dados.get('Long')),
+            _texto(dados.get('Região')),
+            _texto(dados.get('Território de\nDesenvolvimento')),
+            _texto(dados.get('OBS:')),
+        ))
+        id_ocorrencia = cursor.lastrowid
+
+        vitimas = [(
+            id_ocorrencia,
+            _texto(vitima.get('Vítima')),
+            _texto(vitima.get('Sexo')),
+            _data_iso(vitima.get('Data de\nNascimento')),
+            _inteiro(vitima.get('Idade')),
+            _texto(vitima.get('CPF')),
+            _texto(vitima.get('Filiação')),
+            _texto(vitima.get('Possui\nCNH')),
+            _booleano(vitima.get('Condutor')),
+            _texto(vitima.get('Condutor')),
+            _texto(vitima.get('Realizado Exame\nAlcoolemia')),
+            _texto(vitima.get('Estava usando\nCapacete')),
+            self._lookup('veiculo', vitima.get('Veículo Vítima\nOu Outros')),
+            self._lookup('veiculo', vitima.get('Veículo Envolvido\nOu Outros')),
+            _data_iso(vitima.get('Data do Óbito')),
+            _texto(vitima.get('Local da Morte')),
+            _texto(vitima.get('Natureza do Laudo')),
+        ) for vitima in lista_dados]
+
+        primeira = self._conexao.execute(SQL_INSERIR_VITIMA, vitimas[0]).lastrowid
+        self._conexao.executemany(SQL_INSERIR_VITIMA, vitimas[1:])
+        return data_fato, primeira
+
+    def _lookup(self, tabela: str, valor) -> Optional[int]:
+        # Id do valor na tabela de lookup (acrescentado se ainda não existir)
+        valor = _texto(valor)
+        if valor is None:
+            return None
+
+        cache = self._cache_lookup[tabela]
+        chave = valor.lower()
+        if chave not in cache:
+            nome_tabela, coluna = LOOKUPS[tabela]
+            self._conexao.execute(f"INSERT OR IGNORE INTO {nome_tabela} ({coluna}) VALUES (?)", (valor,))
+            cache[chave] = self._conexao.execute(
+                f"SELECT id FROM {nome_tabela} WHERE {coluna} = ?", (valor,)).fetchone()[0]
+        return cache[chave]
+
+    def _posicao(self, data_fato: Optional[str], id_vitima: int) -> int:
+        # Linha (a partir de 1) do registro na ordem por data, contada pelo índice de data_fato
+        if data_fato is None:
+            anteriores = self._conexao.execute(
+                "SELECT COUNT(*) FROM vitimas v JOIN ocorrencias o ON o.id = v.id_ocorrencia "
+                "WHERE o.data_fato IS NOT NULL OR v.id < ?", (id_vitima,)).fetchone()[0]
+        else:
+            anteriores = self._conexao.execute(
+                "SELECT COUNT(*) FROM vitimas v JOIN ocorrencias o ON o.id = v.id_ocorrencia "
+                "WHERE o.data_fato < ? OR (o.data_fato = ? AND v.id < ?)",
+                (data_fato, data_fato, id_vitima)).fetchone()[0]
+        return anteriores + 1
+
+    def salvar_arquivo(self, caminho_destino: str = None, incremental: bool = True) -> Tuple[bool, str]:
+        """
+        Exporta todos os registros para uma planilha .xlsx. A base SQLite já
+        está sempre gravada; incremental é aceito só por compatibilidade.
+        """
+        if not self.dados_carregados:
+            return False, "Nenhum dado para salvar."
+
+        if not caminho_destino:
+            return False, "Informe o arquivo .xlsx de destino."
+
+        try:
+            df = dataframe_exibicao(self.obter_dataframe())
+            with pd.ExcelWriter(caminho_destino, engine='openpyxl',
+                                date_format='DD/MM/YYYY', datetime_format='DD/MM/YYYY') as writer:
+                df.to_excel(writer, index=False)
+
+            return True, f"Arquivo salvo com sucesso em: {caminho_destino}"
+
+        except PermissionError:
+            return False, "Sem permissão para salvar o arquivo. Verifique se ele não está aberto."
+        except Exception as e:
+            return False, f"Erro ao salvar arquivo: {str(e)}"
+
+    def obter_estatisticas(self) -> CuboEstatisticas:
+        # Contagens mantidas a cada inserção (para filtros livres, use SQL sobre a base)
+        return self._cubo
+
+    def obter_indice_espacial(self) -> IndiceEspacial:
+        # Busca por raio/retângulo e pontos críticos sobre as coordenadas das vítimas
+        return self._indice_espacial
+
+    def _montar_indices(self):
+        # Só as colunas das dimensões e coordenadas (uma leitura da base, sem montar o DataFrame completo)
+        colunas = list(dict.fromkeys([*DIMENSOES.values(), 'Lat', 'Long']))
+        expressoes = ', '.join(f'{COLUNAS_SQL[c]} AS "{c}"' for c in colunas)
+        with self._lock:
+            linhas = self._conexao.execute(f"SELECT {expressoes} {FROM_REGISTROS}").fetchall()
+
+        df = pd.DataFrame.from_records(linhas, columns=colunas)
+        df['Data do Fato'] = pd.to_datetime(df['Data do Fato'], format='%Y-%m-%d', errors='coerce')
+        self._cubo = CuboEstatisticas.montar([df])
+        self._indice_espacial = IndiceEspacial.montar([df])
+
+    def obter_dataframe(self) -> Optional[pd.DataFrame]:
+        if not self.dados_carregados:
+            return None
+
+        # Montado uma vez por inserção, com as colunas e tipos do ExcelHandler
+        if self._df_completo is None:
+            colunas = ', '.join(f'{COLUNAS_SQL[c]} AS "{c}"' for c in COLUNAS_EXCEL)
+            with self._lock:
+                cursor = self._conexao.execute(f"SELECT {colunas} {FROM_REGISTROS} {ORDEM_REGISTROS}")
+                linhas = cursor.fetchall()
+
+            df = pd.DataFrame.from_records(linhas, columns=COLUNAS_EXCEL)
+            for coluna in ('Data do Óbito', 'Data de\nNascimento', 'Data do Fato'):
+                df[coluna] = _serie_datas(df[coluna])
+            self._df_completo = aplicar_esquema(df, datas_em_texto=False)
+
+        return self._df_completo
+
+    def obter_valores_unicos(self, coluna: str) -> list:
+        if not self.dados_carregados or coluna not in COLUNAS_SQL:
+            return []
+
+        if coluna in VALORES_LOOKUP:
+            # Só os valores usados por alguma ocorrência (busca no índice da chave estrangeira)
+            tabela, campo, tabela_uso, chave = VALORES_LOOKUP[coluna]
+            sql = (f"SELECT {campo} FROM {tabela} t WHERE EXISTS "
+                   f"(SELECT 1 FROM {tabela_uso} u WHERE u.{chave} = t.id)")
+        else:
+            expressao = COLUNAS_SQL[coluna]
+            sql = f"SELECT DISTINCT {expressao} {FROM_REGISTROS} WHERE {expressao} IS NOT NULL"
+
+        with self._lock:
+            valores = [valor for (valor,) in self._conexao.execute(sql)]
+        return sorted(valores)
+
+    def obter_ultimo_registro(self) -> Optional[dict]:
+        if not self.dados_carregados:
+            return None
+
+        colunas = ', '.join(f'{COLUNAS_SQL[c]} AS "{c}"' for c in COLUNAS_EXCEL)
+        with self._lock:
+            linha = self._conexao.execute(
+                f"SELECT {colunas} {FROM_REGISTROS} "
+                f"ORDER BY o.data_fato IS NULL DESC, o.data_fato DESC, v.id DESC LIMIT 1").fetchone()
+        return dict(zip(COLUNAS_EXCEL, linha)) if linha else None
+
+    def _consultar_valor(self, sql: str, parametros: tuple = ()):
+        with self._lock:
+            return self._conexao.execute(sql, parametros).fetchone()[0]
+
+
+# CONVERSOES (valores do formulário ou da planilha para as colunas SQL)
+
+def _texto(valor) -> Optional[str]:
+    valor = valor_exibicao(valor)
+    if valor is None:
+        return None
+    texto = str(valor).strip()
+    return texto or None
+
+
+def _data_iso(valor, manter_texto: bool = True) -> Optional[str]:
+    # yyyy-mm-dd (ordenável); texto que não é data fica como está, exceto na Data do Fato
+    if isinstance(valor, (datetime, date, pd.Timestamp)) and not pd.isna(valor):
+        return valor.strftime('%Y-%m-%d')
+
+    texto = _texto(valor)
+    if texto is None:
+        return None
+
+    data = parse_data_excel(texto)
+    if data is not None:
+        return data.strftime('%Y-%m-%d')
+    return texto if manter_texto else None
+
+
+def _hora(valor) -> Optional[str]:
+    if isinstance(valor, time):
+        return valor.strftime('%H:%M')
+
+    texto = _texto(valor)
+    if texto is None:
+        return None
+    return parse_hora_excel(texto) or texto
+
+
+def _numero(valor) -> Optional[float]:
+    texto = _texto(valor)
+    if texto is None:
+        return None
+    try:
+        return float(texto.replace(',', '.'))
+    except ValueError:
+        return None
+
+
+def _inteiro(valor) -> Optional[int]:
+    numero = _numero(valor)
+    return int(numero) if numero is not None else None
+
+
+def _booleano(valor) -> Optional[bool]:
+    texto = _texto(valor)
+    if texto is None:
+        return None
+    texto = texto.lower()
+    if texto in ('sim', 's', 'yes', 'true', '1'):
+        return True
+    if texto in ('não', 'nao', 'n', 'no', 'false', '0'):
+        return False
+    return None
+
+
+def _serie_datas(serie: pd.Series) -> pd.Series:
+    # Datas gravadas em yyyy-mm-dd voltam como datetime; se houver texto, a coluna fica object
+    datas = pd.to_datetime(serie, format='%Y-%m-%d', errors='coerce')
+    texto = serie.notna() & datas.isna()
+    if not texto.any():
+        return datas
+
+    valores = datas.astype(object)
+    valores[texto] = serie[texto]
+    valores[serie.isna()] = None
+    return valores